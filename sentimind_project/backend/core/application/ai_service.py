@@ -2,8 +2,18 @@
 Motor de Minería de Texto basado en Transformers.
 Usa el modelo XLM-RoBERTa cargado localmente.
 """
-from transformers import pipeline, AutoTokenizer, AutoModelForSequenceClassification
-import os
+from collections import Counter
+import threading
+import time
+
+from core.application.batching import MicroBatcher
+from core.application.classification_cache import ClassificationCache
+from core.application import tokenization
+from core.application.config import get_setting
+from core.application.inference_backends import configured_backend_name, get_backend
+from core.application.near_duplicates import NearDuplicateIndex
+from core.application.remote_inference import InferenceClient, InferenceServerError, InferenceServerLoading
+from core.application.telemetry import stage
 
 
 class MiningEngine:
@@ -15,6 +25,14 @@ class MiningEngine:
     - Clasificación Zero-Shot multilingüe (optimizado para español)
     - Soporte multi-label (un post puede tener múltiples emociones)
     - Umbral configurable para detectar emociones secundarias
+    - Micro-batching: requests concurrentes comparten una pasada del modelo
+    - Caché por hash de contenido (LRU en memoria + tabla en DB)
+    - Reuso de clasificaciones de casi-duplicados (SimHash, opcional)
+    - Backends intercambiables: PyTorch fp32, PyTorch int8 y ONNX Runtime
+    - Modo "embedding": camino rápido por similitud con fallback a NLI
+    - Modo "cascade": clasificador destilado primero, transformer si duda
+    - Precarga al iniciar (compartida entre workers con gunicorn --preload) y warm-up
+    - Servidor de inferencia opcional: los workers delegan en un proceso con el modelo
     """
     
     # Lista expandida de categorías para la red social (25 categorías)
@@ -40,51 +58,223 @@ class MiningEngine:
     # Máximo de emociones a retornar
     MAX_EMOTIONS = 3
 
+    # Modelo multilingüe potente y su fallback
+    MODEL_NAME = "joeddav/xlm-roberta-large-xnli"
+    FALLBACK_MODEL_NAME = "facebook/bart-large-mnli"
+
+    # Valor de "method" para resultados del camino NLI completo
+    NLI_METHOD = "xlm-roberta-local"
+
+    # Modos de clasificación (SENTIMIND_CLASSIFICATION_MODE)
+    MODE_NLI = "nli"
+    MODE_EMBEDDING = "embedding"
+    MODE_CASCADE = "cascade"
+
+    # Texto de la inferencia de warm-up
+    WARMUP_TEXT = "Hoy es un buen día para aprender algo nuevo."
+
     _classifier = None
+    _model_name = None
+    _backend_name = None
+    _batcher = None
+    _method_counts = Counter()
+    _counts_lock = threading.Lock()
+    _load_lock = threading.Lock()
+
+    # Estado para /ready
+    _load_seconds = None
+    _warmup_seconds = None
+    _warm = False
+    _load_error = None
 
     @classmethod
     def get_classifier(cls):
         if cls._classifier is None:
-            print("🧠 Cargando modelo neuronal multilingüe XLM-RoBERTa... (esto pasa solo una vez)")
+            # Un solo hilo carga; el resto (warm-up y requests) espera
+            with cls._load_lock:
+                if cls._classifier is None:
+                    cls._load_classifier()
+        return cls._classifier
+
+    @classmethod
+    def _load_classifier(cls):
+        print("🧠 Cargando modelo neuronal multilingüe XLM-RoBERTa... (esto pasa solo una vez)")
+        start = time.perf_counter()
+        
+        backend = get_backend()
+        model_name = cls.MODEL_NAME
+        
+        try:
+            classifier = backend.load(model_name)
+            print(f"✅ Modelo {model_name} cargado exitosamente! (backend: {backend.name})")
             
-            # Modelo multilingüe potente
-            model_name = "joeddav/xlm-roberta-large-xnli"
+        except Exception as e:
+            print(f"⚠️ Error cargando XLM-RoBERTa: {e}")
+            print("🔄 Intentando con modelo BART (fallback)...")
             
             try:
-                # Cargar tokenizer con sentencepiece (use_fast=False)
-                print(f"📦 Cargando tokenizer para {model_name}...")
-                tokenizer = AutoTokenizer.from_pretrained(
-                    model_name, 
-                    use_fast=False,
-                    local_files_only=False
-                )
-                
-                print(f"📦 Cargando modelo {model_name}...")
-                cls._classifier = pipeline(
-                    "zero-shot-classification",
-                    model=model_name,
-                    tokenizer=tokenizer,
-                    device=-1  # CPU
-                )
-                print(f"✅ Modelo {model_name} cargado exitosamente!")
-                
-            except Exception as e:
-                print(f"⚠️ Error cargando XLM-RoBERTa: {e}")
-                print("🔄 Intentando con modelo BART (fallback)...")
-                
-                try:
-                    model_name = "facebook/bart-large-mnli"
-                    cls._classifier = pipeline(
-                        "zero-shot-classification",
-                        model=model_name,
-                        device=-1
-                    )
-                    print(f"✅ Modelo fallback {model_name} cargado!")
-                except Exception as e2:
-                    print(f"❌ Error también con fallback: {e2}")
-                    raise RuntimeError(f"No se pudo cargar ningún modelo: {e}, {e2}")
-                
-        return cls._classifier
+                model_name = cls.FALLBACK_MODEL_NAME
+                classifier = backend.load(model_name)
+                print(f"✅ Modelo fallback {model_name} cargado!")
+            except Exception as e2:
+                print(f"❌ Error también con fallback: {e2}")
+                cls._load_error = f"{e}; {e2}"
+                raise RuntimeError(f"No se pudo cargar ningún modelo: {e}, {e2}")
+        
+        cls._model_name = model_name
+        cls._backend_name = backend.name
+        cls._load_seconds = round(time.perf_counter() - start, 2)
+        cls._load_error = None
+        cls._classifier = classifier
+
+    @classmethod
+    def preload(cls):
+        """
+        Carga los pesos (y el camino rápido del modo activo) sin inferir.
+        Es seguro antes del fork de gunicorn: los workers comparten la memoria
+        por copy-on-write.
+        """
+        cls.get_classifier()
+        
+        mode = cls.classification_mode()
+        try:
+            if mode == cls.MODE_EMBEDDING:
+                cls.fast_path(mode).label_matrix(cls)
+            elif mode == cls.MODE_CASCADE:
+                cls.fast_path(mode).load()
+        except Exception as e:
+            print(f"⚠️ Camino rápido del modo {mode} no precargado: {e}")
+
+    @classmethod
+    def warm_up(cls):
+        """
+        preload() + una inferencia de prueba: la primera pasada inicializa
+        kernels y buffers, así el primer usuario no paga ese costo.
+        Llamar después del fork (cada worker tiene sus propios hilos de inferencia).
+        """
+        cls.preload()
+        start = time.perf_counter()
+        cls._infer_batch([cls.WARMUP_TEXT])
+        cls._warmup_seconds = round(time.perf_counter() - start, 2)
+        cls._warm = True
+        print(f"🔥 Warm-up listo en {cls._warmup_seconds}s")
+
+    @classmethod
+    def readiness(cls) -> dict:
+        """
+        Estado del modelo en este proceso (endpoint /ready), o el del
+        servidor de inferencia si la inferencia está delegada.
+        """
+        if InferenceClient.enabled():
+            return cls._remote_readiness()
+        return cls.local_readiness()
+
+    @classmethod
+    def local_readiness(cls) -> dict:
+        return {
+            "ready": cls._warm,
+            "loaded": cls._classifier is not None,
+            "warm": cls._warm,
+            "model": cls.active_model_name(),
+            "backend": cls.active_backend_name(),
+            "mode": cls.classification_mode(),
+            "fast_tokenizer": getattr(getattr(cls._classifier, 'tokenizer', None), 'is_fast', None),
+            "load_seconds": cls._load_seconds,
+            "warmup_seconds": cls._warmup_seconds,
+            "error": cls._load_error,
+        }
+
+    @classmethod
+    def _remote_readiness(cls) -> dict:
+        state = {"ready": False, "loaded": False, "warm": False, "error": None}
+        try:
+            state.update(InferenceClient.ping())
+        except InferenceServerError as e:
+            state["error"] = str(e)
+        state.pop("ok", None)
+        state["server"] = InferenceClient.address()
+        return state
+
+    @classmethod
+    def active_model_name(cls) -> str:
+        """Modelo cargado (o el configurado si aún no se cargó)."""
+        return cls._model_name or cls.MODEL_NAME
+
+    @classmethod
+    def active_backend_name(cls) -> str:
+        """Backend cargado (o el configurado si aún no se cargó)."""
+        return cls._backend_name or configured_backend_name()
+
+    @classmethod
+    def classification_mode(cls) -> str:
+        return get_setting('SENTIMIND_CLASSIFICATION_MODE', cls.MODE_NLI)
+
+    @classmethod
+    def pipeline_config(cls, model_name: str | None = None) -> dict:
+        """
+        Todo lo que, además de TAXONOMY y umbrales, cambia el resultado (para la caché).
+        `model_name` pide la configuración con otro modelo (p. ej. el fallback).
+        """
+        config = {
+            "model": model_name or cls.active_model_name(),
+            "backend": cls.active_backend_name(),
+            "mode": cls.classification_mode(),
+            "max_chunk_tokens": tokenization.max_chunk_tokens(),
+        }
+        if config["mode"] == cls.MODE_EMBEDDING:
+            from core.application.embeddings import EmbeddingClassifier, EmbeddingEncoder
+            config["embedding_model"] = EmbeddingEncoder.model_name()
+            config["embedding_min_margin"] = EmbeddingClassifier.min_margin()
+        elif config["mode"] == cls.MODE_CASCADE:
+            from core.application.distilled import DistilledClassifier
+            config["distilled_version"] = DistilledClassifier.active_version()
+            config["cascade_min_confidence"] = DistilledClassifier.min_confidence()
+            config["cascade_min_margin"] = DistilledClassifier.min_margin()
+        return config
+
+    @classmethod
+    def fast_path(cls, mode: str | None = None):
+        """
+        Clasificador del camino rápido del modo (None en "nli").
+        Import diferido: numpy y compañía solo se cargan si el modo los usa.
+        """
+        mode = mode or cls.classification_mode()
+        if mode == cls.MODE_EMBEDDING:
+            from core.application.embeddings import EmbeddingClassifier
+            return EmbeddingClassifier
+        if mode == cls.MODE_CASCADE:
+            from core.application.distilled import DistilledClassifier
+            return DistilledClassifier
+        return None
+
+    @classmethod
+    def method_counts(cls) -> dict:
+        """Cuántos resultados produjo cada camino ("method") en este proceso."""
+        with cls._counts_lock:
+            return dict(cls._method_counts)
+
+    @classmethod
+    def _count_methods(cls, results: list[dict]):
+        with cls._counts_lock:
+            cls._method_counts.update(r.get("method") for r in results)
+
+    @classmethod
+    def get_batcher(cls):
+        """
+        Retorna el MicroBatcher compartido, o None si el micro-batching
+        está desactivado (SENTIMIND_BATCH_WINDOW_MS=0).
+        """
+        window_ms = get_setting('SENTIMIND_BATCH_WINDOW_MS', 10.0, float)
+        if window_ms <= 0:
+            return None
+
+        if cls._batcher is None:
+            cls._batcher = MicroBatcher(
+                cls._infer_batch,
+                window_ms=window_ms,
+                max_batch_size=get_setting('SENTIMIND_BATCH_MAX_SIZE', 8, int)
+            )
+        return cls._batcher
 
     @classmethod
     def analyze(cls, text: str) -> dict:
@@ -101,26 +291,200 @@ class MiningEngine:
         """
         print(f"🧠 Analizando: '{text[:50]}...'")
         
-        classifier = cls.get_classifier()
+        use_cache = ClassificationCache.enabled()
+        with stage('cache'):
+            cached = ClassificationCache.get_many(cls, [text]) if use_cache else {}
+        if cached:
+            result = cached[0]
+            print(f"♻️ Resultado desde caché: {result['primary_category']} "
+                  f"(hit ratio {ClassificationCache.stats()['hit_ratio']:.0%})")
+            cls._remember_near_duplicates([text], [result])
+            return result
+        
+        reused = cls._find_near_duplicates([text])
+        if reused:
+            result = reused[0]
+            print(f"♻️ Casi-duplicado (distancia {result['reuse_distance']}): {result['primary_category']}")
+            cls._count_methods([result])
+            return result
+        
+        batcher = cls.get_batcher()
+        with stage('inference'):
+            if batcher is not None:
+                # Se agrupa con otros requests concurrentes en una sola pasada
+                result = batcher.submit(text)
+            else:
+                result = cls._infer_batch([text])[0]
+        
+        if use_cache:
+            with stage('cache'):
+                ClassificationCache.set_many(cls, [text], [result])
+        cls._remember_near_duplicates([text], [result])
+        cls._count_methods([result])
+        
+        print(f"✅ Resultado: {result['categories'][0]['name']} ({result['categories'][0]['confidence']})")
+        
+        return result
+
+    @classmethod
+    def analyze_batch(cls, texts: list[str]) -> list[dict]:
+        """
+        Analiza varios textos; los que no están en caché ni tienen un
+        casi-duplicado ya clasificado van al modelo en una sola pasada.
+        
+        Returns:
+            list[dict]: Un resultado por texto, mismo formato que analyze().
+        """
+        texts = list(texts)
+        if not texts:
+            return []
+        
+        use_cache = ClassificationCache.enabled()
+        with stage('cache'):
+            results = ClassificationCache.get_many(cls, texts) if use_cache else {}
+        if results:
+            cls._remember_near_duplicates([texts[i] for i in results], list(results.values()))
         
-        # Inferencia con multi_label=True para detectar múltiples emociones
-        result = classifier(
-            text, 
-            cls.TAXONOMY, 
-            hypothesis_template=cls.HYPOTHESIS_TEMPLATE,
-            multi_label=True
-        )
+        missing = [i for i in range(len(texts)) if i not in results]
+        reused = cls._find_near_duplicates([texts[i] for i in missing])
+        if reused:
+            cls._count_methods(list(reused.values()))
+            results.update((missing[j], result) for j, result in reused.items())
+            missing = [i for i in missing if i not in results]
         
+        if missing:
+            with stage('inference'):
+                inferred = cls._infer_batch([texts[i] for i in missing])
+            if use_cache:
+                with stage('cache'):
+                    ClassificationCache.set_many(cls, [texts[i] for i in missing], inferred)
+            cls._remember_near_duplicates([texts[i] for i in missing], inferred)
+            cls._count_methods(inferred)
+            results.update(zip(missing, inferred))
+        
+        return [results[i] for i in range(len(texts))]
+
+    @classmethod
+    def _find_near_duplicates(cls, texts: list[str]) -> dict:
+        """{índice: resultado reutilizado} de un casi-duplicado ya clasificado (si está activo)."""
+        if not texts or not NearDuplicateIndex.enabled():
+            return {}
+        with stage('near_dup'):
+            return NearDuplicateIndex.find_many(cls, texts)
+
+    @classmethod
+    def _remember_near_duplicates(cls, texts: list[str], results: list[dict]):
+        if texts and NearDuplicateIndex.enabled():
+            with stage('near_dup'):
+                NearDuplicateIndex.add_many(cls, texts, results)
+
+    @classmethod
+    def _infer_batch(cls, texts: list[str]) -> list[dict]:
+        """
+        Inferencia sin caché: en el servidor de inferencia si está configurado
+        (SENTIMIND_INFERENCE_SERVER) o en este proceso.
+        """
+        if InferenceClient.enabled():
+            try:
+                return cls._infer_remote(texts)
+            except InferenceServerLoading:
+                # Cargar una copia del modelo en cada worker es lo que el servidor evita
+                raise
+            except InferenceServerError as e:
+                if not InferenceClient.fallback_enabled():
+                    raise
+                print(f"⚠️ {e}; infiriendo en este proceso")
+        return cls._infer_local(texts)
+
+    @classmethod
+    def _infer_remote(cls, texts: list[str]) -> list[dict]:
+        response = InferenceClient.infer(texts)
+        # El modelo lo eligió el servidor (puede haber caído al fallback): entra en la clave de caché
+        cls._model_name = response.get("model") or cls._model_name
+        cls._backend_name = response.get("backend") or cls._backend_name
+        return response["results"]
+
+    @classmethod
+    def _infer_local(cls, texts: list[str]) -> list[dict]:
+        """
+        Inferencia con el modelo de este proceso. En modo "embedding" o
+        "cascade" intenta primero el camino rápido y solo los textos dudosos
+        pasan por NLI.
+        """
+        results = [None] * len(texts)
+        
+        fast_path = cls.fast_path()
+        if fast_path is not None:
+            try:
+                results = fast_path.classify(cls, texts)
+            except Exception as e:
+                print(f"⚠️ Camino rápido {fast_path.METHOD} no disponible: {e}")
+        
+        pending = [i for i, r in enumerate(results) if r is None]
+        if pending:
+            nli_results = cls._nli_batch([texts[i] for i in pending])
+            for i, result in zip(pending, nli_results):
+                results[i] = result
+        
+        return results
+
+    @classmethod
+    def _nli_batch(cls, texts: list[str], classifier=None) -> list[dict]:
+        """
+        Camino NLI completo: pares premisa/hipótesis (texto x TAXONOMY).
+        Los posts de más de SENTIMIND_MAX_CHUNK_TOKENS se parten en fragmentos
+        de oraciones (cada etiqueta se queda con su mejor score entre
+        fragmentos) y los segmentos se agrupan por largo: una pasada por
+        bucket, con relleno solo hasta el más largo de ese bucket.
+        `classifier` permite usar otro pipeline (ej. comparar backends).
+        """
+        classifier = classifier or cls.get_classifier()
+        tokenizer = getattr(classifier, 'tokenizer', None)
+        
+        with stage('tokenize'):
+            segments, owners, lengths = tokenization.split_long_texts(
+                texts, tokenizer, tokenization.max_chunk_tokens()
+            )
+            buckets = tokenization.length_buckets(lengths)
+        scores = [{} for _ in texts]
+        for bucket in buckets:
+            # Inferencia con multi_label=True para detectar múltiples emociones
+            # (el pipeline vuelve a tokenizar los pares: "forward" incluye eso)
+            with stage('forward'):
+                outputs = classifier(
+                    [segments[i] for i in bucket],
+                    cls.TAXONOMY,
+                    hypothesis_template=cls.HYPOTHESIS_TEMPLATE,
+                    multi_label=True,
+                    batch_size=len(bucket) * len(cls.TAXONOMY)
+                )
+            if isinstance(outputs, dict):
+                outputs = [outputs]
+            for i, output in zip(bucket, outputs):
+                text_scores = scores[owners[i]]
+                for label, score in zip(output['labels'], output['scores']):
+                    text_scores[label] = max(score, text_scores.get(label, 0.0))
+        
+        with stage('postprocess'):
+            results = []
+            for text_scores in scores:
+                ranked = sorted(text_scores.items(), key=lambda item: item[1], reverse=True)
+                results.append(cls._build_result([label for label, _ in ranked], [score for _, score in ranked]))
+        return results
+
+    @classmethod
+    def _build_result(cls, labels: list[str], scores: list[float]) -> dict:
+        """Aplica umbral relativo y MAX_EMOTIONS sobre scores ordenados de mayor a menor."""
         # Crear diccionario de scores
-        all_scores = dict(zip(result['labels'], result['scores']))
+        all_scores = dict(zip(labels, scores))
         
         # Obtener el score máximo para calcular umbrales relativos
-        max_score = result['scores'][0]
+        max_score = scores[0]
         threshold = max_score * cls.RELATIVE_THRESHOLD
         
         # Filtrar emociones que superen el umbral relativo
         detected_categories = []
-        for label, score in zip(result['labels'], result['scores']):
+        for label, score in zip(labels, scores):
             if score >= threshold and len(detected_categories) < cls.MAX_EMOTIONS:
                 detected_categories.append({
                     "name": label,
@@ -130,16 +494,14 @@ class MiningEngine:
         # Si ninguna supera el umbral, tomar la más alta
         if not detected_categories:
             detected_categories = [{
-                "name": result['labels'][0],
-                "confidence": round(result['scores'][0], 2)
+                "name": labels[0],
+                "confidence": round(scores[0], 2)
             }]
         
-        print(f"✅ Resultado: {detected_categories[0]['name']} ({detected_categories[0]['confidence']})")
-        
         return {
             "categories": detected_categories,
-            "primary_category": result['labels'][0],
-            "primary_confidence": round(result['scores'][0], 2),
+            "primary_category": labels[0],
+            "primary_confidence": round(scores[0], 2),
             "all_scores": {k: round(v, 2) for k, v in all_scores.items()},
-            "method": "xlm-roberta-local"
+            "method": cls.NLI_METHOD
         }
@@ -0,0 +1,130 @@
+"""
+Micro-batching dinámico entre requests.
+Agrupa las llamadas concurrentes a MiningEngine.analyze() (hilos de gunicorn)
+durante una ventana corta y las resuelve con una sola pasada del modelo.
+Las etapas medidas durante la pasada (tokenize, forward...) vuelven con el
+resultado y se suman al Server-Timing de cada llamador.
+"""
+from concurrent.futures import Future
+import os
+import queue
+import threading
+import time
+
+from core.application import telemetry
+
+
+class MicroBatcher:
+    """
+    Cola compartida + hilo despachador.
+
+    Cada llamador encola su texto y espera su Future. El despachador toma el
+    primer elemento, sigue juntando hasta que pasa la ventana o se llena el
+    batch, ejecuta `process_batch(items)` una vez y reparte a cada llamador
+    solo su resultado (mismo orden de entrada).
+    """
+
+    def __init__(self, process_batch, window_ms: float, max_batch_size: int):
+        self._process_batch = process_batch
+        self.window = max(window_ms, 0) / 1000.0
+        self.max_batch_size = max(int(max_batch_size), 1)
+
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+
+    def submit(self, item, timeout: float | None = None):
+        """Encola `item` y bloquea hasta tener su resultado."""
+        future = Future()
+        self._ensure_worker()
+        self._queue.put((item, future))
+        result, timings = future.result(timeout=timeout)
+        telemetry.merge(timings)
+        return result
+
+    def submit_many(self, items, timeout: float | None = None) -> list:
+        """
+        Encola cada elemento de `items` por separado (cada uno cuenta para
+        max_batch_size) y bloquea hasta tener todos sus resultados, en orden.
+        """
+        self._ensure_worker()
+        futures = []
+        for item in items:
+            future = Future()
+            self._queue.put((item, future))
+            futures.append(future)
+
+        results, passes = [], {}
+        for future in futures:
+            result, timings = future.result(timeout=timeout)
+            results.append(result)
+            # Los elementos de una misma pasada comparten sus tiempos: se suman una vez
+            passes[id(timings)] = timings
+        for timings in passes.values():
+            telemetry.merge(timings)
+        return results
+
+    def _ensure_worker(self):
+        # Los hilos no sobreviven a un fork (gunicorn --preload):
+        # si cambió el PID se arranca un despachador nuevo en este proceso.
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+                return
+            if self._pid != os.getpid():
+                self._queue = queue.Queue()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._run,
+                name="sentimind-microbatcher",
+                daemon=True
+            )
+            self._thread.start()
+
+    def _collect(self) -> list:
+        """Bloquea hasta el primer elemento y junta los que lleguen en la ventana."""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.window
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        # Lo que ya esté encolado entra sin esperar más
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            items = [item for item, _ in batch]
+
+            try:
+                with telemetry.collect() as timings:
+                    results = list(self._process_batch(items))
+                if len(results) != len(batch):
+                    raise RuntimeError(
+                        f"process_batch devolvió {len(results)} resultados para {len(batch)} elementos"
+                    )
+            except BaseException as e:
+                # Ningún llamador queda esperando un Future que nadie va a resolver
+                for _, future in batch:
+                    future.set_exception(e)
+                if not isinstance(e, Exception):
+                    raise
+                continue
+
+            for (_, future), result in zip(batch, results):
+                future.set_result((result, timings))
@@ -0,0 +1,73 @@
+"""
+Mapa en memoria nombre -> id de Category.
+Las categorías casi nunca cambian (son TAXONOMY), así que crear un post no
+necesita consultar Category: el mapa se calienta una vez con TAXONOMY y solo
+va a la base de datos por nombres nuevos.
+"""
+import threading
+
+from django.db import transaction
+
+from core.models import Category
+
+
+class CategoryRegistry:
+    """
+    Singleton por proceso. Se invalida al guardar o borrar una Category
+    (señales registradas en CoreConfig.ready) o llamando a invalidate().
+    """
+
+    _ids = {}
+    _warm = False
+    _lock = threading.Lock()
+
+    @classmethod
+    def warm(cls, taxonomy):
+        """Crea las categorías de TAXONOMY que falten y carga todas las existentes."""
+        ids = cls._fetch_or_create(taxonomy)
+        ids.update(Category.objects.exclude(name__in=ids.keys()).values_list('name', 'id'))
+        cls._remember(ids)
+        cls._warm = True
+        print(f"🗂️ Mapa de categorías listo ({len(ids)} categorías)")
+
+    @classmethod
+    def ids_for(cls, names) -> dict:
+        """Mapa nombre -> id para `names`, creando en un solo INSERT las que falten."""
+        if not cls._warm:
+            from core.application.ai_service import MiningEngine
+            cls.warm(MiningEngine.TAXONOMY)
+
+        names = set(names)
+        ids = {name: cls._ids[name] for name in names if name in cls._ids}
+        missing = names - ids.keys()
+        if missing:
+            fetched = cls._fetch_or_create(missing)
+            cls._remember(fetched)
+            ids.update(fetched)
+        return ids
+
+    @classmethod
+    def invalidate(cls, **kwargs):
+        """Vacía el mapa; la próxima escritura lo vuelve a calentar. Sirve como receptor de señales."""
+        with cls._lock:
+            cls._ids = {}
+            cls._warm = False
+
+    @staticmethod
+    def _fetch_or_create(names) -> dict:
+        names = set(names)
+        ids = dict(Category.objects.filter(name__in=names).values_list('name', 'id'))
+        missing = names - ids.keys()
+        if missing:
+            Category.objects.bulk_create([Category(name=name) for name in missing], ignore_conflicts=True)
+            ids.update(Category.objects.filter(name__in=missing).values_list('name', 'id'))
+        return ids
+
+    @classmethod
+    def _remember(cls, ids: dict):
+        # Solo se guardan ids confirmados: si la transacción que creó una
+        # categoría hace rollback, el mapa no debe apuntar a una fila inexistente
+        def update():
+            with cls._lock:
+                cls._ids = {**cls._ids, **ids}
+        transaction.on_commit(update)
@@ -0,0 +1,207 @@
+"""
+Caché de clasificación por hash de contenido.
+Dos niveles: un LRU acotado en memoria delante de la tabla CachedClassification
+(persistente y compartida entre workers de gunicorn).
+
+La clave incluye una huella de modelo/backend/modo + TAXONOMY + HYPOTHESIS_TEMPLATE +
+umbrales, así que cambiar cualquiera de ellos invalida la caché sola.
+"""
+from collections import OrderedDict
+import copy
+import hashlib
+import json
+import re
+import threading
+import unicodedata
+
+from core.application.config import get_setting
+
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_text(text: str) -> str:
+    """Normaliza unicode, mayúsculas y espacios para que los reposts coincidan."""
+    text = unicodedata.normalize('NFKC', text)
+    return _WHITESPACE.sub(' ', text).strip().lower()
+
+
+class ClassificationCache:
+    """
+    Caché de resultados de MiningEngine (LRU en memoria + tabla en DB).
+    Patrón Singleton: estado a nivel de clase, protegido por un lock.
+    """
+
+    _memory = OrderedDict()
+    _lock = threading.Lock()
+    _fingerprint = None
+
+    # Contadores del proceso actual
+    stats_counters = {"memory_hits": 0, "db_hits": 0, "misses": 0}
+
+    @classmethod
+    def enabled(cls) -> bool:
+        return get_setting('SENTIMIND_CACHE_ENABLED', True, bool)
+
+    @staticmethod
+    def fingerprint(engine, model_name: str | None = None) -> str:
+        """Huella de todo lo que cambia el resultado de una clasificación."""
+        payload = json.dumps({
+            **engine.pipeline_config(model_name),
+            "taxonomy": engine.TAXONOMY,
+            "template": engine.HYPOTHESIS_TEMPLATE,
+            "relative_threshold": engine.RELATIVE_THRESHOLD,
+            "max_emotions": engine.MAX_EMOTIONS,
+        }, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def make_key(fingerprint: str, text: str) -> str:
+        raw = f"{fingerprint}:{normalize_text(text)}"
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def get_many(cls, engine, texts: list[str]) -> dict:
+        """
+        Busca `texts` en la caché.
+
+        Returns:
+            dict: {índice: resultado} solo para los aciertos.
+        """
+        fingerprint = cls._current_fingerprint(engine)
+        keys = [cls.make_key(fingerprint, text) for text in texts]
+        found = {}
+        missing = {}
+
+        with cls._lock:
+            for i, key in enumerate(keys):
+                if key in cls._memory:
+                    cls._memory.move_to_end(key)
+                    found[i] = cls._memory[key]
+                    cls.stats_counters["memory_hits"] += 1
+                else:
+                    missing.setdefault(key, []).append(i)
+
+        if missing:
+            rows = cls._db_get(list(missing))
+            with cls._lock:
+                for key, result in rows.items():
+                    cls._remember(key, result)
+                    for i in missing.pop(key):
+                        found[i] = result
+                        cls.stats_counters["db_hits"] += 1
+                cls.stats_counters["misses"] += sum(len(v) for v in missing.values())
+
+        # Copias: quien llama puede modificar el resultado sin tocar la caché
+        return {i: copy.deepcopy(result) for i, result in found.items()}
+
+    @classmethod
+    def set_many(cls, engine, texts: list[str], results: list[dict]):
+        """Guarda resultados en memoria y en la tabla persistente."""
+        fingerprint = cls._current_fingerprint(engine)
+        entries = {cls.make_key(fingerprint, t): r for t, r in zip(texts, results)}
+
+        with cls._lock:
+            for key, result in entries.items():
+                cls._remember(key, result)
+
+        cls._db_set(fingerprint, entries)
+
+    @classmethod
+    def stats(cls) -> dict:
+        """Aciertos y fallos del proceso actual + tamaño de cada nivel."""
+        with cls._lock:
+            counters = dict(cls.stats_counters)
+            memory_size = len(cls._memory)
+        hits = counters["memory_hits"] + counters["db_hits"]
+        lookups = hits + counters["misses"]
+        return {
+            **counters,
+            "hits": hits,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_size": memory_size,
+            "memory_max_size": get_setting('SENTIMIND_CACHE_MEMORY_SIZE', 1024, int),
+        }
+
+    @classmethod
+    def clear(cls, persistent: bool = True):
+        """Vacía el LRU y, opcionalmente, la tabla persistente."""
+        with cls._lock:
+            cls._memory.clear()
+        if persistent:
+            from core.models import CachedClassification
+            CachedClassification.objects.all().delete()
+
+    @classmethod
+    def purge_stale(cls, engine) -> int:
+        """
+        Borra de la DB las entradas generadas con otra huella. Se conservan las
+        del modelo principal y las del fallback con la configuración actual:
+        cuál sirve depende de si el principal carga en cada arranque.
+        """
+        from core.models import CachedClassification
+        current = {cls.fingerprint(engine, name) for name in (engine.MODEL_NAME, engine.FALLBACK_MODEL_NAME)}
+        deleted, _ = CachedClassification.objects.exclude(fingerprint__in=current).delete()
+        return deleted
+
+    @classmethod
+    def _current_fingerprint(cls, engine) -> str:
+        fingerprint = cls.fingerprint(engine)
+        if fingerprint != cls._fingerprint:
+            # Cambió modelo/taxonomía/umbrales: lo que hay en memoria ya no sirve
+            with cls._lock:
+                cls._memory.clear()
+                cls._fingerprint = fingerprint
+        return fingerprint
+
+    @classmethod
+    def _remember(cls, key: str, result: dict):
+        """Inserta en el LRU (llamar con el lock tomado)."""
+        cls._memory[key] = result
+        cls._memory.move_to_end(key)
+        max_size = get_setting('SENTIMIND_CACHE_MEMORY_SIZE', 1024, int)
+        while len(cls._memory) > max_size:
+            cls._memory.popitem(last=False)
+
+    @staticmethod
+    def _db_available() -> bool:
+        # Scripts sueltos (test_classification.py) usan solo el nivel en memoria
+        try:
+            from django.apps import apps
+            return apps.ready
+        except ImportError:
+            return False
+
+    @classmethod
+    def _db_get(cls, keys: list[str]) -> dict:
+        if not cls._db_available():
+            return {}
+        from django.db import DatabaseError, transaction
+        from core.models import CachedClassification
+        try:
+            # Savepoint: un fallo aquí no debe romper la transacción del request
+            with transaction.atomic():
+                return dict(
+                    CachedClassification.objects.filter(key__in=keys).values_list('key', 'result')
+                )
+        except DatabaseError as e:
+            print(f"⚠️ Caché persistente no disponible: {e}")
+            return {}
+
+    @classmethod
+    def _db_set(cls, fingerprint: str, entries: dict):
+        if not cls._db_available():
+            return
+        from django.db import DatabaseError, transaction
+        from core.models import CachedClassification
+        try:
+            with transaction.atomic():
+                CachedClassification.objects.bulk_create(
+                    [
+                        CachedClassification(key=key, fingerprint=fingerprint, result=result)
+                        for key, result in entries.items()
+                    ],
+                    ignore_conflicts=True
+                )
+        except DatabaseError as e:
+            print(f"⚠️ No se pudo guardar en la caché persistente: {e}")
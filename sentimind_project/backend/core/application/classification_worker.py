@@ -0,0 +1,154 @@
+"""
+Clasificación asíncrona de posts pendientes.
+El POST guarda el Post en estado "pending" y responde 202; este módulo toma
+los pendientes en lotes, los pasa por MiningEngine.analyze_batch() y
+completa primary_category + PostCategory.
+
+Se puede ejecutar dentro del proceso web (ClassificationWorker) o aparte
+con `python manage.py classify_pending`.
+"""
+import os
+import threading
+import traceback
+
+from django.db import close_old_connections, transaction
+
+from core.application.ai_service import MiningEngine
+from core.application.config import get_setting
+from core.application.list_cache import PostListCache
+from core.application.post_service import FALLBACK_ANALYSIS, bulk_apply_analyses
+from core.application.remote_inference import InferenceServerLoading
+from core.application.telemetry import Metrics
+from core.models import Post
+
+
+def claim_pending(batch_size: int) -> list[Post]:
+    """
+    Marca como "processing" hasta `batch_size` posts pendientes y los retorna.
+    El UPDATE condicional evita que dos workers tomen el mismo post.
+    """
+    ids = list(
+        Post.objects.filter(classification_status=Post.STATUS_PENDING)
+        .order_by('created_at', 'id')
+        .values_list('id', flat=True)[:batch_size]
+    )
+    claimed = []
+    for post_id in ids:
+        updated = Post.objects.filter(
+            id=post_id,
+            classification_status=Post.STATUS_PENDING
+        ).update(classification_status=Post.STATUS_PROCESSING)
+        if updated:
+            claimed.append(post_id)
+    if claimed:
+        # El listado muestra classification_status
+        PostListCache.invalidate_on_commit()
+    return list(Post.objects.filter(id__in=claimed).order_by('created_at', 'id'))
+
+
+def classify_pending(batch_size: int | None = None) -> int:
+    """
+    Clasifica un lote de posts pendientes.
+
+    Returns:
+        int: Cantidad de posts procesados (0 si no había pendientes).
+    """
+    batch_size = batch_size or get_setting('SENTIMIND_ASYNC_BATCH_SIZE', 16, int)
+    posts = claim_pending(batch_size)
+    if not posts:
+        return 0
+
+    try:
+        analyses = MiningEngine.analyze_batch([post.content for post in posts])
+    except InferenceServerLoading as e:
+        # No es un fallo: se reintentan cuando el servidor termine de cargar
+        print(f"⏳ {e}; {len(posts)} posts vuelven a la cola")
+        release(posts)
+        return 0
+    except Exception as e:
+        print(f"⚠️ Error en análisis por lotes: {e}")
+        traceback.print_exc()
+        analyses = [FALLBACK_ANALYSIS] * len(posts)
+        Metrics.increment('sentimind_classification_fallbacks_total', len(posts), source='worker')
+
+    # Todo el lote en una transacción (como reclassify)
+    with transaction.atomic():
+        saved = bulk_apply_analyses(posts, analyses)
+
+    print(f"✅ {saved} posts clasificados en segundo plano")
+    return len(posts)
+
+
+def release(posts: list[Post]):
+    """Devuelve a "pending" posts tomados por claim_pending() sin clasificarlos."""
+    Post.objects.filter(
+        id__in=[post.id for post in posts],
+        classification_status=Post.STATUS_PROCESSING
+    ).update(classification_status=Post.STATUS_PENDING)
+    PostListCache.invalidate_on_commit()
+
+
+def requeue_processing() -> int:
+    """Devuelve a "pending" los posts que quedaron en "processing" tras una caída."""
+    requeued = Post.objects.filter(
+        classification_status=Post.STATUS_PROCESSING
+    ).update(classification_status=Post.STATUS_PENDING)
+    if requeued:
+        PostListCache.invalidate_on_commit()
+    return requeued
+
+
+class ClassificationWorker:
+    """
+    Pool de hilos en el proceso web que vacía la cola de pendientes.
+    Se despierta con notify() al crear un post y, si no, revisa cada
+    SENTIMIND_ASYNC_POLL_SECONDS por si quedaron pendientes de antes.
+    """
+
+    _threads = []
+    _pid = None
+    _wakeup = threading.Event()
+    _lock = threading.Lock()
+
+    @classmethod
+    def notify(cls):
+        """Arranca el pool si hace falta y avisa que hay trabajo."""
+        cls.start()
+        cls._wakeup.set()
+
+    @classmethod
+    def start(cls):
+        if cls._pid == os.getpid() and any(t.is_alive() for t in cls._threads):
+            return
+        with cls._lock:
+            if cls._pid == os.getpid() and any(t.is_alive() for t in cls._threads):
+                return
+            cls._pid = os.getpid()
+            pool_size = get_setting('SENTIMIND_ASYNC_WORKERS', 1, int)
+            cls._threads = [
+                threading.Thread(
+                    target=cls._run,
+                    name=f"sentimind-classifier-{i}",
+                    daemon=True
+                )
+                for i in range(max(pool_size, 1))
+            ]
+            for thread in cls._threads:
+                thread.start()
+            print(f"🧵 Worker de clasificación iniciado ({len(cls._threads)} hilos)")
+
+    @classmethod
+    def _run(cls):
+        poll_seconds = get_setting('SENTIMIND_ASYNC_POLL_SECONDS', 5.0, float)
+        while True:
+            cls._wakeup.wait(timeout=poll_seconds)
+            cls._wakeup.clear()
+            try:
+                # Vaciar la cola antes de volver a dormir
+                while classify_pending():
+                    pass
+            except Exception as e:
+                print(f"❌ Error en worker de clasificación: {e}")
+                traceback.print_exc()
+            finally:
+                close_old_connections()
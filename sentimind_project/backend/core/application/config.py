@@ -0,0 +1,30 @@
+"""
+Lectura de la configuración del motor de IA.
+Usa los settings de Django si están cargados y, si no (scripts sueltos como
+test_classification.py), cae a las variables de entorno.
+"""
+import os
+
+
+def get_setting(name: str, default=None, cast=str):
+    """
+    Retorna el valor de `name` desde django.conf.settings o desde el entorno.
+
+    Args:
+        name: Nombre del setting / variable de entorno (ej. SENTIMIND_BATCH_MAX_SIZE)
+        default: Valor por defecto si no está definido en ningún lado
+        cast: Función para convertir el valor leído del entorno (str, int, float...)
+    """
+    try:
+        from django.conf import settings
+        if settings.configured and hasattr(settings, name):
+            return getattr(settings, name)
+    except ImportError:
+        pass
+
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    if cast is bool:
+        return value.lower() in ('true', '1', 'yes')
+    return cast(value)
@@ -0,0 +1,257 @@
+"""
+Clasificador destilado: TF-IDF + un modelo lineal por etiqueta, entrenado con
+las etiquetas que el transformer ya guardó en PostCategory (como en
+feelings/example.ipynb, pero multi-label).
+
+Primera etapa del modo "cascade": responde cuando está seguro y solo los
+posts dudosos pasan al transformer.
+
+Requiere scikit-learn (extra opcional `cascade`).
+"""
+from datetime import datetime, timezone
+from pathlib import Path
+import threading
+
+import numpy as np
+
+from core.application.config import get_setting
+
+
+class DistilledClassifier:
+    """
+    Artefacto versionado en SENTIMIND_DISTILLED_DIR:
+        distilled-<versión>.joblib  +  LATEST (versión vigente)
+    """
+
+    METHOD = "distilled-cascade"
+
+    # Solo se entrena con posts etiquetados por el transformer
+    # ('' = posts anteriores a guardar el método)
+    TRAINING_METHODS = ('', 'xlm-roberta-local')
+
+    _artifact = None
+    _loaded_version = None
+    # (directorio, versión) leída de LATEST: se lee una vez por proceso, como el
+    # modelo; un reentrenamiento hecho en otro proceso se toma al reiniciar
+    _latest = None
+    _lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Entrenamiento
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def build_dataset(cls, engine, limit: int | None = None):
+        """
+        Retorna (textos, Y, primarias): Y es una matriz (posts x TAXONOMY) con la
+        confianza guardada de cada etiqueta (0 si no se detectó).
+        """
+        from core.models import Post, PostCategory
+
+        posts = (
+            Post.objects.filter(
+                classification_status=Post.STATUS_DONE,
+                classification_method__in=cls.TRAINING_METHODS
+            )
+            .order_by('-id')
+            .values_list('id', 'content', 'primary_category')
+        )
+        if limit:
+            posts = posts[:limit]
+        posts = list(posts)
+
+        index = {post_id: row for row, (post_id, _, _) in enumerate(posts)}
+        label_index = {label: col for col, label in enumerate(engine.TAXONOMY)}
+        targets = np.zeros((len(posts), len(engine.TAXONOMY)), dtype=np.float32)
+
+        links = PostCategory.objects.filter(post_id__in=list(index)).values_list(
+            'post_id', 'category__name', 'confidence'
+        )
+        for post_id, name, confidence in links.iterator(chunk_size=2000):
+            if name in label_index:
+                targets[index[post_id], label_index[name]] = confidence
+
+        texts = [content for _, content, _ in posts]
+        primaries = [primary for _, _, primary in posts]
+        return texts, targets, primaries
+
+    @classmethod
+    def train(cls, engine, texts, targets, primaries, test_size=0.2, seed=42) -> dict:
+        """
+        Entrena vectorizador + una regresión logística por etiqueta
+        (la confianza del transformer pondera los positivos) y evalúa en un
+        split separado.
+
+        Returns:
+            dict: artefacto listo para save().
+        """
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.model_selection import train_test_split
+
+        indices = np.arange(len(texts))
+        train_idx, test_idx = train_test_split(indices, test_size=test_size, random_state=seed)
+
+        vectorizer = TfidfVectorizer(
+            analyzer='char_wb',
+            ngram_range=(2, 5),
+            min_df=2,
+            max_features=200_000,
+            sublinear_tf=True,
+            lowercase=True
+        )
+        X_train = vectorizer.fit_transform([texts[i] for i in train_idx])
+
+        n_labels = len(engine.TAXONOMY)
+        coef = np.zeros((n_labels, X_train.shape[1]), dtype=np.float32)
+        intercept = np.full(n_labels, -10.0, dtype=np.float32)  # sin ejemplos: nunca se predice
+
+        for col in range(n_labels):
+            y_conf = targets[train_idx, col]
+            y = (y_conf > 0).astype(int)
+            if y.min() == y.max():
+                continue
+            weights = np.where(y == 1, y_conf, 1.0)
+            model = LogisticRegression(max_iter=1000, C=4.0, class_weight='balanced')
+            model.fit(X_train, y, sample_weight=weights)
+            coef[col] = model.coef_[0]
+            intercept[col] = model.intercept_[0]
+
+        artifact = {
+            "version": datetime.now(timezone.utc).strftime('%Y%m%d%H%M%S'),
+            "taxonomy": list(engine.TAXONOMY),
+            "vectorizer": vectorizer,
+            "coef": coef,
+            "intercept": intercept,
+            "train_size": len(train_idx),
+        }
+        artifact["metrics"] = cls.evaluate(
+            engine, artifact,
+            [texts[i] for i in test_idx],
+            [primaries[i] for i in test_idx]
+        )
+        return artifact
+
+    @classmethod
+    def evaluate(cls, engine, artifact, texts, primaries) -> dict:
+        """Coincidencia con el transformer en primary_category, global y en la zona confiable."""
+        if not texts:
+            return {"test_size": 0}
+
+        probs = cls._predict_proba(artifact, texts)
+        labels = np.asarray(artifact["taxonomy"])
+        predicted = labels[probs.argmax(axis=1)]
+        truth = np.asarray(primaries)
+        confident = cls._confident_mask(probs)
+
+        answered = int(confident.sum())
+        return {
+            "test_size": len(texts),
+            "agreement": round(float((predicted == truth).mean()), 4),
+            "coverage": round(answered / len(texts), 4),
+            "confident_agreement": round(
+                float((predicted[confident] == truth[confident]).mean()), 4
+            ) if answered else None,
+            "min_confidence": cls.min_confidence(),
+            "min_margin": cls.min_margin(),
+        }
+
+    # ------------------------------------------------------------------
+    # Persistencia
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def artifact_dir() -> Path:
+        return Path(get_setting('SENTIMIND_DISTILLED_DIR', 'data/distilled'))
+
+    @classmethod
+    def save(cls, artifact: dict) -> Path:
+        import joblib
+
+        directory = cls.artifact_dir()
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"distilled-{artifact['version']}.joblib"
+        joblib.dump(artifact, path, compress=3)
+        (directory / "LATEST").write_text(artifact['version'])
+        cls._latest = (directory, artifact['version'])
+        return path
+
+    @classmethod
+    def active_version(cls) -> str | None:
+        """Versión configurada (SENTIMIND_DISTILLED_VERSION) o la última entrenada."""
+        version = get_setting('SENTIMIND_DISTILLED_VERSION', '')
+        if version:
+            return version
+        directory = cls.artifact_dir()
+        cached = cls._latest
+        if cached is None or cached[0] != directory:
+            latest = directory / "LATEST"
+            cached = (directory, latest.read_text().strip() if latest.exists() else None)
+            cls._latest = cached
+        return cached[1]
+
+    @classmethod
+    def load(cls) -> dict:
+        import joblib
+
+        version = cls.active_version()
+        if version is None:
+            raise RuntimeError("No hay modelo destilado: ejecuta `python manage.py train_distilled`")
+
+        if cls._loaded_version != version:
+            with cls._lock:
+                if cls._loaded_version != version:
+                    path = cls.artifact_dir() / f"distilled-{version}.joblib"
+                    print(f"📦 Cargando clasificador destilado {path.name}...")
+                    cls._artifact = joblib.load(path)
+                    cls._loaded_version = version
+        return cls._artifact
+
+    # ------------------------------------------------------------------
+    # Inferencia
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def min_confidence(cls) -> float:
+        return get_setting('SENTIMIND_CASCADE_MIN_CONFIDENCE', 0.8, float)
+
+    @classmethod
+    def min_margin(cls) -> float:
+        return get_setting('SENTIMIND_CASCADE_MIN_MARGIN', 0.2, float)
+
+    @classmethod
+    def classify(cls, engine, texts: list[str]) -> list[dict | None]:
+        """
+        Returns:
+            list: Resultado con el formato de MiningEngine.analyze() por texto,
+                  o None si el modelo no está seguro y debe ir al transformer.
+        """
+        artifact = cls.load()
+        if artifact["taxonomy"] != list(engine.TAXONOMY):
+            raise RuntimeError("El modelo destilado se entrenó con otra TAXONOMY; reentrenar")
+
+        probs = cls._predict_proba(artifact, texts)
+        confident = cls._confident_mask(probs)
+        labels = np.asarray(artifact["taxonomy"])
+
+        results = []
+        for row, ok in zip(probs, confident):
+            if not ok:
+                results.append(None)
+                continue
+            order = np.argsort(-row)
+            result = engine._build_result(labels[order].tolist(), [float(p) for p in row[order]])
+            result["method"] = cls.METHOD
+            results.append(result)
+        return results
+
+    @staticmethod
+    def _predict_proba(artifact, texts) -> np.ndarray:
+        X = artifact["vectorizer"].transform(texts)
+        logits = np.asarray(X @ artifact["coef"].T) + artifact["intercept"]
+        return 1.0 / (1.0 + np.exp(-logits))
+
+    @classmethod
+    def _confident_mask(cls, probs: np.ndarray) -> np.ndarray:
+        top2 = -np.sort(-probs, axis=1)[:, :2]
+        return (top2[:, 0] >= cls.min_confidence()) & (top2[:, 0] - top2[:, 1] >= cls.min_margin())
@@ -0,0 +1,148 @@
+"""
+Embeddings de oraciones y clasificación rápida por similitud.
+Un post se codifica una sola vez y se compara contra los embeddings
+(precalculados y cacheados en disco) de las hipótesis de TAXONOMY,
+en lugar de las 25 pasadas del cross-encoder NLI.
+"""
+import hashlib
+import json
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from core.application.config import get_setting
+
+
+class EmbeddingEncoder:
+    """
+    Codificador de oraciones (mean pooling + normalización L2).
+    Patrón Singleton para cargar el modelo en memoria una sola vez.
+    """
+
+    DEFAULT_MODEL_NAME = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+    MAX_LENGTH = 256
+
+    _tokenizer = None
+    _model = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def model_name(cls) -> str:
+        return get_setting('SENTIMIND_EMBEDDING_MODEL', cls.DEFAULT_MODEL_NAME)
+
+    @classmethod
+    def load(cls):
+        if cls._model is None:
+            with cls._lock:
+                if cls._model is None:
+                    from transformers import AutoTokenizer, AutoModel
+
+                    model_name = cls.model_name()
+                    print(f"📦 Cargando modelo de embeddings {model_name}...")
+                    cls._tokenizer = AutoTokenizer.from_pretrained(model_name)
+                    model = AutoModel.from_pretrained(model_name)
+                    model.eval()
+                    cls._model = model
+                    print(f"✅ Modelo de embeddings {model_name} cargado!")
+        return cls._tokenizer, cls._model
+
+    @classmethod
+    def encode(cls, texts: list[str]) -> np.ndarray:
+        """Retorna una matriz float32 (len(texts), dim) con filas de norma 1."""
+        import torch
+
+        tokenizer, model = cls.load()
+        with torch.inference_mode():
+            encoded = tokenizer(
+                list(texts),
+                padding=True,
+                truncation=True,
+                max_length=cls.MAX_LENGTH,
+                return_tensors='pt'
+            )
+            hidden = model(**encoded).last_hidden_state
+            mask = encoded['attention_mask'].unsqueeze(-1).to(hidden.dtype)
+            pooled = (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+            pooled = torch.nn.functional.normalize(pooled, p=2, dim=1)
+        return pooled.cpu().numpy().astype(np.float32)
+
+
+class EmbeddingClassifier:
+    """
+    Camino rápido de MiningEngine: similitud coseno post-vs-hipótesis.
+    Si el margen entre las dos mejores etiquetas es menor que
+    SENTIMIND_EMBEDDING_MIN_MARGIN, el post vuelve al camino NLI completo.
+    """
+
+    METHOD = "embedding-fast-path"
+
+    # Temperatura del softmax que convierte similitudes en confianzas 0-1
+    TEMPERATURE = 0.05
+
+    _label_matrix = None
+    _label_fingerprint = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def min_margin(cls) -> float:
+        return get_setting('SENTIMIND_EMBEDDING_MIN_MARGIN', 0.05, float)
+
+    @classmethod
+    def label_matrix(cls, engine) -> np.ndarray:
+        """Embeddings de las hipótesis de TAXONOMY (memoria -> disco -> modelo)."""
+        hypotheses = [engine.HYPOTHESIS_TEMPLATE.format(label) for label in engine.TAXONOMY]
+        fingerprint = hashlib.sha256(json.dumps(
+            [EmbeddingEncoder.model_name(), hypotheses], ensure_ascii=False
+        ).encode('utf-8')).hexdigest()[:16]
+
+        if cls._label_fingerprint == fingerprint:
+            return cls._label_matrix
+
+        with cls._lock:
+            if cls._label_fingerprint != fingerprint:
+                cache_dir = Path(get_setting('SENTIMIND_EMBEDDING_CACHE_DIR', 'data/embeddings'))
+                cache_file = cache_dir / f"labels-{fingerprint}.npy"
+                if cache_file.exists():
+                    matrix = np.load(cache_file)
+                else:
+                    print(f"🧮 Calculando embeddings de {len(hypotheses)} hipótesis...")
+                    matrix = EmbeddingEncoder.encode(hypotheses)
+                    cache_dir.mkdir(parents=True, exist_ok=True)
+                    np.save(cache_file, matrix)
+                cls._label_matrix = matrix
+                cls._label_fingerprint = fingerprint
+
+        return cls._label_matrix
+
+    @classmethod
+    def classify(cls, engine, texts: list[str]) -> list[dict | None]:
+        """
+        Clasifica por similitud.
+
+        Returns:
+            list: Resultado con el formato de MiningEngine.analyze() por texto,
+                  o None si el margen es bajo y debe ir por NLI.
+        """
+        labels = np.asarray(engine.TAXONOMY)
+        similarities = EmbeddingEncoder.encode(texts) @ cls.label_matrix(engine).T
+        margin = cls.min_margin()
+
+        results = []
+        for row in similarities:
+            order = np.argsort(-row)
+            if row[order[0]] - row[order[1]] < margin:
+                results.append(None)
+                continue
+
+            # Softmax con temperatura para tener confianzas comparables
+            exp = np.exp((row - row.max()) / cls.TEMPERATURE)
+            probs = exp / exp.sum()
+            result = engine._build_result(
+                labels[order].tolist(),
+                [float(p) for p in probs[order]]
+            )
+            result["method"] = cls.METHOD
+            results.append(result)
+
+        return results
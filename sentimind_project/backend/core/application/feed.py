@@ -0,0 +1,323 @@
+"""
+Feed en tiempo real de posts nuevos y recién clasificados (Server-Sent Events).
+
+Los eventos salen de la tabla PostEvent, que llenan triggers sobre core_post
+(migración 0011) sin importar qué proceso escribió: workers de gunicorn,
+`classify_pending`, ingesta masiva. Cada proceso que sirve el feed tiene un
+solo FeedHub: un hilo que consulta los eventos nuevos cada
+SENTIMIND_FEED_POLL_SECONDS (una consulta por proceso, no por cliente),
+serializa cada post una vez y reparte los mismos bytes a las suscripciones.
+
+Una suscripción es un objeto chico (filtro de categorías, cola de eventos
+pendientes y un Event para despertarla); con el servidor ASGI cada conexión
+es una corrutina esperando ese Event, así que miles de clientes inactivos
+ocupan pocos KB cada uno. Un cliente que no lee se queda con hasta
+SENTIMIND_FEED_CLIENT_BUFFER eventos; si se pasa, se corta su stream y el
+navegador reconecta con Last-Event-ID.
+
+Reanudación: los eventos entre Last-Event-ID y el momento de suscribirse se
+leen de la tabla (hasta SENTIMIND_FEED_REPLAY_MAX). Si son más, o ya se
+podaron, se envía un evento "reset" para que el cliente recargue el listado.
+"""
+import asyncio
+from collections import deque
+import os
+import threading
+import time
+import traceback
+
+from django.db import close_old_connections, connection
+
+from core.application.config import get_setting
+from core.models import Post, PostEvent
+
+
+# Máximo de eventos por consulta del hub
+BATCH_SIZE = 500
+
+# Reintento que sugiere el servidor al navegador tras un corte (ms)
+RETRY_MS = 3000
+
+_available = None
+
+
+def available() -> bool:
+    """¿Existen los triggers que llenan PostEvent? (se consulta una vez por proceso)"""
+    global _available
+    if _available is None:
+        found = False
+        if connection.vendor == 'sqlite':
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    "SELECT COUNT(*) FROM sqlite_master WHERE type = 'trigger' AND name = 'core_post_event_created'"
+                )
+                found = cursor.fetchone()[0] > 0
+        _available = found
+    return _available
+
+
+def poll_seconds() -> float:
+    return get_setting('SENTIMIND_FEED_POLL_SECONDS', 0.25, float)
+
+
+def heartbeat_seconds() -> float:
+    return get_setting('SENTIMIND_FEED_HEARTBEAT_SECONDS', 15.0, float)
+
+
+class FeedEvent:
+    """Un evento ya formateado como SSE (los bytes se comparten entre clientes)."""
+
+    __slots__ = ('id', 'kind', 'categories', 'payload')
+
+    def __init__(self, event_id: int, kind: str, categories: frozenset, payload: bytes):
+        self.id = event_id
+        self.kind = kind
+        self.categories = categories
+        self.payload = payload
+
+
+def format_event(event_id: int, kind: str, data: bytes) -> bytes:
+    return f"id: {event_id}\nevent: {kind}\ndata: ".encode('utf-8') + data + b"\n\n"
+
+
+def build_events(rows: list[tuple[int, int, str]]) -> list[FeedEvent]:
+    """(id, post_id, kind) -> eventos con el post serializado (dos consultas para todo el lote)."""
+    from core.infrastructure.renderers import FastJSONRenderer
+    from core.infrastructure.serializers import PostRowSerializer
+
+    post_ids = {post_id for _, post_id, _ in rows}
+    posts = PostRowSerializer.values(Post.objects.filter(id__in=post_ids).order_by())
+    data = {post['id']: post for post in PostRowSerializer.serialize(list(posts))}
+
+    renderer = FastJSONRenderer()
+    events = []
+    for event_id, post_id, kind in rows:
+        post = data.get(post_id)
+        if post is None:
+            continue  # Borrado después del evento
+        categories = frozenset(category['name'] for category in post['categories'])
+        events.append(FeedEvent(event_id, kind, categories, format_event(event_id, kind, renderer.render(post))))
+    return events
+
+
+class Subscription:
+    """
+    Un cliente conectado. `loop` es el event loop de su corrutina (ASGI) o
+    None si un hilo espera con threading.Event (WSGI, runserver).
+    """
+
+    __slots__ = ('categories', 'loop', 'start_id', 'pending', 'wakeup', 'overflowed')
+
+    def __init__(self, categories: frozenset, loop=None):
+        self.categories = categories
+        self.loop = loop
+        self.start_id = 0
+        self.pending = deque()
+        self.wakeup = asyncio.Event() if loop is not None else threading.Event()
+        self.overflowed = False
+
+    def matches(self, event: FeedEvent) -> bool:
+        return not self.categories or not self.categories.isdisjoint(event.categories)
+
+
+class FeedHub:
+    """
+    Reparte los eventos nuevos a las suscripciones de este proceso.
+    Patrón Singleton: estado a nivel de clase, protegido por un lock.
+    """
+
+    _subscriptions = {}     # loop (o None) -> set(Subscription)
+    _cursor = 0             # último evento repartido
+    _lock = threading.Lock()
+    _thread = None
+    _pid = None
+
+    @classmethod
+    def subscribe(cls, categories=(), last_event_id: int | None = None, loop=None):
+        """
+        Registra un cliente. Lo posterior a la suscripción le llega en vivo;
+        lo anterior desde `last_event_id` se lee de la tabla.
+
+        Returns:
+            (Subscription, list[FeedEvent]): la suscripción y los eventos a reenviar.
+        """
+        subscription = Subscription(frozenset(categories), loop)
+        with cls._lock:
+            if not cls._count():
+                # Sin clientes el hub no consulta: se arranca desde el último evento
+                cls._cursor = PostEvent.objects.order_by('-id').values_list('id', flat=True).first() or 0
+            subscription.start_id = cls._cursor
+            cls._subscriptions.setdefault(loop, set()).add(subscription)
+        cls.start()
+
+        if last_event_id is None or last_event_id >= subscription.start_id:
+            return subscription, []
+        return subscription, cls._replay(subscription, last_event_id)
+
+    @classmethod
+    def unsubscribe(cls, subscription: Subscription):
+        with cls._lock:
+            group = cls._subscriptions.get(subscription.loop)
+            if group is not None:
+                group.discard(subscription)
+                if not group:
+                    del cls._subscriptions[subscription.loop]
+
+    @classmethod
+    def subscriber_count(cls) -> int:
+        with cls._lock:
+            return cls._count()
+
+    @classmethod
+    def poll(cls) -> int:
+        """Lee los eventos nuevos y los reparte. Retorna cuántos leyó."""
+        with cls._lock:
+            if not cls._count():
+                return 0
+            rows = list(
+                PostEvent.objects.filter(id__gt=cls._cursor).order_by('id')
+                .values_list('id', 'post_id', 'kind')[:BATCH_SIZE]
+            )
+            if not rows:
+                return 0
+            cls._cursor = rows[-1][0]
+            events = build_events(rows)
+            cls._deliver(events)
+        return len(rows)
+
+    @classmethod
+    def start(cls):
+        """Hilo del hub de este proceso (se relanza tras un fork)."""
+        if cls._pid == os.getpid() and cls._thread is not None and cls._thread.is_alive():
+            return
+        with cls._lock:
+            if cls._pid == os.getpid() and cls._thread is not None and cls._thread.is_alive():
+                return
+            cls._pid = os.getpid()
+            cls._thread = threading.Thread(target=cls._run, name="sentimind-feed-hub", daemon=True)
+            cls._thread.start()
+
+    @classmethod
+    def _run(cls):
+        while True:
+            time.sleep(poll_seconds())
+            try:
+                # Hilo de larga vida: respeta CONN_MAX_AGE y descarta conexiones rotas
+                close_old_connections()
+                while cls.poll() >= BATCH_SIZE:
+                    pass
+            except Exception as e:
+                print(f"⚠️ Error leyendo eventos del feed: {e}")
+                traceback.print_exc()
+
+    @classmethod
+    def _replay(cls, subscription: Subscription, last_event_id: int) -> list[FeedEvent]:
+        max_replay = get_setting('SENTIMIND_FEED_REPLAY_MAX', 1000, int)
+        rows = list(
+            PostEvent.objects.filter(id__gt=last_event_id, id__lte=subscription.start_id).order_by('id')
+            .values_list('id', 'post_id', 'kind')[:max_replay + 1]
+        )
+        # AUTOINCREMENT no deja huecos: si falta el siguiente, ya se podó
+        if len(rows) > max_replay or not rows or rows[0][0] != last_event_id + 1:
+            return [FeedEvent(subscription.start_id, 'reset', frozenset(),
+                              format_event(subscription.start_id, 'reset', b'{}'))]
+
+        events = []
+        for start in range(0, len(rows), BATCH_SIZE):
+            events.extend(event for event in build_events(rows[start:start + BATCH_SIZE])
+                          if subscription.matches(event))
+        return events
+
+    @classmethod
+    def _deliver(cls, events: list[FeedEvent]):
+        """Encola los eventos en cada suscripción y la despierta (con el lock tomado)."""
+        max_pending = get_setting('SENTIMIND_FEED_CLIENT_BUFFER', 256, int)
+        for loop, group in cls._subscriptions.items():
+            woken = []
+            for subscription in group:
+                matched = [event for event in events if subscription.matches(event)]
+                if not matched or subscription.overflowed:
+                    continue
+                if len(subscription.pending) + len(matched) > max_pending:
+                    # Cliente lento: se corta y reconecta con Last-Event-ID
+                    subscription.overflowed = True
+                else:
+                    subscription.pending.extend(matched)
+                woken.append(subscription)
+            if not woken:
+                continue
+            if loop is None:
+                for subscription in woken:
+                    subscription.wakeup.set()
+            else:
+                # Un solo salto al event loop por lote, no uno por cliente
+                try:
+                    loop.call_soon_threadsafe(_wake_all, woken)
+                except RuntimeError:
+                    pass  # Loop cerrado: sus corrutinas ya terminaron
+
+    @classmethod
+    def _count(cls) -> int:
+        return sum(len(group) for group in cls._subscriptions.values())
+
+
+def _wake_all(subscriptions):
+    for subscription in subscriptions:
+        subscription.wakeup.set()
+
+
+class EventStream:
+    """
+    Cuerpo SSE para el servidor ASGI: una corrutina por cliente. Django
+    llama a close() al terminar la respuesta (también si el cliente se
+    desconectó), así la suscripción se da de baja aunque el generador quede
+    suspendido.
+    """
+
+    __slots__ = ('subscription', 'replay')
+
+    def __init__(self, subscription: Subscription, replay: list[FeedEvent]):
+        self.subscription = subscription
+        self.replay = replay
+
+    def __aiter__(self):
+        return _stream(self.subscription, self.replay)
+
+    def close(self):
+        FeedHub.unsubscribe(self.subscription)
+
+
+async def _stream(subscription: Subscription, replay: list[FeedEvent]):
+    try:
+        yield f"retry: {RETRY_MS}\n\n".encode('utf-8')
+        for event in replay:
+            yield event.payload
+        while not subscription.overflowed:
+            try:
+                await asyncio.wait_for(subscription.wakeup.wait(), heartbeat_seconds())
+            except TimeoutError:
+                # Comentario SSE: mantiene viva la conexión a través de proxies
+                yield b": ping\n\n"
+                continue
+            subscription.wakeup.clear()
+            while subscription.pending:
+                yield subscription.pending.popleft().payload
+    finally:
+        FeedHub.unsubscribe(subscription)
+
+
+def stream_sync(subscription: Subscription, replay: list[FeedEvent]):
+    """Mismo cuerpo para servidores WSGI (ocupa un hilo por cliente: solo desarrollo)."""
+    try:
+        yield f"retry: {RETRY_MS}\n\n".encode('utf-8')
+        for event in replay:
+            yield event.payload
+        while not subscription.overflowed:
+            if not subscription.wakeup.wait(heartbeat_seconds()):
+                yield b": ping\n\n"
+                continue
+            subscription.wakeup.clear()
+            while subscription.pending:
+                yield subscription.pending.popleft().payload
+    finally:
+        FeedHub.unsubscribe(subscription)
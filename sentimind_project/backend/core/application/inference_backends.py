@@ -0,0 +1,230 @@
+"""
+Backends de inferencia para MiningEngine.
+Cada backend sabe construir el pipeline zero-shot de transformers sobre un
+runtime distinto; MiningEngine solo elige cuál usar.
+
+- torch:      PyTorch fp32 en CPU (comportamiento original)
+- torch-int8: PyTorch con cuantización dinámica int8 de las capas Linear
+- onnx:       ONNX Runtime (requiere `optimum[onnxruntime]` y, idealmente,
+              haber exportado el modelo con `python manage.py export_model`)
+- stub:       sustituto determinista sin pesos ni red (benchmarks y desarrollo)
+
+Se elige con SENTIMIND_INFERENCE_BACKEND (settings o variable de entorno).
+
+transformers/torch se importan dentro de load(): importar este módulo (y con
+él las vistas) no carga el stack de ML, así migrate, collectstatic y el resto
+de comandos arrancan rápido.
+"""
+from pathlib import Path
+
+from core.application.config import get_setting
+from core.application.tokenization import use_fast_tokenizer
+
+
+def load_tokenizer(model_name: str):
+    """
+    Tokenizer rápido si da los mismos token IDs que el de sentencepiece
+    (ver core/application/tokenization.py); si no, sentencepiece como el original.
+    """
+    from transformers import AutoTokenizer
+
+    use_fast = use_fast_tokenizer(model_name)
+    print(f"📦 Cargando tokenizer {'rápido' if use_fast else 'sentencepiece'} para {model_name}...")
+    return AutoTokenizer.from_pretrained(
+        model_name,
+        use_fast=use_fast,
+        local_files_only=False
+    )
+
+
+def onnx_model_dir(model_name: str) -> Path:
+    """Carpeta donde export_model deja el modelo ONNX de `model_name`."""
+    base = get_setting('SENTIMIND_ONNX_DIR', 'data/onnx')
+    return Path(base) / model_name.replace('/', '__')
+
+
+class TorchBackend:
+    """PyTorch fp32 en CPU."""
+
+    name = "torch"
+
+    def load(self, model_name: str):
+        from transformers import pipeline
+
+        tokenizer = load_tokenizer(model_name)
+        print(f"📦 Cargando modelo {model_name} (PyTorch fp32)...")
+        return pipeline(
+            "zero-shot-classification",
+            model=model_name,
+            tokenizer=tokenizer,
+            device=-1  # CPU
+        )
+
+
+class QuantizedTorchBackend:
+    """PyTorch con cuantización dinámica int8 (pesos de Linear en int8, activaciones en fp32)."""
+
+    name = "torch-int8"
+
+    def load(self, model_name: str):
+        import torch
+        from transformers import AutoModelForSequenceClassification, pipeline
+
+        tokenizer = load_tokenizer(model_name)
+        print(f"📦 Cargando modelo {model_name} (PyTorch int8 dinámico)...")
+        model = AutoModelForSequenceClassification.from_pretrained(model_name)
+        model.eval()
+        model = torch.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+        return pipeline(
+            "zero-shot-classification",
+            model=model,
+            tokenizer=tokenizer,
+            device=-1
+        )
+
+
+class OnnxBackend:
+    """ONNX Runtime en CPU (fp32 o el modelo int8 generado por export_model --quantize)."""
+
+    name = "onnx"
+    QUANTIZED_NAME = "onnx-int8"
+
+    def load(self, model_name: str):
+        try:
+            from optimum.onnxruntime import ORTModelForSequenceClassification
+        except ImportError as e:
+            raise RuntimeError(
+                "El backend 'onnx' requiere optimum[onnxruntime]: "
+                "uv pip install 'optimum[onnxruntime]'"
+            ) from e
+        from transformers import pipeline
+
+        tokenizer = load_tokenizer(model_name)
+        export_dir = onnx_model_dir(model_name)
+
+        if get_setting('SENTIMIND_ONNX_QUANTIZED', False, bool):
+            file_name = "model_quantized.onnx"
+            # Sin el export int8 se falla en vez de servir fp32 con la huella de int8
+            if not (export_dir / file_name).exists():
+                raise RuntimeError(
+                    f"SENTIMIND_ONNX_QUANTIZED=True pero no existe {export_dir / file_name}: "
+                    f"ejecuta `python manage.py export_model --quantize`"
+                )
+            # Otros resultados que fp32: nombre propio para la huella de la caché y /ready
+            self.name = self.QUANTIZED_NAME
+        elif (export_dir / "model.onnx").exists():
+            file_name = "model.onnx"
+        else:
+            file_name = None
+
+        if file_name:
+            print(f"📦 Cargando modelo ONNX {export_dir / file_name}...")
+            model = ORTModelForSequenceClassification.from_pretrained(
+                export_dir, file_name=file_name
+            )
+        else:
+            print(f"⚠️ No hay export en {export_dir}, exportando a ONNX en memoria "
+                  f"(usa `python manage.py export_model` para no repetirlo)...")
+            model = ORTModelForSequenceClassification.from_pretrained(model_name, export=True)
+
+        return pipeline(
+            "zero-shot-classification",
+            model=model,
+            tokenizer=tokenizer
+        )
+
+
+class StubTokenizer:
+    """Tokenizer del backend stub: un token por palabra."""
+
+    is_fast = True
+
+    def __call__(self, texts, add_special_tokens=True):
+        extra = 2 if add_special_tokens else 0
+        return {"input_ids": [[0] * (len(text.split()) + extra) for text in texts]}
+
+
+class StubClassifier:
+    """
+    Pipeline zero-shot de mentira: scores deterministas por (texto, etiqueta) y
+    un costo de CPU que crece con pares x largo con relleno, como el modelo
+    real. Sirve para medir todo lo que rodea a la inferencia (batching,
+    buckets, caché, API) sin descargar pesos.
+    """
+
+    # Ancho y capas de la "red" (unos ms por pasada de 8 textos cortos)
+    HIDDEN = 128
+    LAYERS = 2
+    # Tokens de la hipótesis y especiales que se suman a cada par
+    PAIR_OVERHEAD = 8
+
+    def __init__(self):
+        import numpy as np
+
+        self._np = np
+        self.tokenizer = StubTokenizer()
+        self._weights = np.random.default_rng(0).standard_normal((self.HIDDEN, self.HIDDEN)).astype(np.float32) * 0.05
+
+    def __call__(self, texts, labels, hypothesis_template=None, multi_label=True, batch_size=None):
+        import hashlib
+
+        single = isinstance(texts, str)
+        texts = [texts] if single else list(texts)
+        np = self._np
+
+        # Costo: matmul sobre (pares x largo máximo) como un encoder con padding
+        longest = max((len(text.split()) for text in texts), default=0) + self.PAIR_OVERHEAD
+        hidden = np.ones((len(texts) * len(labels) * longest, self.HIDDEN), dtype=np.float32)
+        for _ in range(self.LAYERS):
+            hidden = np.tanh(hidden @ self._weights)
+
+        outputs = []
+        for text in texts:
+            scores = {}
+            for label in labels:
+                digest = hashlib.blake2b(f"{label}\x00{text}".encode('utf-8'), digest_size=4).digest()
+                scores[label] = int.from_bytes(digest, 'big') / 2 ** 32
+            ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+            outputs.append({
+                "sequence": text,
+                "labels": [label for label, _ in ranked],
+                "scores": [score for _, score in ranked],
+            })
+        return outputs[0] if single else outputs
+
+
+class StubBackend:
+    """Sustituto sin red del modelo (benchmarks, desarrollo del frontend)."""
+
+    name = "stub"
+
+    def load(self, model_name: str):
+        print(f"📦 Cargando clasificador stub en lugar de {model_name} (sin pesos)...")
+        return StubClassifier()
+
+
+BACKENDS = {
+    backend.name: backend
+    for backend in (TorchBackend, QuantizedTorchBackend, OnnxBackend, StubBackend)
+}
+
+
+def configured_backend_name() -> str:
+    """Backend de SENTIMIND_INFERENCE_BACKEND con la variante que cargará ("onnx-int8")."""
+    name = get_setting('SENTIMIND_INFERENCE_BACKEND', TorchBackend.name)
+    if name == OnnxBackend.name and get_setting('SENTIMIND_ONNX_QUANTIZED', False, bool):
+        return OnnxBackend.QUANTIZED_NAME
+    return name
+
+
+def get_backend(name: str | None = None):
+    """Instancia el backend `name` (o el configurado en SENTIMIND_INFERENCE_BACKEND)."""
+    name = name or get_setting('SENTIMIND_INFERENCE_BACKEND', TorchBackend.name)
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError(
+            f"Backend de inferencia desconocido: '{name}'. Opciones: {', '.join(BACKENDS)}"
+        )
@@ -0,0 +1,83 @@
+"""
+Versión del listado de posts y caché de la primera página.
+Cada escritura de posts (al confirmarse la transacción) genera una versión
+nueva en el caché de Django: de ella salen el ETag/Last-Modified de
+GET /api/posts/ y las claves de la primera página cacheada, así invalidar
+es cambiar la versión.
+
+Con varios workers de gunicorn el caché debe ser compartido (backend de
+archivos, el de por defecto en settings); con locmem cada proceso tendría
+su propia versión y podría responder 304 con datos viejos.
+"""
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+from core.application.config import get_setting
+
+
+class PostListCache:
+
+    VERSION_KEY = 'sentimind:posts:version'
+    PAGE_KEY = 'sentimind:posts:page:{version}:{digest}'
+
+    @classmethod
+    def version(cls) -> tuple[str, int]:
+        """(token, timestamp unix) de la última escritura conocida."""
+        current = cache.get(cls.VERSION_KEY)
+        if current is None:
+            current = cls._new_version()
+            # add(): si otro worker la creó primero, se usa la suya
+            if not cache.add(cls.VERSION_KEY, current, timeout=None):
+                current = cache.get(cls.VERSION_KEY, current)
+        return current
+
+    @classmethod
+    def invalidate(cls):
+        cache.set(cls.VERSION_KEY, cls._new_version(), timeout=None)
+
+    @classmethod
+    def invalidate_on_commit(cls):
+        """Invalida cuando la escritura ya es visible (antes, un lector cachearía datos viejos con la versión nueva)."""
+        transaction.on_commit(cls.invalidate)
+
+    @classmethod
+    def etag(cls, url: str) -> str:
+        token, _ = cls.version()
+        return f'"{token}-{cls._digest(url)[:16]}"'
+
+    @classmethod
+    def last_modified(cls) -> int:
+        return cls.version()[1]
+
+    # ------------------------------------------------------------------
+    # Primera página (opt-in: SENTIMIND_LIST_CACHE)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def enabled() -> bool:
+        return get_setting('SENTIMIND_LIST_CACHE', False, bool)
+
+    @classmethod
+    def get_page(cls, url: str):
+        return cache.get(cls._page_key(url))
+
+    @classmethod
+    def set_page(cls, url: str, data):
+        cache.set(cls._page_key(url), data, timeout=get_setting('SENTIMIND_LIST_CACHE_TTL', 60, int))
+
+    @classmethod
+    def _page_key(cls, url: str) -> str:
+        token, _ = cls.version()
+        return cls.PAGE_KEY.format(version=token, digest=cls._digest(url))
+
+    @staticmethod
+    def _digest(url: str) -> str:
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _new_version() -> tuple[str, int]:
+        now = time.time_ns()
+        return f"{now:x}", now // 1_000_000_000
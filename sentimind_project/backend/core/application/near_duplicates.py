@@ -0,0 +1,250 @@
+"""
+Índice de casi-duplicados para reutilizar clasificaciones de reposts.
+
+La caché por hash (classification_cache.py) solo acierta si el texto
+normalizado es idéntico; un repost con otra puntuación, un emoji o una
+palabra cambiada vuelve a pagar las 25 hipótesis. Acá cada post
+clasificado se resume en un SimHash de 64 bits (palabras y pares de
+palabras): textos parecidos difieren en pocos bits. Si un post nuevo queda
+a distancia de Hamming <= SENTIMIND_NEAR_DUP_MAX_DISTANCE de uno ya
+clasificado, se reutiliza ese resultado con "method": "reused".
+
+Búsqueda (LSH por bandas): los 64 bits se parten en distancia+1 bandas;
+por el principio del palomar dos huellas a esa distancia o menos coinciden
+por completo en al menos una banda, así que solo se comparan los posts que
+comparten alguna banda con el nuevo.
+
+Memoria acotada: LRU de SENTIMIND_NEAR_DUP_MAX_ENTRIES posts recientes por
+proceso; al pasarse se desalojan los más viejos (y sus bandas). Se vacía
+solo si cambia la huella de modelo/taxonomía/umbrales de la caché.
+
+Los falsos reusos (casi-duplicados que el modelo clasificaría distinto, ej.
+una negación) se miden con `python manage.py audit_reuse`.
+"""
+from collections import OrderedDict
+import copy
+import hashlib
+import re
+import threading
+
+from core.application.classification_cache import ClassificationCache, normalize_text
+from core.application.config import get_setting
+
+
+# Palabras del texto normalizado: puntuación y emojis no cuentan
+_WORD = re.compile(r'\w+', re.UNICODE)
+
+BITS = 64
+
+
+def words(text: str) -> list[str]:
+    return _WORD.findall(normalize_text(text))
+
+
+def features(tokens: list[str]) -> list[str]:
+    """Palabras y pares de palabras consecutivas (el orden importa un poco)."""
+    return tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+
+
+def simhash(text: str) -> int | None:
+    """
+    SimHash de 64 bits del texto, o None si tiene menos de MIN_WORDS
+    palabras (en textos tan cortos una palabra mueve demasiados bits; esos
+    reposts los cubre la caché exacta).
+    """
+    tokens = words(text)
+    if len(tokens) < NearDuplicateIndex.MIN_WORDS:
+        return None
+    # Import diferido: numpy solo se carga si el reuso de casi-duplicados está activo
+    import numpy as np
+
+    feats = features(tokens)
+    digests = b''.join(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest() for feature in feats)
+    # Bits de cada hash (fila) -> votos por posición; gana el bit de la mayoría
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8).reshape(len(feats), 8), axis=1, bitorder='little')
+    majority = bits.sum(axis=0, dtype=np.int32) * 2 > len(feats)
+    return int.from_bytes(np.packbits(majority, bitorder='little').tobytes(), 'little')
+
+
+def distance(a: int, b: int) -> int:
+    """Distancia de Hamming entre dos SimHash."""
+    return (a ^ b).bit_count()
+
+
+def band_masks(max_distance: int) -> list[tuple[int, int]]:
+    """(desplazamiento, máscara) de cada una de las max_distance+1 bandas."""
+    count = max(1, min(max_distance + 1, BITS))
+    bands = []
+    start = 0
+    for i in range(count):
+        width = BITS // count + (1 if i < BITS % count else 0)
+        bands.append((start, (1 << width) - 1))
+        start += width
+    return bands
+
+
+class NearDuplicateIndex:
+    """
+    SimHash de los posts clasificados recientemente -> su resultado.
+    Patrón Singleton: estado a nivel de clase, protegido por un lock.
+    """
+
+    # Valor de "method" para resultados reutilizados
+    METHOD = "reused"
+
+    # Palabras mínimas para buscar/indexar un texto
+    MIN_WORDS = 4
+
+    _entries = OrderedDict()    # simhash -> resultado
+    _bands = []                 # por banda: {valor de la banda: set(simhash)}
+    _band_config = None
+    _fingerprint = None
+    _lock = threading.Lock()
+
+    # Contadores del proceso actual
+    stats_counters = {"lookups": 0, "reused": 0, "skipped": 0, "evictions": 0}
+
+    @staticmethod
+    def enabled() -> bool:
+        return get_setting('SENTIMIND_NEAR_DUP_ENABLED', False, bool)
+
+    @staticmethod
+    def max_distance() -> int:
+        return get_setting('SENTIMIND_NEAR_DUP_MAX_DISTANCE', 6, int)
+
+    @staticmethod
+    def max_entries() -> int:
+        return get_setting('SENTIMIND_NEAR_DUP_MAX_ENTRIES', 4096, int)
+
+    @staticmethod
+    def reusable(result: dict) -> bool:
+        """Solo se indexan clasificaciones reales (no reusos ni fallbacks)."""
+        method = str(result.get("method") or "")
+        return method != NearDuplicateIndex.METHOD and not method.startswith("fallback")
+
+    @classmethod
+    def find_many(cls, engine, texts: list[str]) -> dict:
+        """
+        Busca un post ya clasificado cerca de cada texto.
+
+        Returns:
+            dict: {índice: resultado con "method": "reused"} solo para los aciertos.
+        """
+        hashes = [simhash(text) for text in texts]
+        max_distance = cls.max_distance()
+        found = {}
+
+        with cls._lock:
+            cls._check_fingerprint(engine)
+            cls._check_bands(max_distance)
+            for i, value in enumerate(hashes):
+                if value is None:
+                    cls.stats_counters["skipped"] += 1
+                    continue
+                cls.stats_counters["lookups"] += 1
+                match = cls._nearest(value, max_distance)
+                if match is None:
+                    continue
+                source, dist = match
+                cls._entries.move_to_end(source)
+                result = copy.deepcopy(cls._entries[source])
+                result["reused_method"] = result.get("method")
+                result["reuse_distance"] = dist
+                result["method"] = cls.METHOD
+                found[i] = result
+                cls.stats_counters["reused"] += 1
+        return found
+
+    @classmethod
+    def add_many(cls, engine, texts: list[str], results: list[dict]):
+        """Indexa los resultados de clasificaciones reales (el LRU desaloja los más viejos)."""
+        items = [
+            (simhash(text), result) for text, result in zip(texts, results)
+            if result is not None and cls.reusable(result)
+        ]
+        max_entries = cls.max_entries()
+
+        with cls._lock:
+            cls._check_fingerprint(engine)
+            cls._check_bands(cls.max_distance())
+            for value, result in items:
+                if value is None:
+                    continue
+                if value in cls._entries:
+                    cls._entries.move_to_end(value)
+                else:
+                    cls._add_bands(value)
+                cls._entries[value] = result
+            while len(cls._entries) > max(max_entries, 0):
+                oldest, _ = cls._entries.popitem(last=False)
+                cls._remove_bands(oldest)
+                cls.stats_counters["evictions"] += 1
+
+    @classmethod
+    def stats(cls) -> dict:
+        """Búsquedas, reusos y tamaño del índice en este proceso."""
+        with cls._lock:
+            counters = dict(cls.stats_counters)
+            size = len(cls._entries)
+        return {
+            **counters,
+            "reuse_ratio": round(counters["reused"] / counters["lookups"], 4) if counters["lookups"] else 0.0,
+            "size": size,
+            "max_size": cls.max_entries(),
+            "max_distance": cls.max_distance(),
+        }
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._entries.clear()
+            cls._bands = [{} for _ in cls._bands]
+
+    @classmethod
+    def _nearest(cls, value: int, max_distance: int) -> tuple[int, int] | None:
+        """(simhash, distancia) del candidato más cercano dentro de max_distance."""
+        best = None
+        seen = set()
+        for (shift, mask), buckets in zip(cls._band_config, cls._bands):
+            for candidate in buckets.get(value >> shift & mask, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                dist = distance(value, candidate)
+                if dist <= max_distance and (best is None or dist < best[1]):
+                    best = (candidate, dist)
+        return best
+
+    @classmethod
+    def _add_bands(cls, value: int):
+        for (shift, mask), buckets in zip(cls._band_config, cls._bands):
+            buckets.setdefault(value >> shift & mask, set()).add(value)
+
+    @classmethod
+    def _remove_bands(cls, value: int):
+        for (shift, mask), buckets in zip(cls._band_config, cls._bands):
+            key = value >> shift & mask
+            bucket = buckets.get(key)
+            if bucket is not None:
+                bucket.discard(value)
+                if not bucket:
+                    del buckets[key]
+
+    @classmethod
+    def _check_bands(cls, max_distance: int):
+        """Rearma las bandas si cambió la distancia máxima (llamar con el lock tomado)."""
+        config = band_masks(max_distance)
+        if config != cls._band_config:
+            cls._band_config = config
+            cls._bands = [{} for _ in config]
+            for value in cls._entries:
+                cls._add_bands(value)
+
+    @classmethod
+    def _check_fingerprint(cls, engine):
+        """Cambió modelo/taxonomía/umbrales: los resultados guardados ya no sirven (con el lock tomado)."""
+        fingerprint = ClassificationCache.fingerprint(engine)
+        if fingerprint != cls._fingerprint:
+            cls._entries.clear()
+            cls._bands = [{} for _ in cls._bands]
+            cls._fingerprint = fingerprint
@@ -0,0 +1,232 @@
+"""
+Servicio de escritura de posts.
+Persiste el resultado de MiningEngine.analyze() sobre un Post (categoría
+principal + filas PostCategory) y actualiza los contadores de estadísticas
+en la misma transacción. Lo usan la vista y el worker asíncrono.
+"""
+from core.application.ai_service import MiningEngine
+from core.application import stats_service
+from core.application.category_registry import CategoryRegistry
+from core.application.list_cache import PostListCache
+from core.domain.categories import category_mask
+from core.models import Post, Category, PostCategory
+
+
+# Resultado usado cuando la IA falla: el post se guarda igual
+FALLBACK_ANALYSIS = {
+    "categories": [{"name": "Reflexión", "confidence": 0.5}],
+    "primary_category": "Reflexión",
+    "primary_confidence": 0.5,
+    "method": "fallback-error"
+}
+
+
+def create_post(content: str, analysis: dict) -> Post:
+    """
+    Crea un Post ya clasificado junto con sus relaciones de categorías:
+    un INSERT del post y un bulk_create de PostCategory.
+    """
+    post = Post.objects.create(
+        content=content,
+        primary_category=analysis['primary_category'],
+        primary_confidence=analysis['primary_confidence'],
+        classification_status=_status_for(analysis),
+        classification_method=analysis.get('method', ''),
+        category_mask=_mask_for(analysis)
+    )
+    _create_post_categories(post, analysis)
+    stats_service.record([(post.created_at, analysis)])
+    PostListCache.invalidate_on_commit()
+    _index_vectors([post])
+    return post
+
+
+def create_pending_post(content: str) -> Post:
+    """Crea un Post sin clasificar; el worker lo completará después."""
+    post = Post.objects.create(
+        content=content,
+        classification_status=Post.STATUS_PENDING
+    )
+    PostListCache.invalidate_on_commit()
+    _index_vectors([post])
+    return post
+
+
+def bulk_create_posts(contents: list[str], analyses: list[dict] | None = None) -> list[Post]:
+    """
+    Crea muchos posts con un bulk_create de Post y otro de PostCategory.
+    Sin `analyses` los posts quedan en "pending" para el worker asíncrono.
+    Llamar dentro de transaction.atomic().
+    """
+    PostListCache.invalidate_on_commit()
+    if analyses is None:
+        posts = Post.objects.bulk_create(
+            [Post(content=content, classification_status=Post.STATUS_PENDING) for content in contents],
+            batch_size=500
+        )
+        _index_vectors(posts)
+        return posts
+
+    posts = Post.objects.bulk_create(
+        [
+            Post(
+                content=content,
+                primary_category=analysis['primary_category'],
+                primary_confidence=analysis['primary_confidence'],
+                classification_status=_status_for(analysis),
+                classification_method=analysis.get('method', ''),
+                category_mask=_mask_for(analysis)
+            )
+            for content, analysis in zip(contents, analyses)
+        ],
+        batch_size=500
+    )
+
+    ids = CategoryRegistry.ids_for(cat['name'] for analysis in analyses for cat in analysis['categories'])
+    links = [
+        [
+            PostCategory(
+                post=post,
+                category=Category(id=ids[cat['name']], name=cat['name']),
+                confidence=cat['confidence']
+            )
+            for cat in analysis['categories']
+        ]
+        for post, analysis in zip(posts, analyses)
+    ]
+    PostCategory.objects.bulk_create([link for post_links in links for link in post_links], batch_size=500)
+
+    # Igual que create_post(): serializar los posts no vuelve a consultar la base
+    for post, post_links in zip(posts, links):
+        post_links.sort(key=lambda link: -link.confidence)
+        post._prefetched_objects_cache = {'post_categories': post_links}
+    stats_service.record((post.created_at, analysis) for post, analysis in zip(posts, analyses))
+    _index_vectors(posts)
+    return posts
+
+
+def apply_analysis(post: Post, analysis: dict) -> Post:
+    """Completa un Post pendiente con el resultado de la IA (si se borró mientras tanto, no hace nada)."""
+    created_at = stats_service.unrecord_posts([post.id]).get(post.id)
+    if created_at is None:
+        return post
+    post.primary_category = analysis['primary_category']
+    post.primary_confidence = analysis['primary_confidence']
+    post.classification_status = _status_for(analysis)
+    post.classification_method = analysis.get('method', '')
+    post.category_mask = _mask_for(analysis)
+    post.save(update_fields=['primary_category', 'primary_confidence', 'classification_status',
+                             'classification_method', 'category_mask'])
+
+    # Un reintento no debe duplicar relaciones
+    post.post_categories.all().delete()
+    _create_post_categories(post, analysis)
+    stats_service.record([(created_at, analysis)])
+    PostListCache.invalidate_on_commit()
+    return post
+
+
+def bulk_apply_analyses(posts: list[Post], analyses: list[dict]):
+    """
+    Versión por lotes de apply_analysis(): un bulk_update de los posts,
+    un DELETE de sus relaciones anteriores y un bulk_create de las nuevas.
+    Los posts borrados mientras se clasificaban se saltean.
+    Llamar dentro de transaction.atomic().
+
+    Returns:
+        int: Posts actualizados.
+    """
+    created_at = stats_service.unrecord_posts([post.id for post in posts])
+    pairs = [(post, analysis) for post, analysis in zip(posts, analyses) if post.id in created_at]
+    if not pairs:
+        return 0
+    posts, analyses = [post for post, _ in pairs], [analysis for _, analysis in pairs]
+    ids = CategoryRegistry.ids_for(cat['name'] for analysis in analyses for cat in analysis['categories'])
+
+    links = []
+    for post, analysis in zip(posts, analyses):
+        post.primary_category = analysis['primary_category']
+        post.primary_confidence = analysis['primary_confidence']
+        post.classification_status = _status_for(analysis)
+        post.classification_method = analysis.get('method', '')
+        post.category_mask = _mask_for(analysis)
+        links.extend(
+            PostCategory(post=post, category_id=ids[cat['name']], confidence=cat['confidence'])
+            for cat in analysis['categories']
+        )
+
+    Post.objects.bulk_update(
+        posts,
+        ['primary_category', 'primary_confidence', 'classification_status',
+         'classification_method', 'category_mask'],
+        batch_size=500
+    )
+    PostCategory.objects.filter(post__in=posts).delete()
+    PostCategory.objects.bulk_create(links, batch_size=500)
+    stats_service.record((created_at[post.id], analysis) for post, analysis in pairs)
+    PostListCache.invalidate_on_commit()
+    return len(posts)
+
+
+def rebuild_category_masks(chunk_size=2000) -> int:
+    """
+    Recalcula Post.category_mask desde PostCategory (tras cambiar el orden o
+    el contenido de TAXONOMY).
+
+    Returns:
+        int: Posts actualizados.
+    """
+    updated = 0
+    last_id = 0
+    while True:
+        ids = list(
+            Post.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:chunk_size]
+        )
+        if not ids:
+            PostListCache.invalidate_on_commit()
+            return updated
+
+        names = {post_id: [] for post_id in ids}
+        for post_id, name in PostCategory.objects.filter(post_id__in=ids).values_list('post_id', 'category__name'):
+            names[post_id].append(name)
+
+        posts = [
+            Post(id=post_id, category_mask=category_mask(post_names, MiningEngine.TAXONOMY))
+            for post_id, post_names in names.items()
+        ]
+        Post.objects.bulk_update(posts, ['category_mask'])
+        updated += len(posts)
+        last_id = ids[-1]
+
+
+def _index_vectors(posts: list[Post]):
+    # Import diferido: numpy solo entra al crear el primer post
+    from core.application.vector_index import index_on_commit
+    index_on_commit(posts)
+
+
+def _mask_for(analysis: dict) -> int:
+    return category_mask((cat['name'] for cat in analysis['categories']), MiningEngine.TAXONOMY)
+
+
+def _status_for(analysis: dict) -> str:
+    if analysis.get('method') == FALLBACK_ANALYSIS['method']:
+        return Post.STATUS_FAILED
+    return Post.STATUS_DONE
+
+
+def _create_post_categories(post: Post, analysis: dict):
+    ids = CategoryRegistry.ids_for(cat['name'] for cat in analysis['categories'])
+    links = PostCategory.objects.bulk_create([
+        PostCategory(
+            post=post,
+            category=Category(id=ids[cat['name']], name=cat['name']),
+            confidence=cat['confidence']
+        )
+        for cat in analysis['categories']
+    ])
+
+    # Dejar las relaciones como si vinieran de prefetch_related: serializar
+    # la respuesta no vuelve a consultar la base de datos
+    links.sort(key=lambda link: -link.confidence)
+    post._prefetched_objects_cache = {'post_categories': links}
@@ -0,0 +1,88 @@
+"""
+Escritura agrupada (group commit) de posts ya clasificados.
+
+Con SQLite hay un solo escritor a la vez y cada COMMIT paga un fsync: con
+muchos requests creando posts al mismo tiempo, cada uno espera su turno
+para una transacción propia. Con SENTIMIND_WRITE_BATCH_WINDOW_MS > 0 los
+requests concurrentes encolan su (contenido, análisis) y un hilo escritor
+los inserta juntos (un bulk_create de Post y otro de PostCategory) en una
+sola transacción corta. Cada request recibe su Post como con create_post().
+
+La clasificación ya ocurrió antes: acá solo hay escrituras.
+"""
+import threading
+import traceback
+
+from django.db import close_old_connections, transaction
+
+from core.application.batching import MicroBatcher
+from core.application.config import get_setting
+from core.application.post_service import bulk_create_posts, create_post
+from core.application.telemetry import stage
+
+
+class PostWriter:
+
+    _batcher = None
+    _batcher_config = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def window_ms() -> float:
+        return get_setting('SENTIMIND_WRITE_BATCH_WINDOW_MS', 0.0, float)
+
+    @classmethod
+    def create(cls, content: str, analysis: dict):
+        """Guarda un post clasificado en su propia transacción o agrupado con otros requests."""
+        with stage('write'):
+            batcher = cls.get_batcher()
+            if batcher is None:
+                with transaction.atomic():
+                    return create_post(content, analysis)
+
+            result = batcher.submit((content, analysis))
+            if isinstance(result, Exception):
+                raise result
+            return result
+
+    @classmethod
+    def get_batcher(cls):
+        """MicroBatcher del escritor, o None si el group commit está desactivado."""
+        window_ms = cls.window_ms()
+        if window_ms <= 0:
+            return None
+
+        config = (window_ms, get_setting('SENTIMIND_WRITE_BATCH_MAX_SIZE', 64, int))
+        if cls._batcher is None or cls._batcher_config != config:
+            with cls._lock:
+                if cls._batcher is None or cls._batcher_config != config:
+                    cls._batcher = MicroBatcher(cls._write, window_ms=config[0], max_batch_size=config[1])
+                    cls._batcher_config = config
+        return cls._batcher
+
+    @staticmethod
+    def _write(items: list[tuple[str, dict]]) -> list:
+        """
+        Inserta el grupo en una transacción. Si falla, reintenta cada post en
+        la suya: un post con problemas no tumba a los demás (su request recibe
+        la excepción).
+        """
+        # Hilo de larga vida: respeta CONN_MAX_AGE y descarta conexiones rotas
+        close_old_connections()
+        contents = [content for content, _ in items]
+        analyses = [analysis for _, analysis in items]
+        try:
+            with transaction.atomic():
+                return bulk_create_posts(contents, analyses)
+        except Exception as e:
+            print(f"⚠️ Falló la escritura agrupada de {len(items)} posts, reintentando uno por uno: {e}")
+
+        results = []
+        for content, analysis in items:
+            try:
+                with transaction.atomic():
+                    results.append(create_post(content, analysis))
+            except Exception as e:
+                traceback.print_exc()
+                results.append(e)
+        return results
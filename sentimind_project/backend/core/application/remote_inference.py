@@ -0,0 +1,341 @@
+"""
+Servidor de inferencia compartido y su cliente.
+
+Con SENTIMIND_INFERENCE_SERVER definido, un solo proceso
+(`python manage.py inference_server`) tiene el modelo en memoria y los
+workers web le mandan los textos por un socket Unix o un puerto local:
+los workers ya no cargan pesos (escalan sin multiplicar la memoria del
+modelo) y los requests de todos ellos se agrupan en las mismas pasadas.
+
+Protocolo: cada mensaje es un JSON precedido por su largo (4 bytes, big
+endian). Pedidos {"op": "infer", "texts": [...]} o {"op": "ping"};
+respuestas {"ok": true, ...} o {"ok": false, "error": "..."}. Mientras
+el servidor carga el modelo responde al instante {"ok": false,
+"loading": true}: los workers no esperan el timeout ni cargan su propia
+copia del modelo.
+Una conexión se reutiliza para muchos pedidos (una por hilo del worker).
+
+Direcciones: "unix:/ruta/al.sock" o "host:puerto" (solo localhost o red
+privada: el servidor no tiene autenticación).
+"""
+import json
+import os
+import socket
+import socketserver
+import struct
+import threading
+import time
+
+from core.application.batching import MicroBatcher
+from core.application.config import get_setting
+
+
+# Largo máximo de un mensaje (protege al servidor de basura en el socket)
+MAX_MESSAGE_BYTES = 16 * 1024 * 1024
+
+_HEADER = struct.Struct('>I')
+
+
+class InferenceServerError(Exception):
+    """El servidor de inferencia no respondió o respondió con error."""
+
+
+class InferenceServerLoading(InferenceServerError):
+    """El servidor responde pero todavía está cargando el modelo: no hay fallback local."""
+
+
+def parse_address(address: str):
+    """'unix:/ruta' o 'host:puerto' -> (familia de socket, dirección)."""
+    if address.startswith('unix:'):
+        return socket.AF_UNIX, address[len('unix:'):]
+    host, sep, port = address.rpartition(':')
+    if not sep or not port.isdigit():
+        raise ValueError(f"Dirección de inferencia inválida: {address!r} (usar unix:/ruta o host:puerto)")
+    return socket.AF_INET, (host or '127.0.0.1', int(port))
+
+
+def send_message(sock, message: dict):
+    payload = json.dumps(message, ensure_ascii=False).encode('utf-8')
+    sock.sendall(_HEADER.pack(len(payload)) + payload)
+
+
+def recv_message(sock) -> dict | None:
+    """Lee un mensaje; None si el otro extremo cerró la conexión antes de empezarlo."""
+    header = _recv_exactly(sock, _HEADER.size, allow_eof=True)
+    if header is None:
+        return None
+    (size,) = _HEADER.unpack(header)
+    if size > MAX_MESSAGE_BYTES:
+        raise InferenceServerError(f"Mensaje de {size} bytes supera el máximo ({MAX_MESSAGE_BYTES})")
+    return json.loads(_recv_exactly(sock, size).decode('utf-8'))
+
+
+def _recv_exactly(sock, size: int, allow_eof: bool = False) -> bytes | None:
+    chunks = bytearray()
+    while len(chunks) < size:
+        chunk = sock.recv(size - len(chunks))
+        if not chunk:
+            if allow_eof and not chunks:
+                return None
+            raise ConnectionError("Conexión cerrada a mitad de un mensaje")
+        chunks.extend(chunk)
+    return bytes(chunks)
+
+
+# ----------------------------------------------------------------------
+# Servidor
+# ----------------------------------------------------------------------
+
+class _Handler(socketserver.BaseRequestHandler):
+    """Una conexión (un hilo): atiende pedidos hasta que el cliente cierra."""
+
+    def handle(self):
+        while True:
+            try:
+                message = recv_message(self.request)
+            except (OSError, ValueError, InferenceServerError):
+                return
+            if message is None:
+                return
+
+            try:
+                response = self.server.inference.dispatch(message)
+            except Exception as e:
+                response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+
+            try:
+                send_message(self.request, response)
+            except OSError:
+                return
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+class _TCPServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class InferenceServer:
+    """
+    Dueño del modelo. Cada conexión corre en su hilo y encola sus textos en un
+    MicroBatcher compartido: pedidos de distintos workers que llegan dentro de
+    la ventana se resuelven en una sola pasada de MiningEngine._infer_local().
+    El batch se arma por textos, así que un pedido grande (bulk) ocupa varias
+    pasadas de hasta max_batch_size textos.
+    """
+
+    def __init__(self, address: str, window_ms: float | None = None, max_batch_size: int | None = None):
+        self.address = address
+        window_ms = get_setting('SENTIMIND_BATCH_WINDOW_MS', 10.0, float) if window_ms is None else window_ms
+        max_batch_size = max_batch_size or get_setting('SENTIMIND_BATCH_MAX_SIZE', 8, int)
+        self.batcher = MicroBatcher(self._infer_texts, window_ms=window_ms, max_batch_size=max_batch_size)
+        self.requests = 0
+        self.batches = 0
+        self.loading = False
+
+        family, target = parse_address(address)
+        if family == socket.AF_UNIX:
+            # Socket viejo de una ejecución anterior
+            if os.path.exists(target):
+                os.unlink(target)
+            self._server = _UnixServer(target, _Handler)
+        else:
+            self._server = _TCPServer(target, _Handler)
+        self._server.inference = self
+
+    def load_model(self) -> threading.Thread:
+        """
+        Carga + warm-up en segundo plano. El servidor ya escucha: mientras
+        tanto los pedidos reciben "loading" en vez de esperar.
+        """
+        from core.application.ai_service import MiningEngine
+
+        def load():
+            try:
+                MiningEngine.warm_up()
+            except Exception as e:
+                print(f"❌ Warm-up fallido: {e}")
+            finally:
+                self.loading = False
+
+        self.loading = True
+        thread = threading.Thread(target=load, name="sentimind-inference-load", daemon=True)
+        thread.start()
+        return thread
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def shutdown(self):
+        """Deja de aceptar conexiones y borra el socket Unix."""
+        self._server.shutdown()
+        self._server.server_close()
+        family, target = parse_address(self.address)
+        if family == socket.AF_UNIX and os.path.exists(target):
+            os.unlink(target)
+
+    def dispatch(self, message: dict) -> dict:
+        from core.application.ai_service import MiningEngine
+
+        op = message.get('op')
+        if op == 'ping':
+            return {"ok": True, **MiningEngine.local_readiness(), "loading": self.loading, "pid": os.getpid()}
+        if op != 'infer':
+            return {"ok": False, "error": f"Operación desconocida: {op!r}"}
+
+        texts = message.get('texts')
+        if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+            return {"ok": False, "error": "texts debe ser una lista de strings"}
+
+        if self.loading:
+            return {"ok": False, "loading": True, "error": "El servidor de inferencia está cargando el modelo"}
+
+        self.requests += 1
+        results = self.batcher.submit_many(texts)
+        return {
+            "ok": True,
+            "results": results,
+            "model": MiningEngine.active_model_name(),
+            "backend": MiningEngine.active_backend_name(),
+        }
+
+    def _infer_texts(self, texts: list[str]) -> list[dict]:
+        from core.application.ai_service import MiningEngine
+
+        self.batches += 1
+        return MiningEngine._infer_local(texts)
+
+
+# ----------------------------------------------------------------------
+# Cliente (workers web)
+# ----------------------------------------------------------------------
+
+class InferenceClient:
+    """
+    Cliente del servidor de inferencia, usado por MiningEngine._infer_batch().
+    Una conexión persistente por hilo (y por proceso: no se comparte tras un
+    fork). Si el servidor falla, se deja de intentar por
+    SENTIMIND_INFERENCE_RETRY_SECONDS para no pagar el timeout en cada request.
+    """
+
+    # Timeout de conexión (el de respuesta es SENTIMIND_INFERENCE_TIMEOUT)
+    CONNECT_TIMEOUT = 1.0
+
+    _local = threading.local()
+    _down_until = 0.0
+    _disabled = False
+
+    @classmethod
+    def address(cls) -> str:
+        return get_setting('SENTIMIND_INFERENCE_SERVER', '')
+
+    @classmethod
+    def enabled(cls) -> bool:
+        """True si este proceso delega la inferencia (el propio servidor nunca lo hace)."""
+        return bool(cls.address()) and not cls._disabled
+
+    @classmethod
+    def disable(cls):
+        """Lo llama el proceso servidor: comparte settings con la web pero infiere localmente."""
+        cls._disabled = True
+
+    @classmethod
+    def fallback_enabled(cls) -> bool:
+        return get_setting('SENTIMIND_INFERENCE_FALLBACK', True, bool)
+
+    @classmethod
+    def available(cls) -> bool:
+        """False durante la pausa tras un fallo."""
+        return time.monotonic() >= cls._down_until
+
+    @classmethod
+    def infer(cls, texts: list[str]) -> dict:
+        """
+        Clasifica `texts` en el servidor.
+
+        Returns:
+            dict: {"results": [...], "model": ..., "backend": ...}
+
+        Raises:
+            InferenceServerLoading: El servidor todavía está cargando el modelo.
+            InferenceServerError: Servidor caído, lento o con error.
+        """
+        return cls._request({"op": "infer", "texts": list(texts)})
+
+    @classmethod
+    def ping(cls) -> dict:
+        """Estado del modelo en el servidor (mismo formato que MiningEngine.readiness())."""
+        return cls._request({"op": "ping"}, timeout=cls.CONNECT_TIMEOUT * 2)
+
+    @classmethod
+    def close(cls):
+        sock = getattr(cls._local, 'sock', None)
+        cls._local.sock = None
+        if sock is not None:
+            try:
+                sock.close()
+            except OSError:
+                pass
+
+    @classmethod
+    def _request(cls, message: dict, timeout: float | None = None) -> dict:
+        if not cls.available():
+            raise InferenceServerError("Servidor de inferencia marcado como caído, reintentando más tarde")
+
+        timeout = timeout or get_setting('SENTIMIND_INFERENCE_TIMEOUT', 30.0, float)
+        # Una conexión reutilizada puede estar muerta (servidor reiniciado): un reintento con una nueva
+        for attempt in range(2):
+            sock, reused = cls._connection()
+            try:
+                sock.settimeout(timeout)
+                send_message(sock, message)
+                response = recv_message(sock)
+                if response is None:
+                    raise ConnectionError("El servidor cerró la conexión")
+                break
+            except socket.timeout as e:
+                # Sin reintento: el servidor está lento y repetir solo suma carga
+                cls._fail()
+                raise InferenceServerError(f"Timeout esperando al servidor de inferencia ({timeout}s)") from e
+            except (OSError, ValueError) as e:
+                cls.close()
+                if reused and attempt == 0:
+                    continue
+                cls._fail()
+                raise InferenceServerError(f"Servidor de inferencia no disponible: {e}") from e
+
+        if not response.get('ok'):
+            if response.get('loading'):
+                raise InferenceServerLoading(response.get('error') or "El servidor de inferencia está cargando el modelo")
+            raise InferenceServerError(response.get('error') or "Error desconocido en el servidor de inferencia")
+        return response
+
+    @classmethod
+    def _connection(cls) -> tuple[socket.socket, bool]:
+        """(socket, reutilizado). Abre uno nuevo si este hilo no tiene o si cambió el PID."""
+        sock = getattr(cls._local, 'sock', None)
+        if sock is not None and cls._local.pid == os.getpid():
+            return sock, True
+
+        family, target = parse_address(cls.address())
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.settimeout(cls.CONNECT_TIMEOUT)
+        try:
+            sock.connect(target)
+        except OSError as e:
+            sock.close()
+            cls._fail()
+            raise InferenceServerError(f"No se pudo conectar a {cls.address()}: {e}") from e
+        if family == socket.AF_INET:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        cls._local.sock = sock
+        cls._local.pid = os.getpid()
+        return sock, False
+
+    @classmethod
+    def _fail(cls):
+        cls.close()
+        cls._down_until = time.monotonic() + get_setting('SENTIMIND_INFERENCE_RETRY_SECONDS', 5.0, float)
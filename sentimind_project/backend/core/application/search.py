@@ -0,0 +1,95 @@
+"""
+Búsqueda de texto completo sobre Post.content.
+
+El índice es una tabla virtual FTS5 de SQLite (core_post_fts, migración 0010)
+con contenido externo: guarda solo los términos y lee el texto de core_post.
+Triggers sobre core_post la mantienen al día en INSERT, UPDATE y DELETE
+(también con bulk_create). El tokenizador unicode61 ignora mayúsculas y
+tildes: "cafe" encuentra "Café".
+
+Sin FTS5 (otra base de datos o un SQLite compilado sin el módulo) la
+búsqueda cae a un LIKE sobre el contenido, sin orden por relevancia.
+"""
+import re
+
+from django.db import connection
+from django.db.models import F
+
+from core.models import PostSearchIndex
+
+
+# Palabras de la consulta; el resto (comillas, operadores de FTS5) se descarta
+_TERM = re.compile(r'\w+', re.UNICODE)
+
+# Máximo de términos por consulta (cada uno es una lista de posts a cruzar)
+MAX_TERMS = 16
+
+_available = None
+
+
+def available() -> bool:
+    """¿Existe el índice FTS5 en esta base de datos? (se consulta una vez por proceso)"""
+    global _available
+    if _available is None:
+        _available = (
+            connection.vendor == 'sqlite'
+            and PostSearchIndex._meta.db_table in connection.introspection.table_names()
+        )
+    return _available
+
+
+def terms(text: str) -> list[str]:
+    """Palabras de la consulta del usuario, en orden y sin repetir."""
+    return list(dict.fromkeys(_TERM.findall(text or '')))[:MAX_TERMS]
+
+
+def match_expression(text: str) -> str | None:
+    """
+    Consulta del usuario -> expresión MATCH de FTS5: cada palabra entre
+    comillas (literal, sin operadores) y todas requeridas.
+    None si no queda ninguna palabra.
+    """
+    words = terms(text)
+    if not words:
+        return None
+    return ' '.join(f'"{word}"' for word in words)
+
+
+def search(queryset, text: str):
+    """
+    Filtra `queryset` (de Post) a los posts que contienen todas las palabras
+    de `text`. Con FTS5 anota `search_rank` (bm25: más negativo = más
+    relevante) para ordenar por relevancia.
+    """
+    if not available():
+        words = terms(text)
+        if not words:
+            return queryset.none()
+        for word in words:
+            queryset = queryset.filter(content__icontains=word)
+        return queryset
+
+    expression = match_expression(text)
+    if expression is None:
+        return queryset.none()
+    # JOIN con el índice por rowid: SQLite recorre primero los posts que
+    # coinciden (índice invertido) y trae cada fila por clave primaria
+    return queryset.filter(search_entry__content__match=expression).annotate(
+        search_rank=F('search_entry__rank')
+    )
+
+
+def rebuild() -> int:
+    """
+    Regenera el índice desde core_post (tras importar datos con SQL directo
+    o si se corrompió) y lo compacta.
+
+    Returns:
+        int: Posts indexados.
+    """
+    table = connection.ops.quote_name(PostSearchIndex._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {table}({table}) VALUES ('rebuild')")
+        cursor.execute(f"INSERT INTO {table}({table}) VALUES ('optimize')")
+        cursor.execute(f"SELECT COUNT(*) FROM {table}")
+        return cursor.fetchone()[0]
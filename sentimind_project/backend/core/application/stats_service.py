@@ -0,0 +1,166 @@
+"""
+Estadísticas por categoría para /api/stats/.
+Los conteos viven en CategoryCounter (una fila por dimensión, categoría y
+hora) y se actualizan en el mismo camino de escritura que crea PostCategory,
+así el endpoint suma unas pocas filas en vez de hacer COUNT(*) sobre Post.
+"""
+from collections import defaultdict
+from datetime import timezone as dt_timezone
+
+from django.db import connection, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDay, TruncHour
+
+from core.models import CategoryCounter, Post, PostCategory
+
+
+GRANULARITIES = ('hour', 'day')
+
+# Filas por INSERT (5 parámetros cada una, bajo el límite de variables de SQLite)
+_UPSERT_CHUNK = 150
+
+
+def hour_bucket(created_at):
+    """Inicio de la hora (UTC) a la que pertenece `created_at`."""
+    return created_at.astimezone(dt_timezone.utc).replace(minute=0, second=0, microsecond=0)
+
+
+def record(entries, sign: int = 1):
+    """
+    Suma (sign=1) o resta (sign=-1) posts a los contadores con un solo upsert.
+
+    Args:
+        entries: Iterable de (created_at, analysis), con analysis en el formato
+                 de MiningEngine.analyze().
+    """
+    totals = defaultdict(lambda: [0, 0.0])
+    for created_at, analysis in entries:
+        bucket = hour_bucket(created_at)
+        for cat in analysis['categories']:
+            counter = totals[(CategoryCounter.DIMENSION_CATEGORY, cat['name'], bucket)]
+            counter[0] += sign
+            counter[1] += sign * cat['confidence']
+        if analysis['primary_category']:
+            counter = totals[(CategoryCounter.DIMENSION_PRIMARY, analysis['primary_category'], bucket)]
+            counter[0] += sign
+            counter[1] += sign * analysis['primary_confidence']
+
+    rows = [(*key, posts, confidence) for key, (posts, confidence) in totals.items()]
+    for start in range(0, len(rows), _UPSERT_CHUNK):
+        _upsert(rows[start:start + _UPSERT_CHUNK])
+
+
+def unrecord_posts(post_ids):
+    """Resta de los contadores el estado guardado de estos posts (antes de reemplazar sus categorías)."""
+    current = {
+        post_id: (created_at, {"categories": [], "primary_category": primary, "primary_confidence": confidence})
+        for post_id, created_at, primary, confidence in Post.objects.filter(id__in=post_ids).values_list(
+            'id', 'created_at', 'primary_category', 'primary_confidence'
+        )
+    }
+    links = PostCategory.objects.filter(post_id__in=post_ids).values_list('post_id', 'category__name', 'confidence')
+    for post_id, name, confidence in links:
+        current[post_id][1]["categories"].append({"name": name, "confidence": confidence})
+    record(current.values(), sign=-1)
+    return {post_id: created_at for post_id, (created_at, _) in current.items()}
+
+
+def _upsert(rows):
+    table = connection.ops.quote_name(CategoryCounter._meta.db_table)
+    placeholders = ', '.join(['(%s, %s, %s, %s, %s)'] * len(rows))
+    params = []
+    for dimension, name, bucket, posts, confidence in rows:
+        params.extend([dimension, name, connection.ops.adapt_datetimefield_value(bucket), posts, confidence])
+
+    # El upsert (SQLite >= 3.24 y PostgreSQL) no tiene equivalente en el ORM con incremento
+    sql = (
+        f"INSERT INTO {table} (dimension, name, bucket, posts, confidence_sum) "
+        f"VALUES {placeholders} "
+        f"ON CONFLICT (dimension, name, bucket) DO UPDATE SET "
+        f"posts = {table}.posts + excluded.posts, "
+        f"confidence_sum = {table}.confidence_sum + excluded.confidence_sum"
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+
+
+def rebuild() -> int:
+    """
+    Recalcula todos los contadores desde Post y PostCategory (para corregir
+    desvíos).
+
+    Returns:
+        int: Filas de contadores creadas.
+    """
+    # Lectura y reemplazo en la misma transacción
+    with transaction.atomic():
+        by_category = (
+            PostCategory.objects
+            .annotate(bucket=TruncHour('post__created_at', tzinfo=dt_timezone.utc))
+            .values('bucket', 'category__name')
+            .annotate(posts=Count('id'), confidence_sum=Sum('confidence'))
+            .order_by()
+        )
+        by_primary = (
+            Post.objects.exclude(primary_category='')
+            .annotate(bucket=TruncHour('created_at', tzinfo=dt_timezone.utc))
+            .values('bucket', 'primary_category')
+            .annotate(posts=Count('id'), confidence_sum=Sum('primary_confidence'))
+            .order_by()
+        )
+
+        counters = [
+            CategoryCounter(dimension=CategoryCounter.DIMENSION_CATEGORY, name=row['category__name'],
+                            bucket=row['bucket'], posts=row['posts'], confidence_sum=row['confidence_sum'])
+            for row in by_category
+        ] + [
+            CategoryCounter(dimension=CategoryCounter.DIMENSION_PRIMARY, name=row['primary_category'],
+                            bucket=row['bucket'], posts=row['posts'], confidence_sum=row['confidence_sum'])
+            for row in by_primary
+        ]
+        CategoryCounter.objects.all().delete()
+        CategoryCounter.objects.bulk_create(counters, batch_size=500)
+    return len(counters)
+
+
+def query(granularity: str, since, until) -> dict:
+    """Totales y serie temporal por categoría y por categoría principal en [since, until)."""
+    rows = CategoryCounter.objects.filter(bucket__gte=since, bucket__lt=until)
+    period = TruncDay('bucket') if granularity == 'day' else F('bucket')
+    series_rows = (
+        rows.annotate(period=period)
+        .values('period', 'dimension', 'name')
+        .annotate(total=Sum('posts'), confidence=Sum('confidence_sum'))
+        .filter(total__gt=0)
+        .order_by('period', 'dimension', '-total', 'name')
+    )
+
+    totals = {CategoryCounter.DIMENSION_CATEGORY: {}, CategoryCounter.DIMENSION_PRIMARY: {}}
+    buckets = {}
+    for row in series_rows:
+        entry = _entry(row['name'], row['total'], row['confidence'])
+        bucket = buckets.setdefault(row['period'], {"bucket": row['period'], "categories": [], "primary_categories": []})
+        key = "categories" if row['dimension'] == CategoryCounter.DIMENSION_CATEGORY else "primary_categories"
+        bucket[key].append(entry)
+
+        total = totals[row['dimension']].setdefault(row['name'], [0, 0.0])
+        total[0] += row['total']
+        total[1] += row['confidence']
+
+    return {
+        "granularity": granularity,
+        "since": since,
+        "until": until,
+        "categories": _ranked(totals[CategoryCounter.DIMENSION_CATEGORY]),
+        "primary_categories": _ranked(totals[CategoryCounter.DIMENSION_PRIMARY]),
+        "series": list(buckets.values()),
+    }
+
+
+def _entry(name, posts, confidence_sum) -> dict:
+    return {"name": name, "posts": posts, "avg_confidence": round(confidence_sum / posts, 4)}
+
+
+def _ranked(totals: dict) -> list[dict]:
+    entries = [_entry(name, posts, confidence) for name, (posts, confidence) in totals.items() if posts > 0]
+    return sorted(entries, key=lambda entry: (-entry['posts'], entry['name']))
@@ -0,0 +1,223 @@
+"""
+Tiempos por etapa y métricas del proceso.
+
+`with stage('inference'):` mide una etapa y la suma a:
+- el request en curso (ContextVar), que ServerTimingMiddleware devuelve en
+  el header Server-Timing;
+- el histograma sentimind_stage_seconds de este proceso, que se expone en
+  formato Prometheus en /metrics junto con el modelo, la caché y la memoria.
+
+Fuera de un request (worker asíncrono, comandos) solo se alimenta el
+histograma. El hilo del micro-batcher junta las etapas de cada pasada con
+collect() y cada llamador las suma a su request con merge(). El costo por etapa es un perf_counter y un
+lock sin contención: se deja activo en producción.
+
+Las métricas son por proceso: con varios workers de gunicorn cada scrape de
+/metrics ve el worker que atendió el request.
+"""
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+import threading
+import time
+
+
+# Límites (segundos) de los buckets de los histogramas
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# Etapas del request en curso: {nombre: [segundos, veces]}
+_current = ContextVar('sentimind_timings', default=None)
+
+
+class stage:
+    """Mide el bloque como la etapa `name` (clase y no @contextmanager: cuesta menos por llamada)."""
+
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+def record(name: str, seconds: float):
+    """Suma una duración ya medida a la etapa `name`."""
+    timings = _current.get()
+    if timings is not None:
+        entry = timings.setdefault(name, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+    Metrics.observe('sentimind_stage_seconds', seconds, stage=name)
+
+
+def merge(timings: dict):
+    """
+    Suma al request en curso etapas medidas en otro hilo (ya están en el
+    histograma: no se vuelven a observar).
+    """
+    current = _current.get()
+    if current is None:
+        return
+    for name, (seconds, count) in timings.items():
+        entry = current.setdefault(name, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += count
+
+
+@contextmanager
+def collect():
+    """Junta las etapas del bloque (un request) y las entrega como dict {nombre: [segundos, veces]}."""
+    timings = {}
+    token = _current.set(timings)
+    try:
+        yield timings
+    finally:
+        _current.reset(token)
+
+
+class Metrics:
+    """Histogramas y contadores del proceso, con etiquetas."""
+
+    _lock = threading.Lock()
+    _histograms = {}
+    _counters = {}
+
+    HELP = {
+        'sentimind_stage_seconds': "Duración de cada etapa (tokenize, forward, inference, db, serialize...)",
+        'sentimind_request_seconds': "Duración de los requests HTTP por ruta y método",
+        'sentimind_requests_total': "Requests HTTP por ruta, método y status",
+        'sentimind_classification_fallbacks_total': "Posts guardados con el resultado fallback-error porque la IA falló",
+    }
+
+    @classmethod
+    def observe(cls, name: str, seconds: float, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        index = bisect_left(BUCKETS, seconds)
+        with cls._lock:
+            histogram = cls._histograms.get(key)
+            if histogram is None:
+                # Un contador por bucket + +Inf, suma y cantidad
+                histogram = cls._histograms[key] = [[0] * (len(BUCKETS) + 1), 0.0, 0]
+            histogram[0][index] += 1
+            histogram[1] += seconds
+            histogram[2] += 1
+
+    @classmethod
+    def increment(cls, name: str, amount: int = 1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with cls._lock:
+            cls._counters[key] = cls._counters.get(key, 0) + amount
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._histograms.clear()
+            cls._counters.clear()
+
+    @classmethod
+    def render(cls) -> str:
+        """Histogramas y contadores en formato de texto de Prometheus."""
+        with cls._lock:
+            histograms = {key: ([*counts], total, count) for key, (counts, total, count) in cls._histograms.items()}
+            counters = dict(cls._counters)
+
+        lines = []
+        for name in sorted({name for name, _ in histograms}):
+            lines += _header(name, 'histogram', cls.HELP.get(name))
+            for (metric, labels), (counts, total, count) in sorted(histograms.items()):
+                if metric != name:
+                    continue
+                cumulative = 0
+                for bound, bucket in zip((*BUCKETS, '+Inf'), counts):
+                    cumulative += bucket
+                    lines.append(_sample(f"{name}_bucket", (*labels, ('le', str(bound))), cumulative))
+                lines.append(_sample(f"{name}_sum", labels, total))
+                lines.append(_sample(f"{name}_count", labels, count))
+        for name in sorted({name for name, _ in counters}):
+            lines += _header(name, 'counter', cls.HELP.get(name))
+            lines += [_sample(metric, labels, value) for (metric, labels), value in sorted(counters.items()) if metric == name]
+        return '\n'.join(lines) + '\n'
+
+
+def render_prometheus() -> str:
+    """Todo /metrics: histogramas y contadores más el estado del modelo, la caché y la memoria."""
+    from core.application.ai_service import MiningEngine
+    from core.application.classification_cache import ClassificationCache
+    from core.application.near_duplicates import NearDuplicateIndex
+    from core.application.warmup import resident_memory
+
+    lines = []
+    model = MiningEngine.local_readiness()
+    lines += _gauge('sentimind_model_loaded', "1 si el modelo está cargado en este proceso", 1 if model['loaded'] else 0)
+    lines += _gauge('sentimind_model_warm', "1 si este proceso ya hizo el warm-up", 1 if model['warm'] else 0)
+    if model['load_seconds'] is not None:
+        lines += _gauge('sentimind_model_load_seconds', "Segundos que tomó cargar el modelo", model['load_seconds'])
+    if model['warmup_seconds'] is not None:
+        lines += _gauge('sentimind_model_warmup_seconds', "Segundos de la inferencia de warm-up", model['warmup_seconds'])
+
+    lines += _header('sentimind_classifications_total', 'counter', "Resultados de clasificación por camino (method)")
+    for method, count in sorted(MiningEngine.method_counts().items(), key=lambda item: str(item[0])):
+        lines.append(_sample('sentimind_classifications_total', (('method', str(method)),), count))
+
+    cache = ClassificationCache.stats()
+    lines += _header('sentimind_classification_cache_lookups_total', 'counter', "Búsquedas en la caché de clasificación por resultado")
+    for result in ('memory_hits', 'db_hits', 'misses'):
+        lines.append(_sample('sentimind_classification_cache_lookups_total', (('result', result),), cache[result]))
+    lines += _gauge('sentimind_classification_cache_hit_ratio', "Aciertos / búsquedas de la caché de clasificación", cache['hit_ratio'])
+    lines += _gauge('sentimind_classification_cache_memory_entries', "Entradas en el LRU en memoria", cache['memory_size'])
+
+    near_dup = NearDuplicateIndex.stats()
+    lines += _header('sentimind_near_duplicate_lookups_total', 'counter', "Búsquedas de casi-duplicados por resultado")
+    lines.append(_sample('sentimind_near_duplicate_lookups_total', (('result', 'reused'),), near_dup['reused']))
+    lines.append(_sample('sentimind_near_duplicate_lookups_total', (('result', 'miss'),), near_dup['lookups'] - near_dup['reused']))
+    lines.append(_sample('sentimind_near_duplicate_lookups_total', (('result', 'skipped'),), near_dup['skipped']))
+    lines += _gauge('sentimind_near_duplicate_reuse_ratio', "Reusos / búsquedas de casi-duplicados", near_dup['reuse_ratio'])
+    lines += _gauge('sentimind_near_duplicate_entries', "Posts en el índice de casi-duplicados", near_dup['size'])
+    lines += _header('sentimind_near_duplicate_evictions_total', 'counter', "Posts desalojados del índice de casi-duplicados")
+    lines.append(_sample('sentimind_near_duplicate_evictions_total', (), near_dup['evictions']))
+
+    memory = resident_memory()
+    if memory['rss_mb'] is not None:
+        lines += _gauge('process_resident_memory_bytes', "Memoria residente del proceso", int(memory['rss_mb'] * 1024 * 1024))
+    if memory['shared_mb'] is not None:
+        lines += _gauge('sentimind_process_shared_memory_bytes', "Parte de la memoria residente compartida con otros procesos",
+                        int(memory['shared_mb'] * 1024 * 1024))
+
+    return Metrics.render() + '\n'.join(lines) + '\n'
+
+
+def server_timing(timings: dict) -> str:
+    """{nombre: [segundos, veces]} -> valor del header Server-Timing (duraciones en ms)."""
+    parts = []
+    for name, (seconds, count) in timings.items():
+        part = f"{name};dur={seconds * 1000:.1f}"
+        if count > 1:
+            part += f';desc="{count}x"'
+        parts.append(part)
+    return ', '.join(parts)
+
+
+def _header(name: str, kind: str, help_text: str | None) -> list[str]:
+    lines = [f"# HELP {name} {help_text}"] if help_text else []
+    return lines + [f"# TYPE {name} {kind}"]
+
+
+def _gauge(name: str, help_text: str, value) -> list[str]:
+    return _header(name, 'gauge', help_text) + [_sample(name, (), value)]
+
+
+def _sample(name: str, labels: tuple, value) -> str:
+    if labels:
+        rendered = ','.join(f'{key}="{_escape(val)}"' for key, val in labels)
+        return f"{name}{{{rendered}}} {value}"
+    return f"{name} {value}"
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -0,0 +1,243 @@
+"""
+Tokenización para el camino NLI.
+
+- Tokenizer rápido (Rust) solo si produce los mismos token IDs que el de
+  sentencepiece: la verificación corre una vez por modelo y versión de
+  transformers/tokenizers y queda guardada en SENTIMIND_TOKENIZER_PARITY_FILE
+  (`python manage.py tokenizer_parity` la repite con posts reales).
+- Buckets por largo: los textos de un batch se agrupan por cantidad de tokens
+  para que los cortos no se rellenen hasta el largo del más largo.
+- Posts largos: se parten en fragmentos de oraciones de hasta
+  SENTIMIND_MAX_CHUNK_TOKENS tokens; MiningEngine combina sus scores.
+
+Como en inference_backends, transformers se importa recién al usarlo.
+"""
+import json
+from pathlib import Path
+import re
+
+from core.application.config import get_setting
+
+
+# Textos de la verificación de paridad: acentos, ñ, emojis, signos de
+# apertura, espacios raros, mayúsculas, números y un post largo
+PARITY_SAMPLES = [
+    "Hoy es un buen día para aprender algo nuevo.",
+    "¿Por qué existimos? ¿Cuál es el sentido de la vida?",
+    "Jajaja me caí en la calle y todos me vieron 😂",
+    "Te amo con todo mi corazón, eres el amor de mi vida ❤️",
+    "Encontré una cucaracha en mi comida del restaurante 🤮🤮",
+    "¡¡¡QUÉ SORPRESA!!! No esperaba verte aquí... 😮",
+    "Mi mejor consejo: ahorra desde joven (al menos el 10%).",
+    "El niño, la pingüina y el señor Muñoz comieron ñoquis el 29/09.",
+    "  espacios   dobles\tcon tabulación\ny saltos de línea  ",
+    "Me río para no llorar, perdí todo pero aquí seguimos 😅😢",
+    "https://ejemplo.com/ruta?q=1 #hashtag @usuario",
+    "Straße, Ångström, façade — naïve café résumé",
+    "Extraño tanto los días de mi infancia, cuando jugábamos en la plaza hasta que "
+    "oscurecía y nadie miraba el celular. Ahora todo va muy rápido y siento que me "
+    "pierdo lo importante. ¿A alguien más le pasa? A veces pienso en volver a mi "
+    "pueblo, pero el trabajo y las cuentas no me dejan. Igual sigo soñando con eso.",
+]
+
+# Separación en oraciones: después de . ! ? … o en saltos de línea
+_SENTENCE_END = re.compile(r'(?<=[.!?…])\s+|\n+')
+
+# Un bucket nuevo empieza cuando el texto supera al más corto del bucket en esta proporción
+BUCKET_RATIO = 1.3
+# Tolerancia fija en tokens (los textos muy cortos varían mucho en proporción)
+BUCKET_SLACK_TOKENS = 8
+
+
+# ----------------------------------------------------------------------
+# Tokenizer rápido con verificación de paridad
+# ----------------------------------------------------------------------
+
+def tokenizer_mode() -> str:
+    """SENTIMIND_FAST_TOKENIZER: "auto" (rápido si pasó la paridad), "fast" o "slow"."""
+    return get_setting('SENTIMIND_FAST_TOKENIZER', 'auto')
+
+
+def use_fast_tokenizer(model_name: str) -> bool:
+    mode = tokenizer_mode()
+    if mode in ('fast', 'slow'):
+        return mode == 'fast'
+
+    verdict = stored_verdict(model_name)
+    if verdict is None:
+        try:
+            verdict = check_parity(model_name)
+        except Exception as e:
+            print(f"⚠️ No se pudo verificar el tokenizer rápido de {model_name}: {e}")
+            return False
+        save_verdict(verdict)
+    return verdict["parity"]
+
+
+def check_parity(model_name: str, texts: list[str] | None = None, hypotheses: list[str] | None = None) -> dict:
+    """
+    Tokeniza `texts` (default PARITY_SAMPLES) con el tokenizer rápido y con
+    sentencepiece, como pares premisa/hipótesis igual que el pipeline zero-shot.
+
+    Returns:
+        dict: Veredicto con "parity", "samples" y los primeros "mismatches".
+    """
+    from transformers import AutoTokenizer
+
+    slow = AutoTokenizer.from_pretrained(model_name, use_fast=False)
+    fast = AutoTokenizer.from_pretrained(model_name, use_fast=True)
+    if not getattr(fast, 'is_fast', False):
+        mismatches = ["no hay tokenizer rápido para este modelo"]
+    else:
+        mismatches = token_mismatches(fast, slow, texts or PARITY_SAMPLES, hypotheses)
+
+    return {
+        "key": _verdict_key(model_name),
+        "model": model_name,
+        "parity": not mismatches,
+        "samples": len(texts or PARITY_SAMPLES),
+        "mismatches": mismatches[:10],
+    }
+
+
+def token_mismatches(fast, slow, texts: list[str], hypotheses: list[str] | None = None) -> list[str]:
+    """Textos (o pares texto/hipótesis) para los que los token IDs difieren."""
+    if hypotheses is None:
+        from core.application.ai_service import MiningEngine
+        hypotheses = [MiningEngine.HYPOTHESIS_TEMPLATE.format(label) for label in MiningEngine.TAXONOMY]
+
+    mismatches = []
+    for text in texts:
+        if fast(text)['input_ids'] != slow(text)['input_ids']:
+            mismatches.append(text)
+            continue
+        for hypothesis in hypotheses:
+            pair_fast = fast(text, hypothesis, truncation='only_first')['input_ids']
+            pair_slow = slow(text, hypothesis, truncation='only_first')['input_ids']
+            if pair_fast != pair_slow:
+                mismatches.append(f"{text} / {hypothesis}")
+                break
+    return mismatches
+
+
+def stored_verdict(model_name: str) -> dict | None:
+    """Veredicto guardado para este modelo y estas versiones de transformers/tokenizers."""
+    return _read_verdicts().get(_verdict_key(model_name))
+
+
+def save_verdict(verdict: dict):
+    verdicts = _read_verdicts()
+    verdicts[verdict["key"]] = verdict
+    path = _parity_file()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(verdicts, ensure_ascii=False, indent=2), encoding='utf-8')
+    except OSError as e:
+        print(f"⚠️ No se pudo guardar la paridad del tokenizer en {path}: {e}")
+
+
+def _read_verdicts() -> dict:
+    try:
+        return json.loads(_parity_file().read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return {}
+
+
+def _parity_file() -> Path:
+    return Path(get_setting('SENTIMIND_TOKENIZER_PARITY_FILE', 'data/tokenizer_parity.json'))
+
+
+def _verdict_key(model_name: str) -> str:
+    # Un cambio de versión puede cambiar la tokenización: se vuelve a verificar
+    import tokenizers
+    import transformers
+    return f"{model_name}@transformers-{transformers.__version__}@tokenizers-{tokenizers.__version__}"
+
+
+# ----------------------------------------------------------------------
+# Largos, buckets y fragmentos
+# ----------------------------------------------------------------------
+
+def token_lengths(tokenizer, texts: list[str]) -> list[int]:
+    """Tokens de cada texto sin los especiales (sin tokenizer, caracteres / 4)."""
+    if tokenizer is None:
+        return [max(len(text) // 4, 1) for text in texts]
+    return [len(ids) for ids in tokenizer(list(texts), add_special_tokens=False)['input_ids']]
+
+
+def length_buckets(lengths: list[int]) -> list[list[int]]:
+    """
+    Índices agrupados por largo similar, de menor a mayor: cada bucket es una
+    pasada del modelo con poco relleno.
+    """
+    buckets = []
+    for i in sorted(range(len(lengths)), key=lengths.__getitem__):
+        if buckets and lengths[i] <= lengths[buckets[-1][0]] * BUCKET_RATIO + BUCKET_SLACK_TOKENS:
+            buckets[-1].append(i)
+        else:
+            buckets.append([i])
+    return buckets
+
+
+def max_chunk_tokens() -> int:
+    """Tokens máximos por fragmento (0 = no partir posts largos)."""
+    return get_setting('SENTIMIND_MAX_CHUNK_TOKENS', 128, int)
+
+
+def split_long_texts(texts: list[str], tokenizer, max_tokens: int) -> tuple[list[str], list[int], list[int]]:
+    """
+    Parte los textos de más de `max_tokens` tokens en fragmentos de oraciones.
+
+    Returns:
+        tuple: (segmentos, índice del texto original de cada segmento, largo en tokens de cada segmento)
+    """
+    lengths = token_lengths(tokenizer, texts)
+    if tokenizer is None or max_tokens <= 0:
+        return list(texts), list(range(len(texts))), lengths
+
+    segments, owners, segment_lengths = [], [], []
+    for i, (text, length) in enumerate(zip(texts, lengths)):
+        pieces = [(text, length)] if length <= max_tokens else chunk_text(text, tokenizer, max_tokens)
+        for piece, piece_length in pieces:
+            segments.append(piece)
+            owners.append(i)
+            segment_lengths.append(piece_length)
+    return segments, owners, segment_lengths
+
+
+def chunk_text(text: str, tokenizer, max_tokens: int) -> list[tuple[str, int]]:
+    """
+    Junta oraciones consecutivas mientras entren en `max_tokens`; una oración
+    más larga que eso se corta por palabras. Retorna (fragmento, tokens).
+    """
+    sentences = [s.strip() for s in _SENTENCE_END.split(text) if s and s.strip()]
+    units = []
+    for sentence, length in zip(sentences, token_lengths(tokenizer, sentences)):
+        units.extend([(sentence, length)] if length <= max_tokens else _split_words(sentence, tokenizer, max_tokens))
+
+    chunks = []
+    current, current_length = [], 0
+    for unit, length in units:
+        if current and current_length + length > max_tokens:
+            chunks.append((' '.join(current), current_length))
+            current, current_length = [], 0
+        current.append(unit)
+        current_length += length
+    if current:
+        chunks.append((' '.join(current), current_length))
+    return chunks
+
+
+def _split_words(sentence: str, tokenizer, max_tokens: int) -> list[tuple[str, int]]:
+    words = sentence.split()
+    pieces = []
+    current, current_length = [], 0
+    for word, length in zip(words, token_lengths(tokenizer, words)):
+        if current and current_length + length > max_tokens:
+            pieces.append((' '.join(current), current_length))
+            current, current_length = [], 0
+        current.append(word)
+        current_length += length
+    if current:
+        pieces.append((' '.join(current), current_length))
+    return pieces
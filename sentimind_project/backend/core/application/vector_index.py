@@ -0,0 +1,321 @@
+"""
+Índice de embeddings de posts para "posts parecidos".
+
+Cada post es un registro (id int64, embedding float16) en un archivo plano
+(SENTIMIND_VECTOR_INDEX_DIR/vectors.bin) al que se le agregan registros al
+crear posts. Las consultas lo abren con np.memmap: todos los workers de
+gunicorn leen las mismas páginas del page cache del sistema en vez de
+cargar cada uno su copia. float16 ocupa la mitad que float32 (768 bytes
+por post con MiniLM de 384 dimensiones) y alcanza para ordenar por coseno.
+
+Los embeddings son los de EmbeddingEncoder (filas de norma 1): el coseno
+es un producto punto, que se calcula por bloques con numpy.
+
+meta.json guarda el modelo y la dimensión; si cambia el modelo el índice
+queda viejo y hay que regenerarlo con `python manage.py rebuild_vector_index`.
+"""
+import json
+import os
+import queue
+import threading
+import traceback
+from pathlib import Path
+
+import numpy as np
+
+from core.application.config import get_setting
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin lock entre procesos (un solo worker en desarrollo)
+    fcntl = None
+
+
+class VectorIndexError(Exception):
+    """El índice no existe, está vacío o es de otro modelo."""
+
+
+class VectorIndex:
+    """Lectura (memmap), escritura incremental y regeneración del índice."""
+
+    DATA_FILE = 'vectors.bin'
+    META_FILE = 'meta.json'
+
+    # Filas por bloque al calcular similitudes (bloque float32 de ~25 MB con 384 dims)
+    CHUNK_ROWS = 16384
+
+    _records = None
+    _stat = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def enabled() -> bool:
+        """¿Se indexan los posts nuevos al crearlos?"""
+        return get_setting('SENTIMIND_VECTOR_INDEX', False, bool)
+
+    @staticmethod
+    def directory() -> Path:
+        return Path(get_setting('SENTIMIND_VECTOR_INDEX_DIR', 'data/vectors'))
+
+    @staticmethod
+    def record_dtype(dim: int) -> np.dtype:
+        return np.dtype([('id', '<i8'), ('vector', '<f2', (dim,))])
+
+    @classmethod
+    def meta(cls) -> dict | None:
+        try:
+            return json.loads((cls.directory() / cls.META_FILE).read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+
+    @classmethod
+    def records(cls) -> np.ndarray:
+        """
+        Registros del índice como memmap de solo lectura. Se vuelve a mapear
+        si el archivo creció (posts nuevos) o fue reemplazado (rebuild).
+        """
+        from core.application.embeddings import EmbeddingEncoder
+
+        meta = cls.meta()
+        if meta is None:
+            raise VectorIndexError("No hay índice de posts parecidos: correr `python manage.py rebuild_vector_index`")
+        if meta.get('model') != EmbeddingEncoder.model_name():
+            raise VectorIndexError(
+                f"El índice es del modelo {meta.get('model')}: regenerarlo con `python manage.py rebuild_vector_index`"
+            )
+
+        path = cls.directory() / cls.DATA_FILE
+        try:
+            stat = os.stat(path)
+        except OSError:
+            raise VectorIndexError("No hay índice de posts parecidos: correr `python manage.py rebuild_vector_index`")
+        key = (stat.st_ino, stat.st_size, meta['dim'])
+        if cls._stat == key:
+            return cls._records
+
+        with cls._lock:
+            if cls._stat != key:
+                dtype = cls.record_dtype(meta['dim'])
+                # Un registro a medio escribir (append en curso) no se lee
+                rows = stat.st_size // dtype.itemsize
+                if rows:
+                    records = np.memmap(path, dtype=dtype, mode='r', shape=(rows,))
+                else:
+                    records = np.empty(0, dtype=dtype)
+                cls._records, cls._stat = records, key
+        return cls._records
+
+    @classmethod
+    def similar(cls, post, k: int, queryset) -> list[tuple[int, float]]:
+        """
+        Los `k` posts más parecidos a `post` (coseno de embeddings) entre los
+        de `queryset` (permite restringir por categoría). Si `post` todavía no
+        está en el índice se codifica su contenido.
+
+        Returns:
+            list: (post_id, similitud) de mayor a menor.
+        """
+        from core.application.embeddings import EmbeddingEncoder
+
+        records = cls.records()
+        if not len(records):
+            return []
+        ids = np.asarray(records['id'])
+
+        own = np.flatnonzero(ids == post.id)
+        if len(own):
+            query = np.asarray(records['vector'][own[-1]], dtype=np.float32)
+        else:
+            query = EmbeddingEncoder.encode([post.content])[0]
+
+        scores = cls.scores(records, query)
+        scores[ids == post.id] = -np.inf
+
+        # Candidatos en orden de similitud; si el filtro o los borrados
+        # descartan demasiados, se amplía la ventana
+        results = {}
+        window = min(len(scores), max(k * 4, 32))
+        start = 0
+        while len(results) < k and start < len(scores):
+            top = np.argpartition(-scores, window - 1)[:window] if window < len(scores) else np.arange(len(scores))
+            top = top[np.argsort(-scores[top], kind='stable')][start:]
+            top = top[np.isfinite(scores[top])]
+            candidate_ids = [int(post_id) for post_id in ids[top]]
+            allowed = set(queryset.filter(id__in=candidate_ids).values_list('id', flat=True))
+            for row, post_id in zip(top, candidate_ids):
+                if post_id in allowed and post_id not in results:
+                    results[post_id] = float(scores[row])
+                    if len(results) == k:
+                        break
+            start = window
+            window = min(len(scores), window * 4)
+        return list(results.items())
+
+    @classmethod
+    def scores(cls, records: np.ndarray, query: np.ndarray) -> np.ndarray:
+        """Producto punto de cada registro con `query`, por bloques (float32)."""
+        query = np.asarray(query, dtype=np.float32)
+        scores = np.empty(len(records), dtype=np.float32)
+        for start in range(0, len(records), cls.CHUNK_ROWS):
+            block = records['vector'][start:start + cls.CHUNK_ROWS].astype(np.float32)
+            scores[start:start + len(block)] = block @ query
+        return scores
+
+    @classmethod
+    def append(cls, post_ids: list[int], vectors: np.ndarray):
+        """Agrega registros al final del índice (una sola escritura, con lock entre procesos)."""
+        from core.application.embeddings import EmbeddingEncoder
+
+        directory = cls.directory()
+        meta = cls.meta()
+        if meta is None:
+            directory.mkdir(parents=True, exist_ok=True)
+            meta = {'model': EmbeddingEncoder.model_name(), 'dim': int(vectors.shape[1])}
+            cls._write_meta(directory, meta)
+        elif meta.get('model') != EmbeddingEncoder.model_name() or meta.get('dim') != vectors.shape[1]:
+            print("⚠️ Índice de posts parecidos de otro modelo: no se agregan posts (correr rebuild_vector_index)")
+            return
+
+        records = cls._to_records(post_ids, vectors, meta['dim'])
+        with open(directory / cls.DATA_FILE, 'ab') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.write(records.tobytes())
+                f.flush()
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    @classmethod
+    def rebuild(cls, batch_size: int = 64, chunk_size: int = 2000) -> int:
+        """
+        Regenera el índice desde la tabla de posts en un archivo temporal que
+        reemplaza al actual de una vez. Los posts creados mientras tanto se
+        agregan al final.
+
+        Returns:
+            int: Posts indexados.
+        """
+        from core.application.embeddings import EmbeddingEncoder
+        from core.models import Post
+
+        directory = cls.directory()
+        directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = directory / f"{cls.DATA_FILE}.tmp"
+
+        dim = None
+        last_id = 0
+        written = 0
+        with open(tmp_path, 'wb') as f:
+            while True:
+                rows = list(
+                    Post.objects.filter(id__gt=last_id).order_by('id').values_list('id', 'content')[:chunk_size]
+                )
+                if not rows:
+                    break
+                for start in range(0, len(rows), batch_size):
+                    batch = rows[start:start + batch_size]
+                    vectors = EmbeddingEncoder.encode([content for _, content in batch])
+                    dim = dim or int(vectors.shape[1])
+                    f.write(cls._to_records([post_id for post_id, _ in batch], vectors, dim).tobytes())
+                    written += len(batch)
+                last_id = rows[-1][0]
+                print(f"🧭 {written} posts indexados...")
+
+        if dim is None:
+            # Sin posts: la dimensión sale del modelo
+            dim = int(EmbeddingEncoder.encode(["índice"]).shape[1])
+        cls._write_meta(directory, {'model': EmbeddingEncoder.model_name(), 'dim': dim})
+        os.replace(tmp_path, directory / cls.DATA_FILE)
+
+        # Posts creados durante la regeneración (sus appends fueron al archivo anterior)
+        late = list(Post.objects.filter(id__gt=last_id).order_by('id').values_list('id', 'content'))
+        for start in range(0, len(late), batch_size):
+            batch = late[start:start + batch_size]
+            cls.append([post_id for post_id, _ in batch], EmbeddingEncoder.encode([content for _, content in batch]))
+        return written + len(late)
+
+    @classmethod
+    def _to_records(cls, post_ids: list[int], vectors: np.ndarray, dim: int) -> np.ndarray:
+        records = np.empty(len(post_ids), dtype=cls.record_dtype(dim))
+        records['id'] = post_ids
+        records['vector'] = vectors
+        return records
+
+    @classmethod
+    def _write_meta(cls, directory: Path, meta: dict):
+        tmp = directory / f"{cls.META_FILE}.tmp"
+        tmp.write_text(json.dumps(meta), encoding='utf-8')
+        os.replace(tmp, directory / cls.META_FILE)
+
+
+def index_on_commit(posts):
+    """Encola los posts para el índice cuando la transacción confirme (si está activo)."""
+    if not VectorIndex.enabled():
+        return
+    from django.db import transaction
+
+    items = [(post.id, post.content) for post in posts]
+    transaction.on_commit(lambda: VectorIndexer.enqueue(items))
+
+
+class VectorIndexer:
+    """
+    Hilo de fondo del proceso web que codifica los posts nuevos en lotes y
+    los agrega al índice: el request no espera al modelo de embeddings.
+    """
+
+    MAX_BATCH = 64
+
+    _queue = queue.Queue()
+    _thread = None
+    _pid = None
+    _lock = threading.Lock()
+
+    @classmethod
+    def enqueue(cls, items: list[tuple[int, str]]):
+        cls.start()
+        for item in items:
+            cls._queue.put(item)
+
+    @classmethod
+    def start(cls):
+        if cls._pid == os.getpid() and cls._thread is not None and cls._thread.is_alive():
+            return
+        with cls._lock:
+            if cls._pid == os.getpid() and cls._thread is not None and cls._thread.is_alive():
+                return
+            if cls._pid != os.getpid():
+                cls._queue = queue.Queue()
+            cls._pid = os.getpid()
+            cls._thread = threading.Thread(target=cls._run, name="sentimind-vector-indexer", daemon=True)
+            cls._thread.start()
+
+    @classmethod
+    def drain(cls, block: bool = False) -> int:
+        """
+        Codifica y agrega lo que haya en la cola (hasta MAX_BATCH). Con
+        `block` espera al primer post. Retorna cuántos agregó.
+        """
+        from core.application.embeddings import EmbeddingEncoder
+
+        batch = [cls._queue.get()] if block else []
+        while len(batch) < cls.MAX_BATCH:
+            try:
+                batch.append(cls._queue.get_nowait())
+            except queue.Empty:
+                break
+        if batch:
+            vectors = EmbeddingEncoder.encode([content for _, content in batch])
+            VectorIndex.append([post_id for post_id, _ in batch], vectors)
+        return len(batch)
+
+    @classmethod
+    def _run(cls):
+        while True:
+            try:
+                cls.drain(block=True)
+            except Exception as e:
+                print(f"⚠️ Error indexando posts parecidos: {e}")
+                traceback.print_exc()
@@ -0,0 +1,134 @@
+"""
+Precarga y warm-up del modelo al iniciar el servidor.
+
+sentimind/wsgi.py llama a on_startup():
+- Con gunicorn --preload (gunicorn.conf.py) el módulo WSGI se importa en el
+  proceso maestro: ahí solo se cargan los pesos, y los workers creados con
+  fork los comparten por copy-on-write. El warm-up (primera inferencia) corre
+  en cada worker después del fork (hook post_fork), porque los pools de hilos
+  de PyTorch no sobreviven al fork.
+- Sin --preload (runserver, otro servidor WSGI) cada proceso carga y hace el
+  warm-up en un hilo al importar la app.
+
+SENTIMIND_PRELOAD_MODEL=False vuelve a la carga perezosa en el primer analyze().
+Con SENTIMIND_INFERENCE_SERVER los workers no cargan el modelo: lo tiene el
+proceso `manage.py inference_server`.
+
+En modo asíncrono "inprocess" también se retoman los posts que quedaron sin
+clasificar: los "processing" de una caída vuelven a "pending" (una vez, en
+el maestro con --preload) y el pool de ClassificationWorker arranca en cada
+worker sin esperar al próximo POST.
+"""
+import sys
+import threading
+import traceback
+
+from core.application.config import get_setting
+from core.application.remote_inference import InferenceClient
+
+
+def enabled() -> bool:
+    return get_setting('SENTIMIND_PRELOAD_MODEL', True, bool)
+
+
+def local_model() -> bool:
+    """True si este proceso debe precargar su propio modelo."""
+    return enabled() and not InferenceClient.enabled()
+
+
+def on_startup():
+    # gunicorn.conf.py lo define en el maestro: warm-up e hilos los arranca post_fork
+    after_fork = get_setting('SENTIMIND_WARMUP_AFTER_FORK', False, bool)
+    if local_model():
+        preload_model()
+        if not after_fork:
+            start_warm_up()
+    if inprocess_worker():
+        requeue_interrupted()
+        if not after_fork:
+            start_classification_worker()
+
+
+def inprocess_worker() -> bool:
+    """True si los pendientes los clasifica un pool de hilos de este proceso."""
+    return (get_setting('SENTIMIND_ASYNC_CLASSIFICATION', False, bool)
+            and get_setting('SENTIMIND_ASYNC_WORKER_MODE', 'inprocess') == 'inprocess')
+
+
+def requeue_interrupted():
+    """Vuelve a "pending" los posts que una caída dejó en "processing"."""
+    from django.db import connections
+    from core.application.classification_worker import requeue_processing
+    try:
+        requeued = requeue_processing()
+        if requeued:
+            print(f"♻️ {requeued} posts interrumpidos vuelven a la cola")
+    except Exception as e:
+        # Sin migrar todavía, por ejemplo: el worker los verá más adelante
+        print(f"⚠️ No se pudieron reencolar los posts en proceso: {e}")
+    finally:
+        # Una conexión SQLite abierta en el maestro no debe heredarse por fork
+        connections.close_all()
+
+
+def start_classification_worker():
+    """Arranca el pool y lo despierta para vaciar los pendientes de antes del reinicio."""
+    if not inprocess_worker():
+        return
+    from core.application.classification_worker import ClassificationWorker
+    ClassificationWorker.notify()
+
+
+def preload_model():
+    from core.application.ai_service import MiningEngine
+    try:
+        MiningEngine.preload()
+    except Exception as e:
+        # El servidor arranca igual; /ready reporta el error y analyze() reintenta
+        print(f"❌ No se pudo precargar el modelo: {e}")
+
+
+def start_warm_up() -> threading.Thread | None:
+    """Warm-up en segundo plano: el proceso ya atiende requests mientras tanto."""
+    if not local_model():
+        return None
+    thread = threading.Thread(target=_warm_up, name="sentimind-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def _warm_up():
+    from core.application.ai_service import MiningEngine
+    try:
+        MiningEngine.warm_up()
+    except Exception as e:
+        print(f"❌ Warm-up fallido: {e}")
+        traceback.print_exc()
+
+
+def resident_memory() -> dict:
+    """
+    Memoria del proceso en MB (Linux): rss total y la parte compartida con
+    otros procesos (los pesos heredados del maestro por copy-on-write).
+    """
+    memory = {"rss_mb": None, "shared_mb": None}
+    try:
+        with open('/proc/self/smaps_rollup') as f:
+            values = {}
+            for line in f:
+                key, _, rest = line.partition(':')
+                parts = rest.split()
+                if parts and parts[-1] == 'kB':
+                    values[key] = int(parts[0])
+        memory["rss_mb"] = round(values.get('Rss', 0) / 1024, 1)
+        shared = values.get('Shared_Clean', 0) + values.get('Shared_Dirty', 0)
+        memory["shared_mb"] = round(shared / 1024, 1)
+    except OSError:
+        # Fuera de Linux: pico de memoria residente (macOS lo da en bytes, Linux en kB)
+        try:
+            import resource
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            memory["rss_mb"] = round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+        except ImportError:
+            pass
+    return memory
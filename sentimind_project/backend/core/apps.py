@@ -1,5 +1,16 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
 
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from core.application.category_registry import CategoryRegistry
+
+        # Renombrar o borrar una categoría (admin, shell) invalida el mapa en memoria
+        Category = self.get_model('Category')
+        post_save.connect(CategoryRegistry.invalidate, sender=Category,
+                          dispatch_uid='category_registry_save')
+        post_delete.connect(CategoryRegistry.invalidate, sender=Category,
+                            dispatch_uid='category_registry_delete')
@@ -0,0 +1,24 @@
+"""
+Reglas de la máscara de categorías de un Post.
+Cada etiqueta de TAXONOMY ocupa un bit (según su posición), así el filtro
+por categorías es una operación AND sobre una columna de Post, sin JOIN
+contra PostCategory/Category ni DISTINCT.
+"""
+
+
+def category_bit(name: str, taxonomy: list[str]) -> int | None:
+    """Bit de `name`, o None si no pertenece a la taxonomía actual."""
+    try:
+        return 1 << taxonomy.index(name)
+    except ValueError:
+        return None
+
+
+def category_mask(names, taxonomy: list[str]) -> int:
+    """Máscara con los bits de todas las categorías de `names` que están en la taxonomía."""
+    mask = 0
+    for name in names:
+        bit = category_bit(name, taxonomy)
+        if bit is not None:
+            mask |= bit
+    return mask
@@ -0,0 +1,104 @@
+"""
+Filtros del listado de posts.
+"""
+from django.db.models import Exists, F, OuterRef, Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from core.application.ai_service import MiningEngine
+from core.application import search
+from core.domain.categories import category_bit
+from core.models import PostCategory
+
+
+class CategoryFilterBackend(BaseFilterBackend):
+    """
+    Filtro por cualquier categoría (no solo la principal):
+    - ?category=Humor                      -> posts con Humor
+    - ?category=Humor,Amor (o repetido)    -> con Humor O Amor
+    - ?category=Humor,Amor&category_match=all -> con Humor Y Amor
+    - ?min_confidence=0.7                  -> además, con confianza >= 0.7 en esas categorías
+
+    Usa Post.category_mask (AND de bits sobre una columna, sin JOIN ni DISTINCT).
+    Solo la confianza mínima y las categorías fuera de TAXONOMY (posts antiguos)
+    necesitan un EXISTS sobre PostCategory, que va por el índice (post, category).
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        names = [
+            name.strip()
+            for value in request.query_params.getlist('category')
+            for name in value.split(',')
+            if name.strip()
+        ]
+        if not names:
+            return queryset
+
+        match_all = request.query_params.get('category_match', 'any') == 'all'
+        min_confidence = self._min_confidence(request)
+
+        bits = 0
+        unknown = []
+        for name in names:
+            bit = category_bit(name, MiningEngine.TAXONOMY)
+            if bit is None:
+                unknown.append(name)
+            else:
+                bits |= bit
+
+        conditions = []
+        if bits:
+            queryset = queryset.alias(matched_categories=F('category_mask').bitand(bits))
+            conditions.append(Q(matched_categories=bits) if match_all else Q(matched_categories__gt=0))
+
+        if min_confidence is not None:
+            # El EXISTS confirma la confianza; la máscara solo sirve de prefiltro
+            # cuando todas las categorías pedidas tienen bit (o se piden todas)
+            condition = self._combine(
+                [self._has_category(name, min_confidence) for name in names], match_all
+            )
+            if bits and (match_all or not unknown):
+                condition = conditions[0] & condition
+            return queryset.filter(condition)
+
+        conditions.extend(self._has_category(name) for name in unknown)
+        return queryset.filter(self._combine(conditions, match_all))
+
+    @staticmethod
+    def _min_confidence(request):
+        value = request.query_params.get('min_confidence')
+        if value in (None, ''):
+            return None
+        try:
+            return float(value)
+        except ValueError:
+            raise ValidationError({"min_confidence": "Debe ser un número entre 0 y 1"})
+
+    @staticmethod
+    def _has_category(name, min_confidence=None):
+        links = PostCategory.objects.filter(post=OuterRef('pk'), category__name=name)
+        if min_confidence is not None:
+            links = links.filter(confidence__gte=min_confidence)
+        return Q(Exists(links))
+
+    @staticmethod
+    def _combine(conditions, match_all):
+        combined = conditions[0]
+        for condition in conditions[1:]:
+            combined = (combined & condition) if match_all else (combined | condition)
+        return combined
+
+
+class SearchFilterBackend(BaseFilterBackend):
+    """
+    Búsqueda de texto completo: ?q=palabras -> posts con todas las palabras
+    (sin distinguir mayúsculas ni tildes), ordenados por relevancia.
+    Se combina con ?primary_category= y ?category= (ver core/application/search.py).
+    """
+    search_param = 'q'
+
+    def filter_queryset(self, request, queryset, view):
+        text = request.query_params.get(self.search_param, '').strip()
+        if not text:
+            return queryset
+        return search.search(queryset, text)
@@ -0,0 +1,48 @@
+"""
+Tiempos por request: etapas en el header Server-Timing e histogramas para /metrics.
+Las consultas SQL se miden con un execute_wrapper de la conexión (etapa "db"),
+así cuentan todas las escrituras y lecturas sin instrumentar cada llamada.
+"""
+import time
+
+from django.db import connection
+
+from core.application.config import get_setting
+from core.application import telemetry
+
+
+class ServerTimingMiddleware:
+    """
+    Mide el request completo ("total") y junta las etapas registradas con
+    telemetry.stage() durante él. SENTIMIND_SERVER_TIMING=False deja de
+    enviar el header (las métricas se siguen juntando).
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        with telemetry.collect() as timings, connection.execute_wrapper(_timed_query):
+            response = self.get_response(request)
+        total = time.perf_counter() - start
+
+        match = getattr(request, 'resolver_match', None)
+        route = match.route if match else 'unmatched'
+        telemetry.Metrics.observe('sentimind_request_seconds', total, route=route, method=request.method)
+        telemetry.Metrics.increment(
+            'sentimind_requests_total', route=route, method=request.method, status=str(response.status_code)
+        )
+
+        if get_setting('SENTIMIND_SERVER_TIMING', True, bool):
+            timings['total'] = [total, 1]
+            response['Server-Timing'] = telemetry.server_timing(timings)
+        return response
+
+
+def _timed_query(execute, sql, params, many, context):
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        telemetry.record('db', time.perf_counter() - start)
@@ -0,0 +1,129 @@
+"""
+Paginación por cursor (keyset) para el listado de posts.
+El cursor es el par (created_at, id) del último post de la página, así que
+la página siguiente es un WHERE sobre el índice compuesto, sin OFFSET, y no
+se corre aunque lleguen posts nuevos mientras el cliente pagina.
+
+Las búsquedas (?q=) se ordenan por relevancia y se paginan por OFFSET: bm25
+depende de todo el corpus (IDF y largo promedio), así que cada post nuevo
+mueve los ranks de todos y un cursor (rank, id) no es estable. Las páginas de
+una búsqueda son aproximadas: si cambia el índice entre pedidos, un resultado
+puede repetirse o saltearse.
+"""
+import base64
+from collections import OrderedDict
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from core.application.config import get_setting
+
+
+class PostCursorPagination(BasePagination):
+    """
+    Orden fijo: -created_at, -id (o search_rank, -id por offset si el
+    queryset viene anotado por SearchFilterBackend).
+    ?cursor=<opaco>  &  ?page_size=N (máximo SENTIMIND_MAX_PAGE_SIZE)
+    Acepta querysets de modelos o de filas .values() (con id y created_at).
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    ordering = ('-created_at', '-id')
+    ranked_ordering = ('search_rank', '-id')
+    offset_prefix = 'offset:'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ranked = 'search_rank' in queryset.query.annotations
+
+        position = self.decode_cursor(request)
+        queryset = queryset.order_by(*(self.ranked_ordering if self.ranked else self.ordering))
+        self.offset = 0
+        if position is not None and self.ranked:
+            self.offset = position
+        elif position is not None:
+            created_at, post_id = position
+            queryset = queryset.filter(
+                Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=post_id)
+            )
+
+        # Un elemento extra para saber si hay página siguiente
+        page = list(queryset[self.offset:self.offset + self.page_size + 1])
+        self.has_next = len(page) > self.page_size
+        self.page = page[:self.page_size]
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request):
+        default = get_setting('SENTIMIND_PAGE_SIZE', 20, int)
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, default))
+        except (TypeError, ValueError):
+            return default
+        return max(1, min(size, get_setting('SENTIMIND_MAX_PAGE_SIZE', 100, int)))
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if self.ranked:
+            cursor = self.encode_offset_cursor(self.offset + self.page_size)
+        else:
+            last = self.page[-1]
+            if isinstance(last, dict):
+                cursor = self.encode_cursor(last['created_at'], last['id'])
+            else:
+                cursor = self.encode_cursor(last.created_at, last.id)
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    @staticmethod
+    def encode_cursor(created_at, post_id) -> str:
+        raw = f"{created_at.isoformat()}|{post_id}"
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+    @classmethod
+    def encode_offset_cursor(cls, offset: int) -> str:
+        raw = f"{cls.offset_prefix}{offset}"
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii')
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8')
+            # Un cursor de búsqueda no sirve para el listado por fecha, ni al revés
+            if raw.startswith(self.offset_prefix) != self.ranked:
+                raise ValueError
+            if self.ranked:
+                offset = int(raw[len(self.offset_prefix):])
+                if offset < 0:
+                    raise ValueError
+                return offset
+            value, post_id = raw.split('|')
+            created_at = parse_datetime(value)
+            if created_at is None:
+                raise ValueError
+            return created_at, int(post_id)
+        except (TypeError, ValueError, UnicodeDecodeError):
+            raise NotFound("Cursor inválido")
@@ -0,0 +1,48 @@
+"""
+Renderer JSON con orjson (extra opcional `fast-json`).
+Produce los mismos bytes que JSONRenderer de DRF con su configuración por
+defecto (compacto, UTF-8 sin escapar); si orjson no está instalado o se pide
+otro formato (indentado, ASCII), delega en JSONRenderer.
+
+Los floats muy chicos o muy grandes se escriben distinto (1e-5 contra 1e-05,
+igual de válidos); por eso los serializers redondean las confianzas.
+"""
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depende del entorno
+    orjson = None
+
+from core.application.telemetry import stage
+
+
+class FastJSONRenderer(JSONRenderer):
+
+    # Opciones de orjson: claves no-str como json.dumps; datetime/UUID/etc.
+    # pasan por el encoder de DRF para mantener su formato
+    OPTIONS = (
+        orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if orjson else 0
+    )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        with stage('render'):
+            return self._render(data, accepted_media_type, renderer_context)
+
+    def _render(self, data, accepted_media_type, renderer_context):
+        if (orjson is None or self.ensure_ascii or not self.compact
+                or self.get_indent(accepted_media_type, renderer_context or {})):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=self.OPTIONS)
+        except orjson.JSONEncodeError:
+            # Enteros de más de 64 bits u objetos desconocidos: misma salida/error que DRF
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # Igual que JSONRenderer: U+2028/U+2029 escapados para poder embeber el JSON en <script>
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
@@ -2,6 +2,18 @@ from rest_framework import serializers
 from core.models import Post, Category, PostCategory
 
 
+# Las confianzas se redondean a 4 decimales: sin notación exponencial, orjson
+# y json.dumps las escriben igual (ver FastJSONRenderer)
+CONFIDENCE_DECIMALS = 4
+
+
+class ConfidenceField(serializers.FloatField):
+    """Confianza redondeada a CONFIDENCE_DECIMALS."""
+
+    def to_representation(self, value):
+        return round(float(value), CONFIDENCE_DECIMALS)
+
+
 class CategorySerializer(serializers.ModelSerializer):
     """Serializer para categorías."""
     class Meta:
@@ -12,6 +24,7 @@ class CategorySerializer(serializers.ModelSerializer):
 class PostCategorySerializer(serializers.ModelSerializer):
     """Serializer para la relación Post-Category con confianza."""
     name = serializers.CharField(source='category.name', read_only=True)
+    confidence = ConfidenceField(read_only=True)
     
     class Meta:
         model = PostCategory
@@ -22,11 +35,13 @@ class PostSerializer(serializers.ModelSerializer):
     """
     Serializer para convertir Post a JSON y viceversa.
     Incluye las múltiples categorías detectadas.
+    Acepta `fields=[...]` para devolver solo un subconjunto (sparse fieldsets).
     """
     categories = PostCategorySerializer(source='post_categories', many=True, read_only=True)
     # Mantener compatibilidad: category = primary_category
     category = serializers.CharField(source='primary_category', read_only=True)
-    confidence = serializers.FloatField(source='primary_confidence', read_only=True)
+    confidence = ConfidenceField(source='primary_confidence', read_only=True)
+    primary_confidence = ConfidenceField(read_only=True)
     
     class Meta:
         model = Post
@@ -35,10 +50,110 @@ class PostSerializer(serializers.ModelSerializer):
             'category', 'confidence',  # Compatibilidad con frontend existente
             'primary_category', 'primary_confidence',
             'categories',  # Nueva: lista de todas las categorías
+            'classification_status',
+            'classification_method',  # Camino que clasificó ("reused" = casi-duplicado)
             'created_at'
         ]
         read_only_fields = ['id', 'category', 'confidence', 'primary_category', 
-                           'primary_confidence', 'categories', 'created_at']
+                           'primary_confidence', 'categories', 'classification_status',
+                           'classification_method', 'created_at']
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class PostRowSerializer:
+    """
+    Camino rápido de lectura para el listado: mismo JSON que PostSerializer
+    pero desde filas .values() y una sola consulta agrupada de categorías,
+    sin instanciar modelos ni campos de DRF por fila.
+    El test de contrato en core/tests.py verifica que la salida sea idéntica.
+    """
+    FIELDS = PostSerializer.Meta.fields
+
+    # Columnas de Post según los campos pedidos (id y created_at siempre: los usa el cursor)
+    COLUMNS = {
+        'content': 'content',
+        'category': 'primary_category',
+        'primary_category': 'primary_category',
+        'confidence': 'primary_confidence',
+        'primary_confidence': 'primary_confidence',
+        'classification_status': 'classification_status',
+        'classification_method': 'classification_method',
+    }
+
+    _datetime = serializers.DateTimeField()
+
+    @classmethod
+    def values(cls, queryset, fields=None):
+        """Queryset de filas (dict) con solo las columnas necesarias."""
+        fields = cls._fields(fields)
+        columns = ['id', 'created_at'] + sorted({cls.COLUMNS[f] for f in fields if f in cls.COLUMNS})
+        return queryset.prefetch_related(None).values(*columns)
+
+    @classmethod
+    def serialize(cls, rows, fields=None) -> list[dict]:
+        fields = cls._fields(fields)
+        categories = cls._categories([row['id'] for row in rows]) if 'categories' in fields else {}
+        to_datetime = cls._datetime.to_representation
+
+        data = []
+        for row in rows:
+            full = {
+                'id': row['id'],
+                'content': row.get('content'),
+                'category': row.get('primary_category'),
+                'confidence': cls._float(row.get('primary_confidence')),
+                'primary_category': row.get('primary_category'),
+                'primary_confidence': cls._float(row.get('primary_confidence')),
+                'categories': categories.get(row['id'], []),
+                'classification_status': row.get('classification_status'),
+                'classification_method': row.get('classification_method'),
+                'created_at': to_datetime(row['created_at']),
+            }
+            data.append({name: full[name] for name in fields})
+        return data
+
+    @classmethod
+    def _fields(cls, fields):
+        if fields is None:
+            return cls.FIELDS
+        return [name for name in cls.FIELDS if name in fields]
+
+    @staticmethod
+    def _float(value):
+        return None if value is None else round(float(value), CONFIDENCE_DECIMALS)
+
+    @staticmethod
+    def _categories(post_ids) -> dict:
+        """post_id -> [{"name", "confidence"}] en el orden de PostCategory.Meta.ordering."""
+        grouped = {}
+        links = (
+            PostCategory.objects.filter(post_id__in=post_ids)
+            .values_list('post_id', 'category__name', 'confidence')
+            .order_by('-confidence', 'id')
+        )
+        for post_id, name, confidence in links:
+            grouped.setdefault(post_id, []).append(
+                {'name': name, 'confidence': round(float(confidence), CONFIDENCE_DECIMALS)}
+            )
+        return grouped
+
+
+class PostStatusSerializer(serializers.ModelSerializer):
+    """
+    Serializer para consultar el estado de clasificación de un post.
+    """
+    categories = PostCategorySerializer(source='post_categories', many=True, read_only=True)
+    
+    class Meta:
+        model = Post
+        fields = ['id', 'classification_status', 'primary_category',
+                  'primary_confidence', 'categories']
+        read_only_fields = fields
 
 
 class PostCreateSerializer(serializers.Serializer):
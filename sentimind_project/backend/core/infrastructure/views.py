@@ -1,82 +1,145 @@
 from rest_framework import generics, status
 from rest_framework.response import Response
+from rest_framework.reverse import reverse
 from django_filters.rest_framework import DjangoFilterBackend
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
 from django.db import transaction
-from core.models import Post, Category, PostCategory
-from core.infrastructure.serializers import PostSerializer
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+import asyncio
+from datetime import datetime, timedelta, timezone as dt_timezone
+import hashlib
+from core.models import Post
+from core.infrastructure.serializers import (
+    PostSerializer, PostRowSerializer, PostStatusSerializer, PostCreateSerializer
+)
+from core.infrastructure.pagination import PostCursorPagination
+from core.infrastructure.filters import CategoryFilterBackend, SearchFilterBackend
 from core.application.ai_service import MiningEngine
+from core.application import feed
+from core.application.classification_worker import ClassificationWorker
+from core.application.config import get_setting
+from core.application.list_cache import PostListCache
+from core.application.post_writer import PostWriter
+from core.application import stats_service
+from core.application.telemetry import Metrics, stage
+from core.application.post_service import (
+    FALLBACK_ANALYSIS, bulk_create_posts, create_pending_post
+)
 import traceback
 
 
+def _representation_key(request) -> str:
+    # El mismo URL tiene dos representaciones (JSON y API navegable)
+    return f"{request.build_absolute_uri()}|{request.META.get('HTTP_ACCEPT', '')}"
+
+
+def _posts_etag(request, *args, **kwargs):
+    return PostListCache.etag(_representation_key(request))
+
+
+def _posts_last_modified(request, *args, **kwargs):
+    return datetime.fromtimestamp(PostListCache.last_modified(), tz=dt_timezone.utc)
+
+
+def _categories_etag(request, *args, **kwargs):
+    taxonomy = '|'.join(MiningEngine.TAXONOMY)
+    return f'"{hashlib.sha256(taxonomy.encode("utf-8")).hexdigest()[:16]}"'
+
+
 class PostListCreateView(generics.ListCreateAPIView):
     """
     Endpoint principal:
-    - GET: Lista posts con filtro por categoría (?category=Alegría o ?primary_category=Alegría)
+    - GET: Lista posts con filtro por categoría (?category=Alegría o ?primary_category=Alegría;
+      varias con ?category=A,B&category_match=any|all y ?min_confidence=0.7)
+      Búsqueda de texto completo con ?q=palabras (ordenada por relevancia)
+      Paginado por cursor (?cursor=...&page_size=N) y con ?fields=id,content,...
+      para pedir solo algunos campos.
+      ETag/Last-Modified por filtro (304 si no hubo escrituras) y, con
+      SENTIMIND_LIST_CACHE=True, primera página cacheada en el servidor.
     - POST: Crea un post y ejecuta la IA automáticamente (detecta múltiples emociones).
+      Con SENTIMIND_ASYNC_CLASSIFICATION=True guarda el post como "pending",
+      responde 202 y la IA corre en segundo plano (ver PostStatusView).
     """
-    queryset = Post.objects.prefetch_related('post_categories__category').all()
+    queryset = Post.objects.all()
     serializer_class = PostSerializer
-    filter_backends = [DjangoFilterBackend]
+    filter_backends = [DjangoFilterBackend, CategoryFilterBackend, SearchFilterBackend]
     filterset_fields = ['primary_category']  # Filtrar por categoría principal
+    pagination_class = PostCursorPagination
 
-    def get_queryset(self):
-        """Permite filtrar por cualquier categoría (no solo la principal)."""
-        queryset = super().get_queryset()
+    @method_decorator(condition(etag_func=_posts_etag, last_modified_func=_posts_last_modified))
+    def list(self, request, *args, **kwargs):
+        """
+        Camino rápido: filas .values() + PostRowSerializer en lugar de
+        instancias de Post y PostSerializer (mismo JSON, ver test de contrato).
+        El filtro por cualquier categoría lo aplica CategoryFilterBackend.
+        """
+        # Solo la primera página: es la que consultan los polls del frontend
+        cache_key = _representation_key(request)
+        use_cache = PostListCache.enabled() and not request.query_params.get('cursor')
+        data = PostListCache.get_page(cache_key) if use_cache else None
         
-        # Filtro adicional: posts que contengan una categoría específica
-        category = self.request.query_params.get('category')
-        if category:
-            queryset = queryset.filter(categories__name=category).distinct()
+        if data is None:
+            fields = self.get_requested_fields()
+            queryset = self.filter_queryset(self.get_queryset())
+            page = self.paginate_queryset(PostRowSerializer.values(queryset, fields))
+            with stage('serialize'):
+                data = self.get_paginated_response(PostRowSerializer.serialize(page, fields)).data
+            if use_cache:
+                PostListCache.set_page(cache_key, data)
         
-        return queryset
+        response = Response(data)
+        # El cliente puede guardar la respuesta pero debe revalidarla (If-None-Match -> 304)
+        patch_cache_control(response, no_cache=True)
+        patch_vary_headers(response, ['Accept'])
+        return response
+
+    def get_requested_fields(self):
+        """?fields=id,category,... -> lista de campos, o None si no se pidió."""
+        fields = self.request.query_params.get('fields')
+        if not fields:
+            return None
+        return [name.strip() for name in fields.split(',') if name.strip()]
 
-    @transaction.atomic
     def create(self, request, *args, **kwargs):
         try:
-            content = request.data.get('content')
-            
-            if not content or len(content.strip()) < 3:
+            # Mismas reglas que cada ítem de /api/posts/bulk/ (largo mínimo y máximo, texto recortado)
+            validation = PostCreateSerializer(data=request.data)
+            if not validation.is_valid():
                 return Response(
-                    {"error": "El contenido debe tener al menos 3 caracteres"},
+                    {"error": "Contenido inválido", "errors": validation.errors},
                     status=status.HTTP_400_BAD_REQUEST
                 )
+            content = validation.validated_data['content']
             
-            # 1. Llamar a la capa de minería (Lógica de Negocio)
+            if get_setting('SENTIMIND_ASYNC_CLASSIFICATION', False, bool):
+                return self._create_async(content)
+            
+            # 1. Llamar a la capa de minería (Lógica de Negocio), fuera de
+            # toda transacción: SQLite no queda bloqueado durante la inferencia
             try:
                 analysis = MiningEngine.analyze(content)
             except Exception as e:
                 print(f"⚠️ Error en análisis: {e}")
                 traceback.print_exc()
                 # Fallback: crear post sin categorización
-                analysis = {
-                    "categories": [{"name": "Reflexión", "confidence": 0.5}],
-                    "primary_category": "Reflexión",
-                    "primary_confidence": 0.5,
-                    "method": "fallback-error"
-                }
+                analysis = FALLBACK_ANALYSIS
+                Metrics.increment('sentimind_classification_fallbacks_total', source='create')
             
-            # 2. Crear la entidad Post
-            post = Post.objects.create(
-                content=content,
-                primary_category=analysis['primary_category'],
-                primary_confidence=analysis['primary_confidence']
-            )
+            # 2. Crear la entidad Post y sus relaciones con las categorías detectadas
+            # en una transacción corta (agrupada con otros requests si hay group commit)
+            post = PostWriter.create(content, analysis)
             
-            # 3. Crear las relaciones con las categorías detectadas
-            for cat_data in analysis['categories']:
-                # Obtener o crear la categoría
-                category, _ = Category.objects.get_or_create(name=cat_data['name'])
-                
-                # Crear la relación Post-Category
-                PostCategory.objects.create(
-                    post=post,
-                    category=category,
-                    confidence=cat_data['confidence']
-                )
-            
-            # 4. Serializar respuesta
-            serializer = self.get_serializer(post)
-            return Response(serializer.data, status=status.HTTP_201_CREATED)
+            # 3. Serializar respuesta
+            with stage('serialize'):
+                data = self.get_serializer(post).data
+            return Response(data, status=status.HTTP_201_CREATED)
             
         except Exception as e:
             print(f"❌ Error creando post: {e}")
@@ -86,12 +149,277 @@ class PostListCreateView(generics.ListCreateAPIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+    def _create_async(self, content):
+        """Guarda el post sin clasificar y delega la IA al worker."""
+        with transaction.atomic():
+            post = create_pending_post(content)
+            
+            # En modo "inprocess" el pool de hilos del propio worker web lo toma;
+            # en modo "command" lo hace `manage.py classify_pending`.
+            if get_setting('SENTIMIND_ASYNC_WORKER_MODE', 'inprocess') == 'inprocess':
+                transaction.on_commit(ClassificationWorker.notify)
+        
+        serializer = self.get_serializer(post)
+        headers = {'Location': reverse('post-status', args=[post.id], request=self.request)}
+        return Response(serializer.data, status=status.HTTP_202_ACCEPTED, headers=headers)
+
+
+class PostBulkCreateView(generics.GenericAPIView):
+    """
+    Ingesta masiva (feeds de partners):
+    POST /api/posts/bulk/  con  [{"content": "..."}, ...]  o  {"posts": [...]}
+
+    Valida con PostCreateSerializer(many=True), clasifica los válidos en lotes
+    del modelo e inserta todo con bulk_create en una sola transacción.
+    Responde 201 si todos se crearon o 207 con el detalle por ítem si hubo errores.
+    """
+    serializer_class = PostSerializer
+
+    def post(self, request, *args, **kwargs):
+        items = request.data.get('posts') if isinstance(request.data, dict) else request.data
+        if not isinstance(items, list) or not items:
+            return Response(
+                {"error": "Se espera una lista no vacía de posts"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        max_size = get_setting('SENTIMIND_BULK_MAX_SIZE', 100, int)
+        if len(items) > max_size:
+            return Response(
+                {"error": f"Máximo {max_size} posts por request (recibidos {len(items)})"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        # 1. Validar todos; los inválidos se reportan sin frenar al resto
+        validation = PostCreateSerializer(data=items, many=True)
+        validation.is_valid()
+        # Según la versión de DRF los errores vienen como lista o como {índice: errores}
+        errors = validation.errors or {}
+        if isinstance(errors, dict):
+            errors = [errors.get(index, {}) for index in range(len(items))]
+        # CharField acepta números (los convierte a texto): str() como hace el serializer
+        valid = [
+            (index, str(item['content']).strip())
+            for index, (item, item_errors) in enumerate(zip(items, errors))
+            if not item_errors
+        ]
+        contents = [content for _, content in valid]
+        
+        # 2. Clasificar en lotes del tamaño de una pasada del modelo
+        async_mode = get_setting('SENTIMIND_ASYNC_CLASSIFICATION', False, bool)
+        analyses = None if async_mode else self._analyze(contents)
+        
+        # 3. Insertar todo en una sola transacción
+        with transaction.atomic():
+            posts = bulk_create_posts(contents, analyses) if contents else []
+            if async_mode and posts and get_setting('SENTIMIND_ASYNC_WORKER_MODE', 'inprocess') == 'inprocess':
+                transaction.on_commit(ClassificationWorker.notify)
+        
+        posts_by_id = {
+            post.id: post
+            for post in Post.objects.filter(id__in=[p.id for p in posts])
+            .prefetch_related('post_categories__category')
+        }
+        created = dict(zip((index for index, _ in valid), (posts_by_id[p.id] for p in posts)))
+        
+        results = []
+        for index, item_errors in enumerate(errors):
+            if index in created:
+                results.append({
+                    "index": index,
+                    "status": "created",
+                    "post": self.get_serializer(created[index]).data
+                })
+            else:
+                results.append({"index": index, "status": "error", "errors": item_errors})
+        
+        failed = len(items) - len(created)
+        if not created:
+            response_status = status.HTTP_400_BAD_REQUEST
+        elif failed:
+            response_status = status.HTTP_207_MULTI_STATUS
+        elif async_mode:
+            response_status = status.HTTP_202_ACCEPTED
+        else:
+            response_status = status.HTTP_201_CREATED
+        
+        return Response(
+            {"created": len(created), "failed": failed, "results": results},
+            status=response_status
+        )
+
+    @staticmethod
+    def _analyze(contents):
+        batch_size = get_setting('SENTIMIND_BATCH_MAX_SIZE', 8, int)
+        analyses = []
+        for i in range(0, len(contents), batch_size):
+            batch = contents[i:i + batch_size]
+            try:
+                analyses.extend(MiningEngine.analyze_batch(batch))
+            except Exception as e:
+                print(f"⚠️ Error en análisis por lotes: {e}")
+                traceback.print_exc()
+                analyses.extend([FALLBACK_ANALYSIS] * len(batch))
+                Metrics.increment('sentimind_classification_fallbacks_total', len(batch), source='bulk')
+        return analyses
+
+
+class PostStatusView(generics.RetrieveAPIView):
+    """
+    Estado de clasificación de un post (para hacer polling tras un 202).
+    GET /api/posts/<id>/status/
+    """
+    queryset = Post.objects.prefetch_related('post_categories__category')
+    serializer_class = PostStatusSerializer
+
+
+class PostSimilarView(generics.GenericAPIView):
+    """
+    Posts que "se sienten" parecidos a uno (coseno de embeddings de oraciones).
+    GET /api/posts/<id>/similar/?k=10
+    Acepta los filtros del listado (?primary_category=, ?category=, ?min_confidence=)
+    para buscar solo dentro de esas categorías. Usa el índice de
+    core/application/vector_index.py (`python manage.py rebuild_vector_index`).
+    """
+    queryset = Post.objects.all()
+    filter_backends = [DjangoFilterBackend, CategoryFilterBackend]
+    filterset_fields = ['primary_category']
+    DEFAULT_K = 10
+    MAX_K = 50
+
+    def get(self, request, pk):
+        from core.application.vector_index import VectorIndex, VectorIndexError
+
+        post = get_object_or_404(Post.objects.only('id', 'content'), pk=pk)
+        try:
+            k = int(request.query_params.get('k', self.DEFAULT_K))
+        except ValueError:
+            return Response({"error": "k debe ser un número entero"}, status=status.HTTP_400_BAD_REQUEST)
+        k = max(1, min(k, self.MAX_K))
+
+        try:
+            with stage('similar'):
+                similar = VectorIndex.similar(post, k, self.filter_queryset(self.get_queryset()))
+        except VectorIndexError as e:
+            return Response({"error": str(e)}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+        similarity = dict(similar)
+        rows = {row['id']: row for row in PostRowSerializer.values(Post.objects.filter(id__in=similarity))}
+        with stage('serialize'):
+            results = PostRowSerializer.serialize([rows[post_id] for post_id in similarity if post_id in rows])
+        for item in results:
+            item['similarity'] = round(similarity[item['id']], 4)
+        return Response({"post": post.id, "results": results})
+
+
+async def post_stream(request):
+    """
+    Feed en tiempo real (Server-Sent Events) de posts creados y clasificados:
+    GET /api/posts/stream/?category=Humor,Amor  (alguna de esas categorías)
+
+    Cada evento trae `id` (para reanudar), `event` ("created", "classified"
+    o "reset": recargar el listado) y el post en `data`, igual que en el
+    listado. El navegador reconecta solo enviando Last-Event-ID
+    (también se acepta ?last_event_id=). Servir con el entry point ASGI
+    (sentimind/asgi.py): con WSGI cada cliente ocupa un hilo, así que ahí
+    responde 204 (el navegador no reconecta) salvo con SENTIMIND_FEED_WSGI=True.
+    """
+    if request.method != 'GET':
+        return JsonResponse({"error": "Método no permitido"}, status=status.HTTP_405_METHOD_NOT_ALLOWED)
+
+    categories = [
+        name.strip()
+        for value in request.GET.getlist('category')
+        for name in value.split(',')
+        if name.strip()
+    ]
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        return JsonResponse({"error": "Last-Event-ID debe ser un número entero"},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+    if not isinstance(request, ASGIRequest) and not get_setting('SENTIMIND_FEED_WSGI', False, bool):
+        # Unos pocos clientes agotarían los hilos de gunicorn
+        return HttpResponse(status=status.HTTP_204_NO_CONTENT)
+
+    if not await sync_to_async(feed.available)():
+        return JsonResponse({"error": "Feed no disponible: requiere SQLite con la migración 0011"},
+                            status=status.HTTP_503_SERVICE_UNAVAILABLE)
+
+    if isinstance(request, ASGIRequest):
+        subscription, replay = await sync_to_async(feed.FeedHub.subscribe)(
+            categories, last_event_id, asyncio.get_running_loop()
+        )
+        body = feed.EventStream(subscription, replay)
+    else:
+        subscription, replay = await sync_to_async(feed.FeedHub.subscribe)(categories, last_event_id)
+        body = feed.stream_sync(subscription, replay)
+
+    response = StreamingHttpResponse(body, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # nginx: no acumular el stream en su buffer
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
 
 class CategoryListView(generics.GenericAPIView):
     """
     Endpoint para obtener las categorías disponibles.
+    TAXONOMY solo cambia con un despliegue: cacheable y con ETag para revalidar.
     """
+    MAX_AGE = 3600
+
+    @method_decorator(condition(etag_func=_categories_etag))
     def get(self, request):
-        return Response({
+        response = Response({
             "categories": MiningEngine.TAXONOMY
         })
+        patch_cache_control(response, public=True, max_age=self.MAX_AGE)
+        patch_vary_headers(response, ['Accept'])
+        return response
+
+
+class StatsView(generics.GenericAPIView):
+    """
+    Estadísticas por categoría y por categoría principal, servidas desde los
+    contadores incrementales (sin COUNT(*) sobre Post).
+    GET /api/stats/?granularity=hour|day&since=2026-01-01&until=2026-01-08
+    Por defecto: últimos 7 días (day) o últimas 24 horas (hour).
+    """
+    DEFAULT_RANGE = {'hour': timedelta(hours=24), 'day': timedelta(days=7)}
+
+    def get(self, request):
+        granularity = request.query_params.get('granularity', 'day')
+        if granularity not in stats_service.GRANULARITIES:
+            return Response(
+                {"error": f"granularity debe ser uno de: {', '.join(stats_service.GRANULARITIES)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        
+        try:
+            until = self._parse(request.query_params.get('until'))
+            since = self._parse(request.query_params.get('since'))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        
+        # Rango alineado a horas: hasta el final de la hora en curso
+        until = until or stats_service.hour_bucket(timezone.now()) + timedelta(hours=1)
+        since = since or until - self.DEFAULT_RANGE[granularity]
+        
+        return Response(stats_service.query(granularity, since, until))
+
+    @staticmethod
+    def _parse(value):
+        if not value:
+            return None
+        parsed = parse_datetime(value)
+        if parsed is None:
+            day = parse_date(value)
+            if day is None:
+                raise ValueError(f"Fecha inválida: {value}")
+            parsed = datetime(day.year, day.month, day.day)
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
@@ -0,0 +1,70 @@
+"""
+Auditoría de clasificaciones reutilizadas de casi-duplicados.
+Uso: python manage.py audit_reuse [--limit 200] [--since 2026-01-01] [--batch-size 16]
+
+Reporta la tasa de reuso (posts con classification_method="reused" sobre
+los clasificados) y vuelve a clasificar con el modelo una muestra de los
+reutilizados: un falso reuso es un post al que el modelo le habría dado
+otra categoría principal. Sirve para ajustar SENTIMIND_NEAR_DUP_MAX_DISTANCE.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date, parse_datetime
+
+from core.application.ai_service import MiningEngine
+from core.application.near_duplicates import NearDuplicateIndex
+from core.models import Post
+
+
+class Command(BaseCommand):
+    help = "Reporta la tasa de reuso de casi-duplicados y la de falsos reusos en una muestra."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=200,
+                            help="Posts reutilizados (los más recientes) a reclasificar")
+        parser.add_argument('--since', help="Solo posts creados desde esta fecha (ISO)")
+        parser.add_argument('--batch-size', type=int, default=16, help="Posts por pasada del modelo")
+
+    def handle(self, *args, **options):
+        queryset = Post.objects.filter(classification_status=Post.STATUS_DONE)
+        if options['since']:
+            since = parse_datetime(options['since']) or parse_date(options['since'])
+            if since is None:
+                raise CommandError(f"Fecha inválida: {options['since']}")
+            queryset = queryset.filter(created_at__gte=since)
+
+        classified = queryset.count()
+        reused = queryset.filter(classification_method=NearDuplicateIndex.METHOD)
+        reused_count = reused.count()
+        rate = reused_count / classified if classified else 0.0
+        self.stdout.write(f"♻️ Reutilizados: {reused_count}/{classified} clasificados ({rate:.1%})")
+        if not reused_count:
+            return
+
+        sample = list(
+            reused.order_by('-created_at', '-id').prefetch_related('post_categories__category')[:options['limit']]
+        )
+        self.stdout.write(f"🧪 Reclasificando {len(sample)} posts reutilizados con el modelo...")
+
+        false_primary = 0
+        overlap = 0.0
+        batch_size = max(1, options['batch_size'])
+        for start in range(0, len(sample), batch_size):
+            batch = sample[start:start + batch_size]
+            # Sin caché ni índice de casi-duplicados: la respuesta del modelo
+            results = MiningEngine._infer_batch([post.content for post in batch])
+            for post, result in zip(batch, results):
+                if post.primary_category != result['primary_category']:
+                    false_primary += 1
+                    self.stdout.write(
+                        f"  ✗ #{post.id} reutilizado {post.primary_category}, modelo "
+                        f"{result['primary_category']}: '{post.content[:60]}'"
+                    )
+                stored = {link.category.name for link in post.post_categories.all()}
+                fresh = {category['name'] for category in result['categories']}
+                overlap += len(stored & fresh) / len(stored | fresh) if stored | fresh else 1.0
+
+        total = len(sample)
+        self.stdout.write(
+            f"📊 Falsos reusos (otra categoría principal): {false_primary}/{total} ({false_primary / total:.1%})"
+            f" | coincidencia media de categorías (Jaccard): {overlap / total:.2f}"
+        )
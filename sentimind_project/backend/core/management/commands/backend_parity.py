@@ -0,0 +1,74 @@
+"""
+Compara cada backend de inferencia contra PyTorch fp32.
+Uso: python manage.py backend_parity [--backends torch-int8,onnx] [--source posts] [--limit 200]
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.application.ai_service import MiningEngine
+from core.application.inference_backends import BACKENDS, StubBackend, TorchBackend, get_backend
+from core.models import Post
+
+
+# fp32 es la referencia y el stub no es un modelo (sus resultados no tienen que coincidir)
+DEFAULT_BACKENDS = [name for name in BACKENDS if name not in (TorchBackend.name, StubBackend.name)]
+
+
+class Command(BaseCommand):
+    help = "Reporta cuántas veces cada backend coincide con fp32 en primary_category y su latencia."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--backends', default=','.join(DEFAULT_BACKENDS),
+            help="Backends a comparar, separados por coma"
+        )
+        parser.add_argument(
+            '--source', choices=['posts', 'test-cases'], default='posts',
+            help="Textos de prueba: posts guardados o TEST_CASES de test_classification.py"
+        )
+        parser.add_argument('--limit', type=int, default=200, help="Máximo de textos")
+        parser.add_argument('--batch-size', type=int, default=8, help="Textos por pasada")
+        parser.add_argument('--model', default=MiningEngine.MODEL_NAME)
+
+    def handle(self, *args, **options):
+        texts = self._load_texts(options['source'], options['limit'])
+        if not texts:
+            raise CommandError("No hay textos para comparar")
+
+        names = [n.strip() for n in options['backends'].split(',') if n.strip()]
+        self.stdout.write(f"🧪 {len(texts)} textos, referencia: {TorchBackend.name} (fp32)")
+
+        reference, ref_seconds = self._run(TorchBackend.name, options['model'], texts, options['batch_size'])
+        self._report(TorchBackend.name, reference, reference, ref_seconds, len(texts))
+
+        for name in names:
+            results, seconds = self._run(name, options['model'], texts, options['batch_size'])
+            self._report(name, reference, results, seconds, len(texts))
+
+    def _load_texts(self, source, limit):
+        if source == 'test-cases':
+            from test_classification import TEST_CASES
+            return [text for text, _ in TEST_CASES][:limit]
+        return list(Post.objects.order_by('-created_at').values_list('content', flat=True)[:limit])
+
+    def _run(self, backend_name, model_name, texts, batch_size):
+        classifier = get_backend(backend_name).load(model_name)
+        # Una pasada de calentamiento para no medir la primera inferencia
+        MiningEngine._nli_batch(texts[:1], classifier=classifier)
+
+        results = []
+        start = time.perf_counter()
+        for i in range(0, len(texts), batch_size):
+            results.extend(MiningEngine._nli_batch(texts[i:i + batch_size], classifier=classifier))
+        return results, time.perf_counter() - start
+
+    def _report(self, name, reference, results, seconds, total):
+        agree = sum(
+            1 for ref, res in zip(reference, results)
+            if ref['primary_category'] == res['primary_category']
+        )
+        self.stdout.write(
+            f"  {name:<12} coincidencia primary_category: {agree}/{total} ({agree / total:.1%})"
+            f" | {seconds / total * 1000:.0f} ms/texto"
+        )
@@ -0,0 +1,691 @@
+"""
+Benchmarks de inferencia y de la API con resultados en JSON.
+Uso: python manage.py benchmark [--backend stub] [--only latency,throughput,memory,cold-start,api]
+                                [--table-sizes 100,1000] [--search-size 1000000] [--feed-clients 2000]
+                                [--output resultados.json]
+                                [--compare baseline.json [--tolerance 0.25]] [--results otro.json]
+
+Por defecto usa el backend "stub" (sin pesos ni red): mide batching, buckets,
+serialización y base de datos con un costo de inferencia estable. Con
+--backend torch (u otro) mide el modelo real.
+
+Secciones (sin --only corren las cinco primeras; writes, search y feed son
+más lentas y se piden con --only, p. ej. --only search):
+- latency:    MiningEngine.analyze() secuencial, p50/p95/p99 en ms
+- throughput: textos/s con analyze_batch() por tamaño de batch y con
+              analyze() desde varios hilos (micro-batching)
+- memory:     RSS pico de este proceso
+- cold-start: carga + warm-up del modelo en un proceso nuevo
+- api:        POST y GET /api/posts/ sobre una base de test con N posts
+- writes:     posts/s guardados desde varios hilos, con una transacción por
+              post y con group commit (SQLite en archivo, WAL)
+- search:     primera página de ?q= con el índice FTS5 contra LIKE '%...%'
+              con la tabla llena a --search-size posts (SQLite en archivo)
+- feed:       --feed-clients conexiones SSE inactivas a la app ASGI en este
+              proceso: memoria de Python por conexión y ms desde el commit
+              de un post hasta que llega a todos los clientes
+
+La caché de clasificación se desactiva (se mide la inferencia). Las secciones
+api, writes, search y feed crean y borran su propia base de test: nunca tocan data/db.sqlite3.
+
+--compare compara contra un JSON guardado y falla si alguna métrica empeora
+más que --tolerance (proporción); --results compara un JSON existente sin correr.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, redirect_stdout
+from datetime import datetime, timezone
+import json
+import os
+from pathlib import Path
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+from core.application.ai_service import MiningEngine
+from core.application.category_registry import CategoryRegistry
+
+
+SECTIONS = ('latency', 'throughput', 'memory', 'cold-start', 'api', 'writes', 'search', 'feed')
+# Secciones baratas que corren sin --only; el resto hay que pedirlas
+DEFAULT_SECTIONS = ('latency', 'throughput', 'memory', 'cold-start', 'api')
+
+# Métricas donde más es mejor; el resto (tiempos, memoria) mejora al bajar
+HIGHER_IS_BETTER = ('texts_per_s', 'posts_per_s')
+# Diferencias absolutas menores son ruido (ej. un warm-up de 0.001s a 0.002s)
+NOISE_FLOOR = 0.01
+
+_COLD_START_PROBE = """
+import json, os, time
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sentimind.settings')
+import django
+django.setup()
+from core.application.ai_service import MiningEngine
+start = time.perf_counter()
+MiningEngine.warm_up()
+total = time.perf_counter() - start
+try:
+    with open('/proc/self/status') as f:
+        peak_kb = next(int(line.split()[1]) for line in f if line.startswith('VmHWM:'))
+except OSError:
+    import resource, sys
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 if sys.platform == 'darwin' else 1)
+print(json.dumps({
+    "load_seconds": MiningEngine._load_seconds,
+    "warmup_seconds": MiningEngine._warmup_seconds,
+    "total_seconds": total,
+    "rss_mb": peak_kb / 1024,
+}))
+"""
+
+
+def corpus(count: int, seed: int = 0, start: int = 0) -> list[str]:
+    """
+    Posts de prueba de 1 a 8 oraciones (hasta ~1000 caracteres) armados con
+    TEST_CASES, terminados en "#<start + i>".
+    """
+    from test_classification import TEST_CASES
+
+    sentences = [text for text, _ in TEST_CASES]
+    rng = random.Random(seed)
+    texts = []
+    for i in range(count):
+        text = ' '.join(rng.choice(sentences) for _ in range(rng.randint(1, 8)))
+        # Sufijo único: sin textos repetidos aunque la caché estuviera activa
+        texts.append(f"{text[:990]} #{start + i}")
+    return texts
+
+
+def percentiles(samples: list[float]) -> dict:
+    """p50/p95/p99 (en las mismas unidades que `samples`)."""
+    if len(samples) < 2:
+        value = samples[0] if samples else 0.0
+        return {"p50": value, "p95": value, "p99": value}
+    cuts = statistics.quantiles(samples, n=100, method='inclusive')
+    return {"p50": statistics.median(samples), "p95": cuts[94], "p99": cuts[98]}
+
+
+@contextmanager
+def inference_backend(name: str):
+    """
+    Usa el backend `name` con un modelo recién cargado y sin caché ni servidor
+    de inferencia; al salir restaura el estado de MiningEngine.
+    """
+    overrides = {
+        'SENTIMIND_INFERENCE_BACKEND': name,
+        'SENTIMIND_CACHE_ENABLED': False,
+        'SENTIMIND_INFERENCE_SERVER': '',
+    }
+    if name == 'stub':
+        # Los caminos rápidos cargan sus propios modelos
+        overrides['SENTIMIND_CLASSIFICATION_MODE'] = MiningEngine.MODE_NLI
+
+    fields = ('_classifier', '_model_name', '_backend_name', '_batcher', '_load_seconds', '_warmup_seconds', '_warm')
+    state = {field: getattr(MiningEngine, field) for field in fields}
+    MiningEngine._classifier = None
+    MiningEngine._batcher = None
+    try:
+        with override_settings(**overrides):
+            yield
+    finally:
+        for field, value in state.items():
+            setattr(MiningEngine, field, value)
+
+
+def bench_latency(texts: list[str]) -> dict:
+    MiningEngine.warm_up()
+    samples = []
+    for text in texts:
+        start = time.perf_counter()
+        MiningEngine.analyze(text)
+        samples.append((time.perf_counter() - start) * 1000)
+    return {f"analyze.latency_ms.{name}": value for name, value in percentiles(samples).items()}
+
+
+def bench_throughput(texts: list[str], batch_sizes: list[int], concurrency: list[int]) -> dict:
+    MiningEngine.warm_up()
+    metrics = {}
+    for size in batch_sizes:
+        start = time.perf_counter()
+        for i in range(0, len(texts), size):
+            MiningEngine.analyze_batch(texts[i:i + size])
+        metrics[f"analyze.batch_{size}.texts_per_s"] = len(texts) / (time.perf_counter() - start)
+
+    for workers in concurrency:
+        def timed(text):
+            start = time.perf_counter()
+            MiningEngine.analyze(text)
+            return (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            samples = list(pool.map(timed, texts))
+        metrics[f"analyze.concurrency_{workers}.texts_per_s"] = len(texts) / (time.perf_counter() - start)
+        metrics[f"analyze.concurrency_{workers}.latency_ms.p95"] = percentiles(samples)["p95"]
+    return metrics
+
+
+def bench_memory() -> dict:
+    from core.application.warmup import resident_memory
+    try:
+        with open('/proc/self/status') as f:
+            peak_kb = next(int(line.split()[1]) for line in f if line.startswith('VmHWM:'))
+        peak = peak_kb / 1024
+    except OSError:
+        peak = resident_memory()["rss_mb"] or 0.0
+    return {"memory.peak_rss_mb": peak}
+
+
+def bench_cold_start(backend: str) -> dict:
+    """Carga + warm-up en un proceso nuevo (el costo de arrancar un worker)."""
+    env = {
+        **os.environ,
+        "SENTIMIND_INFERENCE_BACKEND": backend,
+        "SENTIMIND_PRELOAD_MODEL": "False",
+        "SENTIMIND_INFERENCE_SERVER": "",
+        "SENTIMIND_CACHE_ENABLED": "False",
+    }
+    if backend == 'stub':
+        env["SENTIMIND_CLASSIFICATION_MODE"] = MiningEngine.MODE_NLI
+    completed = subprocess.run(
+        [sys.executable, "-c", _COLD_START_PROBE],
+        cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=False
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"cold start falló:\n{completed.stderr[-2000:]}")
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    return {f"cold_start.{name}": value for name, value in result.items()}
+
+
+def bench_api(table_sizes: list[int], requests: int) -> dict:
+    """POST y GET /api/posts/ con la tabla llena hasta cada tamaño, en una base de test propia."""
+    from rest_framework.test import APIClient
+    from core.application.post_service import bulk_create_posts
+
+    metrics = {}
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    CategoryRegistry.invalidate()
+    try:
+        with override_settings(CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}):
+            client = APIClient()
+            texts = corpus(max(table_sizes) + requests, seed=1)
+            filled = 0
+            for size in sorted(table_sizes):
+                if size > filled:
+                    contents = texts[filled:size]
+                    analyses = MiningEngine.analyze_batch(contents)
+                    with transaction.atomic():
+                        for start in range(0, len(contents), 500):
+                            bulk_create_posts(contents[start:start + 500], analyses[start:start + 500])
+                    filled = size
+
+                prefix = f"api.posts_{size}"
+                create = _timed_requests(
+                    lambda i: client.post('/api/posts/', {"content": texts[-(i + 1)]}, format='json'),
+                    requests, expected=(201, 202)
+                )
+                metrics.update({f"{prefix}.create_ms.{k}": v for k, v in create.items()})
+                listing = _timed_requests(lambda i: client.get('/api/posts/'), requests, expected=(200,))
+                metrics.update({f"{prefix}.list_ms.{k}": v for k, v in listing.items()})
+                filtered = _timed_requests(
+                    lambda i: client.get('/api/posts/', {"category": MiningEngine.TAXONOMY[i % 5]}),
+                    requests, expected=(200,)
+                )
+                metrics.update({f"{prefix}.filtered_list_ms.{k}": v for k, v in filtered.items()})
+                # Los POST del tamaño anterior no cuentan para el siguiente
+                filled += requests
+    finally:
+        CategoryRegistry.invalidate()
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+    return metrics
+
+
+def bench_writes(count: int, concurrency: list[int], window_ms: float = 5.0) -> dict:
+    """
+    Guarda `count` posts ya clasificados desde N hilos, con una transacción por
+    post y con group commit. Usa una base de test en archivo (no en memoria)
+    para medir el lock de escritura y los commits reales de SQLite.
+    """
+    from core.application.post_writer import PostWriter
+
+    name = MiningEngine.TAXONOMY[0]
+    analysis = {
+        "categories": [{"name": name, "confidence": 0.9}],
+        "primary_category": name,
+        "primary_confidence": 0.9,
+        "method": "benchmark",
+    }
+    texts = corpus(count, seed=2)
+    metrics = {}
+
+    test_settings = connection.settings_dict['TEST']
+    previous_test_name = test_settings.get('NAME')
+    writer_state = (PostWriter._batcher, PostWriter._batcher_config)
+    with tempfile.TemporaryDirectory() as tmp:
+        test_settings['NAME'] = str(Path(tmp) / 'writes.sqlite3')
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        CategoryRegistry.invalidate()
+        try:
+            for label, window in (("writes", 0), ("writes.group_commit", window_ms)):
+                with override_settings(
+                    SENTIMIND_WRITE_BATCH_WINDOW_MS=window,
+                    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+                ):
+                    for workers in concurrency:
+                        metrics[f"{label}.concurrency_{workers}.posts_per_s"] = _threaded_writes(
+                            texts, analysis, workers, PostWriter.create
+                        )
+        finally:
+            PostWriter._batcher, PostWriter._batcher_config = writer_state
+            CategoryRegistry.invalidate()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            test_settings['NAME'] = previous_test_name
+    return metrics
+
+
+def bench_search(size: int, repeats: int) -> dict:
+    """
+    Primera página de una búsqueda con el índice FTS5 (ordenada por
+    relevancia) y con LIKE '%palabra%' (ordenada por fecha, lo que haría
+    ?q= sin índice), con `size` posts en una base de test en archivo.
+    """
+    from collections import Counter
+    from django.db.models import Q
+    from core.application import search
+    from core.models import Post
+
+    metrics = {}
+    test_settings = connection.settings_dict['TEST']
+    previous_test_name = test_settings.get('NAME')
+    with tempfile.TemporaryDirectory() as tmp:
+        test_settings['NAME'] = str(Path(tmp) / 'search.sqlite3')
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        search._available = None
+        try:
+            start = time.perf_counter()
+            sample = _fill_posts(size)
+            metrics["search.fill_s"] = time.perf_counter() - start
+
+            # Una palabra muy común, una en ~2% de los posts y una en un solo post
+            frequency = Counter(
+                word for text in sample for word in set(search.terms(text.lower())) if word.isalpha() and len(word) > 3
+            )
+            common = frequency.most_common(1)[0][0]
+            medium = min(frequency, key=lambda word: abs(frequency[word] / len(sample) - 0.02))
+            queries = {
+                "common": common,
+                "medium": medium,
+                "rare": str(size // 2),
+                "two_words": f"{medium} {common}",
+                "no_match": "ornitorrinco",
+            }
+
+            posts = Post.objects.all()
+            for name, text in queries.items():
+                fts = _timed_queries(
+                    lambda: list(search.search(posts, text).order_by('search_rank', '-id').values('id')[:20]), repeats
+                )
+                like_filter = Q()
+                for word in search.terms(text):
+                    like_filter &= Q(content__icontains=word)
+                like = _timed_queries(
+                    lambda: list(posts.filter(like_filter).order_by('-created_at', '-id').values('id')[:20]), repeats
+                )
+                metrics[f"search.{name}.fts_ms"] = fts
+                metrics[f"search.{name}.like_ms"] = like
+        finally:
+            search._available = None
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            test_settings['NAME'] = previous_test_name
+    return metrics
+
+
+def bench_feed(clients: int, posts: int = 5) -> dict:
+    """
+    Abre `clients` conexiones a GET /api/posts/stream/ contra la app ASGI
+    (sin servidor: se llama a la aplicación con scope/receive/send), mide la
+    memoria de Python que agrega cada una y el tiempo desde que se confirma
+    un post hasta que el evento llegó a todas. Base de test en archivo: el
+    hilo del hub la lee con su propia conexión, como en producción.
+    """
+    import asyncio
+    import tracemalloc
+    from asgiref.sync import sync_to_async
+    from django.core.asgi import get_asgi_application
+    from core.application import feed
+    from core.application.post_service import create_post
+
+    name = MiningEngine.TAXONOMY[0]
+    analysis = {
+        "categories": [{"name": name, "confidence": 0.9}],
+        "primary_category": name,
+        "primary_confidence": 0.9,
+        "method": "benchmark",
+    }
+    application = get_asgi_application()
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET",
+        "scheme": "http", "path": "/api/posts/stream/", "raw_path": b"/api/posts/stream/", "query_string": b"",
+        "root_path": "", "headers": [(b"host", b"localhost"), (b"accept", b"text/event-stream")],
+        "client": ("127.0.0.1", 50000), "server": ("127.0.0.1", 8000),
+    }
+
+    async def run() -> dict:
+        disconnect = asyncio.Event()
+        received = [0] * clients
+        connected = asyncio.Semaphore(0)
+        arrived = asyncio.Event()
+
+        def client(index):
+            first = True
+
+            async def receive():
+                nonlocal first
+                if first:
+                    first = False
+                    return {"type": "http.request", "body": b"", "more_body": False}
+                await disconnect.wait()
+                return {"type": "http.disconnect"}
+
+            async def send(message):
+                body = message.get("body", b"")
+                if body.startswith(b"retry:"):
+                    connected.release()
+                elif b"event: created" in body:
+                    received[index] += 1
+                    if min(received) == max(received):
+                        arrived.set()
+
+            return application(dict(scope), receive, send)
+
+        # La primera conexión paga imports y cachés de URLs: no cuenta para la memoria
+        tasks = [asyncio.create_task(client(0))]
+        await connected.acquire()
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        tasks += [asyncio.create_task(client(i)) for i in range(1, clients)]
+        for _ in range(1, clients):
+            await connected.acquire()
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        per_client = sum(stat.size_diff for stat in after.compare_to(before, 'filename')) / max(clients - 1, 1)
+
+        samples = []
+        for target in range(1, posts + 1):
+            arrived.clear()
+            start = time.perf_counter()
+            await sync_to_async(_create_in_transaction, thread_sensitive=False)(
+                create_post, f"Post del feed {target}", analysis
+            )
+            await asyncio.wait_for(arrived.wait(), 30)
+            samples.append((time.perf_counter() - start) * 1000)
+
+        disconnect.set()
+        await asyncio.gather(*tasks)
+        return {"python_kb_per_client": per_client / 1024, "fanout_ms": samples}
+
+    metrics = {}
+    test_settings = connection.settings_dict['TEST']
+    previous_test_name = test_settings.get('NAME')
+    with tempfile.TemporaryDirectory() as tmp:
+        test_settings['NAME'] = str(Path(tmp) / 'feed.sqlite3')
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        CategoryRegistry.invalidate()
+        feed._available = None
+        try:
+            result = asyncio.run(run())
+            metrics[f"feed.clients_{clients}.python_kb_per_client"] = result["python_kb_per_client"]
+            metrics.update({
+                f"feed.clients_{clients}.fanout_ms.{k}": v for k, v in percentiles(result["fanout_ms"]).items()
+            })
+            metrics[f"feed.clients_{clients}.subscribers_left"] = feed.FeedHub.subscriber_count()
+        finally:
+            feed._available = None
+            CategoryRegistry.invalidate()
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            test_settings['NAME'] = previous_test_name
+    return metrics
+
+
+def _create_in_transaction(create, *args):
+    from django.db import connections
+    try:
+        with transaction.atomic():
+            create(*args)
+    finally:
+        connections.close_all()
+
+
+def _fill_posts(size: int, chunk: int = 20000) -> list[str]:
+    """
+    Inserta `size` posts con SQL directo (los triggers llenan el índice FTS5).
+    Devuelve el primer bloque de textos como muestra del vocabulario.
+    """
+    from datetime import timedelta
+    from core.models import Post
+
+    table = connection.ops.quote_name(Post._meta.db_table)
+    name = MiningEngine.TAXONOMY[0]
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    sql = (
+        f"INSERT INTO {table} (content, primary_category, primary_confidence, classification_status, "
+        f"classification_method, category_mask, created_at) VALUES (%s, %s, %s, %s, %s, %s, %s)"
+    )
+    sample = None
+    for offset in range(0, size, chunk):
+        texts = corpus(min(chunk, size - offset), seed=3 + offset, start=offset)
+        sample = sample or texts
+        rows = [
+            (text, name, 0.9, Post.STATUS_DONE, "benchmark", 1,
+             (base + timedelta(seconds=offset + i)).strftime('%Y-%m-%d %H:%M:%S.%f'))
+            for i, text in enumerate(texts)
+        ]
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.executemany(sql, rows)
+    return sample
+
+
+def _timed_queries(run, repeats: int) -> float:
+    """p50 en ms de `repeats` ejecuciones (la primera calienta la caché de páginas y no cuenta)."""
+    run()
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        run()
+        samples.append((time.perf_counter() - start) * 1000)
+    return percentiles(samples)["p50"]
+
+
+def _threaded_writes(texts: list[str], analysis: dict, workers: int, write) -> float:
+    """Reparte `texts` entre `workers` hilos que llaman a write(texto, analysis); devuelve posts/s."""
+    from django.db import connections
+
+    errors = []
+
+    def run(chunk):
+        try:
+            for text in chunk:
+                write(text, analysis)
+        except Exception as e:
+            errors.append(e)
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=run, args=(texts[i::workers],)) for i in range(workers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    if errors:
+        raise RuntimeError(f"{len(errors)} hilos fallaron: {errors[0]}")
+    return len(texts) / elapsed
+
+
+def _timed_requests(send, count: int, expected: tuple) -> dict:
+    samples = []
+    for i in range(count):
+        start = time.perf_counter()
+        response = send(i)
+        samples.append((time.perf_counter() - start) * 1000)
+        if response.status_code not in expected:
+            raise RuntimeError(f"{response.status_code}: {response.content[:300]!r}")
+    result = percentiles(samples)
+    return {"p50": result["p50"], "p95": result["p95"]}
+
+
+def compare(baseline: dict, current: dict, tolerance: float) -> list[dict]:
+    """
+    Compara las métricas presentes en ambos resultados.
+
+    Returns:
+        list[dict]: Una fila por métrica con baseline, actual, cambio relativo
+        y "regression" si empeoró más que `tolerance`.
+    """
+    rows = []
+    for name, value in sorted(current["metrics"].items()):
+        base = baseline["metrics"].get(name)
+        if base is None:
+            continue
+        change = (value - base) / base if base else 0.0
+        higher_is_better = name.endswith(HIGHER_IS_BETTER)
+        regression = abs(value - base) > NOISE_FLOOR and (
+            change < -tolerance if higher_is_better else change > tolerance
+        )
+        rows.append({"metric": name, "baseline": base, "current": value, "change": change, "regression": regression})
+    return rows
+
+
+class Command(BaseCommand):
+    help = "Mide latencia, throughput, memoria, arranque del modelo y la API; guarda JSON y compara con un baseline."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--backend', default='stub', help="Backend de inferencia (default: stub, sin red)")
+        parser.add_argument('--only', default=','.join(DEFAULT_SECTIONS),
+                            help=f"Secciones: {', '.join(SECTIONS)} (default: {', '.join(DEFAULT_SECTIONS)})")
+        parser.add_argument('--requests', type=int, default=50, help="Textos / requests por medición")
+        parser.add_argument('--batch-sizes', default='1,4,8,16')
+        parser.add_argument('--concurrency', default='1,4,8', help="Hilos llamando a analyze() a la vez")
+        parser.add_argument('--table-sizes', default='100,1000', help="Posts en la tabla para la sección api")
+        parser.add_argument('--search-size', type=int, default=1000000, help="Posts en la tabla para la sección search")
+        parser.add_argument('--feed-clients', type=int, default=2000, help="Conexiones SSE para la sección feed")
+        parser.add_argument('--output', help="Archivo JSON (default: data/benchmarks/benchmark-<fecha>.json)")
+        parser.add_argument('--json', action='store_true', help="Imprimir el JSON en lugar de la tabla")
+        parser.add_argument('--compare', help="JSON de baseline contra el que comparar")
+        parser.add_argument('--results', help="Comparar este JSON ya guardado en lugar de correr")
+        parser.add_argument('--tolerance', type=float, default=0.25,
+                            help="Empeoramiento relativo tolerado antes de marcar regresión")
+
+    def handle(self, *args, **options):
+        if options['results']:
+            if not options['compare']:
+                raise CommandError("--results requiere --compare")
+            report = self._load(options['results'])
+        else:
+            report = self._run(options)
+            path = self._save(report, options['output'])
+            if options['json']:
+                self.stdout.write(json.dumps(report, indent=2))
+            else:
+                for name, value in report['metrics'].items():
+                    self.stdout.write(f"   {name:<48} {value:>10.2f}")
+            self.stdout.write(f"💾 Resultados en {path}")
+
+        if options['compare']:
+            self._compare(self._load(options['compare']), report, options['tolerance'])
+
+    def _run(self, options) -> dict:
+        sections = [s.strip() for s in options['only'].split(',') if s.strip()]
+        unknown = set(sections) - set(SECTIONS)
+        if unknown:
+            raise CommandError(f"Secciones desconocidas: {', '.join(sorted(unknown))}")
+        batch_sizes = _ints(options['batch_sizes'])
+        concurrency = _ints(options['concurrency'])
+        table_sizes = _ints(options['table_sizes'])
+        texts = corpus(options['requests'])
+
+        metrics = {}
+        # Los print() de MiningEngine por cada texto ensucian la salida (y el tiempo de terminal)
+        with inference_backend(options['backend']), open(os.devnull, 'w') as devnull, redirect_stdout(devnull):
+            if 'latency' in sections:
+                self.stdout.write("⏱️ Latencia de analyze()...")
+                metrics.update(bench_latency(texts))
+            if 'throughput' in sections:
+                self.stdout.write("🚀 Throughput por batch y concurrencia...")
+                metrics.update(bench_throughput(texts, batch_sizes, concurrency))
+            if 'api' in sections:
+                self.stdout.write(f"🌐 API con {', '.join(map(str, table_sizes))} posts...")
+                metrics.update(bench_api(table_sizes, options['requests']))
+            if 'search' in sections:
+                self.stdout.write(f"🔎 Búsqueda FTS5 vs LIKE con {options['search_size']} posts...")
+                metrics.update(bench_search(options['search_size'], repeats=5))
+            if 'writes' in sections:
+                self.stdout.write("💾 Escrituras concurrentes (una transacción por post vs group commit)...")
+                metrics.update(bench_writes(options['requests'] * 4, concurrency))
+            if 'feed' in sections:
+                self.stdout.write(f"📡 Feed SSE con {options['feed_clients']} clientes...")
+                metrics.update(bench_feed(options['feed_clients']))
+            if 'memory' in sections:
+                metrics.update(bench_memory())
+        if 'cold-start' in sections:
+            self.stdout.write("🧊 Arranque en frío del modelo...")
+            metrics.update(bench_cold_start(options['backend']))
+
+        return {
+            "meta": {
+                "created_at": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                "backend": options['backend'],
+                "model": MiningEngine.MODEL_NAME,
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpus": os.cpu_count(),
+                "requests": options['requests'],
+                "sections": sections,
+            },
+            "metrics": {name: round(value, 3) for name, value in metrics.items()},
+        }
+
+    def _save(self, report: dict, output: str | None) -> Path:
+        if output:
+            path = Path(output)
+        else:
+            stamp = datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+            path = settings.DATA_DIR / 'benchmarks' / f"benchmark-{stamp}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2), encoding='utf-8')
+        return path
+
+    def _load(self, path: str) -> dict:
+        try:
+            return json.loads(Path(path).read_text(encoding='utf-8'))
+        except (OSError, ValueError) as e:
+            raise CommandError(f"No se pudo leer {path}: {e}")
+
+    def _compare(self, baseline: dict, report: dict, tolerance: float):
+        rows = compare(baseline, report, tolerance)
+        self.stdout.write(f"📊 Contra baseline del {baseline['meta'].get('created_at', '?')} (tolerancia {tolerance:.0%})")
+        for row in rows:
+            mark = "❌" if row['regression'] else "  "
+            self.stdout.write(
+                f"{mark} {row['metric']:<48} {row['baseline']:>10.2f} → {row['current']:>10.2f} ({row['change']:+.0%})"
+            )
+        regressions = [row['metric'] for row in rows if row['regression']]
+        if regressions:
+            raise CommandError(f"{len(regressions)} métricas empeoraron: {', '.join(regressions)}")
+        self.stdout.write(self.style.SUCCESS(f"✅ Sin regresiones en {len(rows)} métricas"))
+
+
+def _ints(value: str) -> list[int]:
+    return [int(part) for part in value.split(',') if part.strip()]
@@ -0,0 +1,41 @@
+"""
+Administración de la caché de clasificación.
+Uso: python manage.py classification_cache [--purge-stale] [--clear]
+
+La purga es manual (tras cambiar de modelo, TAXONOMY o umbrales): no corre
+en cada arranque.
+"""
+from django.core.management.base import BaseCommand
+
+from core.application.ai_service import MiningEngine
+from core.application.classification_cache import ClassificationCache
+from core.models import CachedClassification
+
+
+class Command(BaseCommand):
+    help = "Muestra estadísticas, purga entradas obsoletas o vacía la caché de clasificación."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--purge-stale', action='store_true',
+            help="Borrar entradas de otro modelo/taxonomía/umbrales (conserva las del modelo fallback)"
+        )
+        parser.add_argument(
+            '--clear', action='store_true',
+            help="Vaciar toda la caché persistente"
+        )
+
+    def handle(self, *args, **options):
+        if options['clear']:
+            ClassificationCache.clear()
+            self.stdout.write(self.style.WARNING("🗑️ Caché de clasificación vaciada"))
+        elif options['purge_stale']:
+            deleted = ClassificationCache.purge_stale(MiningEngine)
+            self.stdout.write(f"🧹 {deleted} entradas obsoletas eliminadas")
+
+        fingerprint = ClassificationCache.fingerprint(MiningEngine)
+        total = CachedClassification.objects.count()
+        current = CachedClassification.objects.filter(fingerprint=fingerprint).count()
+
+        self.stdout.write(f"🔑 Huella actual: {fingerprint[:16]}... ({MiningEngine.active_model_name()})")
+        self.stdout.write(f"💾 Entradas persistentes: {current} vigentes / {total} totales")
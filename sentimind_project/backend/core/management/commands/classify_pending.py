@@ -0,0 +1,55 @@
+"""
+Worker de clasificación asíncrona como proceso aparte.
+Uso: python manage.py classify_pending [--once] [--batch-size 16]
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.application.classification_worker import classify_pending, requeue_processing
+from core.application.config import get_setting
+
+
+class Command(BaseCommand):
+    help = "Clasifica en lotes los posts creados en modo asíncrono (estado pending)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=None,
+            help="Posts por pasada del modelo (default: SENTIMIND_ASYNC_BATCH_SIZE)"
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help="Vaciar la cola una vez y salir en lugar de quedarse escuchando"
+        )
+        parser.add_argument(
+            '--interval', type=float, default=None,
+            help="Segundos de espera cuando no hay pendientes (default: SENTIMIND_ASYNC_POLL_SECONDS)"
+        )
+        parser.add_argument(
+            '--requeue-processing', action='store_true',
+            help="Devolver a pending los posts que quedaron en processing (usar con un solo worker)"
+        )
+
+    def handle(self, *args, **options):
+        interval = options['interval'] or get_setting('SENTIMIND_ASYNC_POLL_SECONDS', 5.0, float)
+
+        if options['requeue_processing']:
+            count = requeue_processing()
+            self.stdout.write(f"🔄 {count} posts devueltos a pending")
+
+        total = 0
+        self.stdout.write("🧵 Esperando posts pendientes..." if not options['once'] else "🧵 Procesando pendientes...")
+        try:
+            while True:
+                processed = classify_pending(options['batch_size'])
+                total += processed
+                if processed:
+                    continue
+                if options['once']:
+                    break
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(f"✅ {total} posts clasificados"))
@@ -0,0 +1,48 @@
+"""
+Exporta el modelo de MiningEngine a ONNX para el backend "onnx".
+Uso: python manage.py export_model [--model joeddav/xlm-roberta-large-xnli] [--quantize]
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from core.application.ai_service import MiningEngine
+from core.application.inference_backends import load_tokenizer, onnx_model_dir
+
+
+class Command(BaseCommand):
+    help = "Exporta el modelo zero-shot a ONNX (y opcionalmente a ONNX int8) para ONNX Runtime."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--model', default=MiningEngine.MODEL_NAME,
+            help=f"Modelo de Hugging Face a exportar (default: {MiningEngine.MODEL_NAME})"
+        )
+        parser.add_argument(
+            '--quantize', action='store_true',
+            help="Generar además model_quantized.onnx con cuantización dinámica int8"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+            from optimum.onnxruntime.configuration import AutoQuantizationConfig
+        except ImportError:
+            raise CommandError("Se requiere optimum[onnxruntime]: uv pip install 'optimum[onnxruntime]'")
+
+        model_name = options['model']
+        output_dir = onnx_model_dir(model_name)
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        self.stdout.write(f"📦 Exportando {model_name} a ONNX en {output_dir}...")
+        model = ORTModelForSequenceClassification.from_pretrained(model_name, export=True)
+        model.save_pretrained(output_dir)
+        load_tokenizer(model_name).save_pretrained(output_dir)
+        self.stdout.write(self.style.SUCCESS(f"✅ {output_dir / 'model.onnx'}"))
+
+        if options['quantize']:
+            self.stdout.write("⚙️ Cuantizando a int8 (dinámico)...")
+            quantizer = ORTQuantizer.from_pretrained(output_dir, file_name="model.onnx")
+            qconfig = AutoQuantizationConfig.avx2(is_static=False, per_channel=False)
+            quantizer.quantize(save_dir=output_dir, quantization_config=qconfig)
+            self.stdout.write(self.style.SUCCESS(
+                f"✅ {output_dir / 'model_quantized.onnx'} (usar con SENTIMIND_ONNX_QUANTIZED=True)"
+            ))
@@ -0,0 +1,59 @@
+"""
+Servidor de inferencia compartido por todos los workers web.
+Uso: python manage.py inference_server [--address unix:/app/data/inference.sock]
+
+Carga el modelo una vez, hace el warm-up y atiende los pedidos de los
+workers configurados con el mismo SENTIMIND_INFERENCE_SERVER (ver
+core/application/remote_inference.py).
+"""
+import signal
+import threading
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.application.remote_inference import InferenceClient, InferenceServer
+
+
+class Command(BaseCommand):
+    help = "Proceso dueño del modelo que clasifica para todos los workers (socket Unix o puerto local)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--address', default=None,
+            help="unix:/ruta o host:puerto (default: SENTIMIND_INFERENCE_SERVER)"
+        )
+        parser.add_argument(
+            '--batch-window-ms', type=float, default=None,
+            help="Ventana para juntar pedidos de distintos workers (default: SENTIMIND_BATCH_WINDOW_MS)"
+        )
+        parser.add_argument(
+            '--batch-max-size', type=int, default=None,
+            help="Máximo de textos por pasada (default: SENTIMIND_BATCH_MAX_SIZE)"
+        )
+
+    def handle(self, *args, **options):
+        address = options['address'] or InferenceClient.address()
+        if not address:
+            raise CommandError("Definir SENTIMIND_INFERENCE_SERVER o pasar --address")
+
+        # Este proceso comparte el .env de la web pero la inferencia es local
+        InferenceClient.disable()
+
+        try:
+            server = InferenceServer(address, options['batch_window_ms'], options['batch_max_size'])
+        except (OSError, ValueError) as e:
+            raise CommandError(f"No se pudo escuchar en {address}: {e}")
+
+        # Se escucha antes de cargar: los workers reciben "loading" en vez de caer al fallback
+        server.load_model()
+        signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown).start())
+
+        self.stdout.write(f"🧠 Servidor de inferencia escuchando en {address}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            server.shutdown()
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Servidor detenido ({server.requests} pedidos en {server.batches} pasadas)"
+        ))
@@ -0,0 +1,20 @@
+"""
+Recalcula Post.category_mask desde PostCategory.
+Uso: python manage.py rebuild_category_masks
+
+Necesario si cambia el orden o el contenido de MiningEngine.TAXONOMY sin
+reclasificar (reclassify ya reescribe las máscaras).
+"""
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.application.post_service import rebuild_category_masks
+
+
+class Command(BaseCommand):
+    help = "Recalcula la máscara de categorías de todos los posts."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            updated = rebuild_category_masks()
+        self.stdout.write(self.style.SUCCESS(f"✅ {updated} máscaras recalculadas"))
@@ -0,0 +1,22 @@
+"""
+Regenera el índice de búsqueda (FTS5) de Post.content.
+Uso: python manage.py rebuild_search_index
+
+Los triggers lo mantienen solo; este comando corrige desvíos (cargas con
+triggers desactivados, restauraciones parciales) y compacta el índice.
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.application import search
+
+
+class Command(BaseCommand):
+    help = "Regenera y compacta el índice de texto completo de los posts."
+
+    def handle(self, *args, **options):
+        if not search.available():
+            raise CommandError("No hay índice FTS5 en esta base de datos (¿falta `migrate`?): ?q= usa LIKE")
+        with transaction.atomic():
+            indexed = search.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"✅ {indexed} posts indexados"))
@@ -0,0 +1,18 @@
+"""
+Recalcula desde cero los contadores de /api/stats/.
+Uso: python manage.py rebuild_stats
+
+Los contadores se mantienen solos al crear y reclasificar posts; este comando
+corrige desvíos (borrados manuales, cargas directas a la base de datos, etc.).
+"""
+from django.core.management.base import BaseCommand
+
+from core.application.stats_service import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recalcula los contadores de estadísticas por categoría desde Post y PostCategory."
+
+    def handle(self, *args, **options):
+        rows = rebuild()
+        self.stdout.write(self.style.SUCCESS(f"✅ {rows} contadores recalculados"))
@@ -0,0 +1,29 @@
+"""
+Regenera el índice de "posts parecidos" desde la base de datos.
+Uso: python manage.py rebuild_vector_index [--batch-size 64]
+
+Necesario la primera vez, al cambiar SENTIMIND_EMBEDDING_MODEL o si se
+cargaron posts sin SENTIMIND_VECTOR_INDEX activo. Los workers siguen
+respondiendo con el índice anterior hasta que el nuevo lo reemplaza.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.application.vector_index import VectorIndex
+
+
+class Command(BaseCommand):
+    help = "Codifica todos los posts y regenera el índice de embeddings para /api/posts/<id>/similar/."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=64, help="Posts por pasada del modelo de embeddings")
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        indexed = VectorIndex.rebuild(batch_size=options['batch_size'])
+        path = VectorIndex.directory() / VectorIndex.DATA_FILE
+        size_mb = path.stat().st_size / (1024 * 1024)
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {indexed} posts indexados en {time.perf_counter() - start:.1f}s ({path}, {size_mb:.1f} MB)"
+        ))
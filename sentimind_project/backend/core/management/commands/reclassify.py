@@ -0,0 +1,209 @@
+"""
+Reclasificación masiva y reanudable de posts existentes.
+Uso: python manage.py reclassify [--workers 4] [--since 2026-01-01] [--category Humor] [--dry-run]
+
+Pensado para cuando cambian el modelo, TAXONOMY o RELATIVE_THRESHOLD:
+recorre Post por páginas de pk (pk > último, LIMIT), clasifica en lotes con un
+pool de procesos y escribe con bulk_update/bulk_create. Tras cada página
+guarda un checkpoint; si se interrumpe, la siguiente ejecución sigue desde ahí.
+"""
+from datetime import datetime
+import json
+import multiprocessing
+import os
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.utils.dateparse import parse_datetime, parse_date
+from django.utils import timezone
+
+from core.application.ai_service import MiningEngine
+from core.application.classification_cache import ClassificationCache
+from core.application.post_service import bulk_apply_analyses
+from core.application.remote_inference import InferenceClient
+from core.models import Post, PostCategory
+
+
+def _init_worker(threads: int):
+    """Inicializa cada proceso del pool: reparte los hilos (el modelo ya viene del padre)."""
+    try:
+        import torch
+        torch.set_num_threads(threads)
+    except ImportError:
+        pass
+
+
+def _classify_texts(texts: list[str]) -> list[dict]:
+    # Sin caché: se reclasifica justamente porque cambió el modelo o la taxonomía
+    return MiningEngine._infer_batch(texts)
+
+
+class Command(BaseCommand):
+    help = "Reclasifica posts existentes en lotes, con pool de procesos y checkpoint reanudable."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=1,
+                            help="Procesos de inferencia (1 = en este proceso)")
+        parser.add_argument('--chunk-size', type=int, default=1000,
+                            help="Posts leídos y escritos por rango de pk")
+        parser.add_argument('--batch-size', type=int, default=16,
+                            help="Posts por pasada del modelo")
+        parser.add_argument('--since', help="Solo posts creados desde esta fecha (ISO)")
+        parser.add_argument('--until', help="Solo posts creados antes de esta fecha (ISO)")
+        parser.add_argument('--category', help="Solo posts que tengan esta categoría")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Clasificar y reportar cambios sin escribir")
+        parser.add_argument('--restart', action='store_true',
+                            help="Ignorar el checkpoint y empezar desde el principio")
+        parser.add_argument('--checkpoint', default=str(settings.DATA_DIR / 'reclassify.checkpoint.json'),
+                            help="Archivo de checkpoint")
+
+    def handle(self, *args, **options):
+        filters = {key: options[key] for key in ('since', 'until', 'category')}
+        queryset = self._queryset(filters)
+        fingerprint = ClassificationCache.fingerprint(MiningEngine)
+
+        checkpoint = self._load_checkpoint(options, filters, fingerprint)
+        last_id = checkpoint.get('last_id', 0)
+        processed = checkpoint.get('processed', 0)
+
+        remaining = queryset.filter(pk__gt=last_id).count()
+        if last_id:
+            self.stdout.write(f"⏩ Reanudando desde pk>{last_id} ({processed} ya procesados)")
+        self.stdout.write(f"🔁 {remaining} posts por reclasificar (workers={options['workers']})")
+        if not remaining:
+            return
+
+        pool = self._make_pool(options['workers'])
+        changed = 0
+        done = 0
+        start = time.perf_counter()
+
+        try:
+            for chunk in self._chunks(queryset.filter(pk__gt=last_id), options['chunk_size']):
+                analyses = self._classify(pool, [content for _, content, _ in chunk], options['batch_size'])
+                changed += sum(
+                    1 for (_, _, old), new in zip(chunk, analyses) if old != new['primary_category']
+                )
+
+                if not options['dry_run']:
+                    posts = [Post(id=post_id) for post_id, _, _ in chunk]
+                    with transaction.atomic():
+                        bulk_apply_analyses(posts, analyses)
+                    processed += len(chunk)
+                    self._save_checkpoint(options['checkpoint'], {
+                        "last_id": chunk[-1][0],
+                        "processed": processed,
+                        "filters": filters,
+                        "fingerprint": fingerprint,
+                        "updated_at": datetime.now().isoformat(),
+                    })
+
+                done += len(chunk)
+                elapsed = time.perf_counter() - start
+                self.stdout.write(
+                    f"   {done}/{remaining} posts | {done / elapsed:.1f} posts/s | "
+                    f"{changed} con nueva categoría principal"
+                )
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {done} posts en {elapsed:.1f}s ({done / elapsed:.1f} posts/s), "
+            f"{changed} cambiaron de categoría principal"
+            + (" [dry run, sin escribir]" if options['dry_run'] else "")
+        ))
+        if not options['dry_run'] and os.path.exists(options['checkpoint']):
+            os.remove(options['checkpoint'])
+
+    def _queryset(self, filters):
+        queryset = Post.objects.filter(classification_status__in=[Post.STATUS_DONE, Post.STATUS_FAILED])
+        if filters['since']:
+            queryset = queryset.filter(created_at__gte=self._parse_date(filters['since']))
+        if filters['until']:
+            queryset = queryset.filter(created_at__lt=self._parse_date(filters['until']))
+        if filters['category']:
+            queryset = queryset.filter(
+                pk__in=PostCategory.objects.filter(category__name=filters['category']).values('post_id')
+            )
+        return queryset.order_by('pk')
+
+    @staticmethod
+    def _parse_date(value):
+        parsed = parse_datetime(value)
+        if parsed is None:
+            day = parse_date(value)
+            if day is None:
+                raise CommandError(f"Fecha inválida: {value}")
+            parsed = datetime(day.year, day.month, day.day)
+        if timezone.is_naive(parsed):
+            parsed = timezone.make_aware(parsed)
+        return parsed
+
+    @staticmethod
+    def _chunks(queryset, size):
+        """
+        Páginas consecutivas de pk, cada una con su propia consulta: un cursor
+        abierto (.iterator()) sobre core_post mientras se escribe en la misma
+        conexión no tiene aislamiento en SQLite.
+        """
+        last_id = 0
+        while True:
+            chunk = list(queryset.filter(pk__gt=last_id).values_list('id', 'content', 'primary_category')[:size])
+            if not chunk:
+                return
+            yield chunk
+            if len(chunk) < size:
+                return
+            last_id = chunk[-1][0]
+
+    @staticmethod
+    def _make_pool(workers):
+        if workers <= 1:
+            return None
+        # El modelo se carga antes del fork: los hijos comparten los pesos por
+        # copy-on-write (como gunicorn --preload). Con servidor de inferencia
+        # los lotes van allá (ver _classify_texts).
+        if not InferenceClient.enabled():
+            MiningEngine.preload()
+        # Las conexiones SQLite no deben heredarse a los procesos hijos
+        connections.close_all()
+        threads = max(1, (os.cpu_count() or workers) // workers)
+        return multiprocessing.get_context('fork').Pool(
+            workers, initializer=_init_worker, initargs=(threads,)
+        )
+
+    @staticmethod
+    def _classify(pool, texts, batch_size):
+        batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+        if pool is None:
+            results = map(_classify_texts, batches)
+        else:
+            results = pool.imap(_classify_texts, batches)
+        return [analysis for batch in results for analysis in batch]
+
+    def _load_checkpoint(self, options, filters, fingerprint) -> dict:
+        path = options['checkpoint']
+        if options['restart'] or options['dry_run'] or not os.path.exists(path):
+            return {}
+        with open(path, encoding='utf-8') as f:
+            checkpoint = json.load(f)
+        if checkpoint.get('filters') != filters or checkpoint.get('fingerprint') != fingerprint:
+            raise CommandError(
+                "El checkpoint es de otra ejecución (filtros o modelo/taxonomía distintos). "
+                "Usa --restart para empezar de nuevo."
+            )
+        return checkpoint
+
+    @staticmethod
+    def _save_checkpoint(path, data):
+        # Escritura atómica: un corte a mitad no deja un checkpoint corrupto
+        tmp = f"{path}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
@@ -0,0 +1,137 @@
+"""
+Mide el costo de arranque: tiempo de import y memoria de `manage.py check`
+y de la app WSGI (settings + URLconf, sin precargar el modelo).
+Uso: python manage.py startup_benchmark [--repeat 3] [--json] [--enforce]
+
+Cada medición corre en un proceso nuevo con un SENTIMIND_DATA_DIR temporal
+(no abre ni modifica data/db.sqlite3). Con --enforce falla si se supera
+BUDGETS o si se importó el stack de ML (transformers/torch, numpy), que solo
+debe cargarse al clasificar. core/tests.py verifica siempre lo segundo; los
+tiempos solo con SENTIMIND_STARTUP_BUDGET_TESTS=1 (dependen de la máquina).
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+# Presupuesto por objetivo: segundos de import + trabajo y MB de RSS pico
+BUDGETS = {
+    "check": {"seconds": 2.0, "rss_mb": 120},
+    "wsgi": {"seconds": 2.0, "rss_mb": 120},
+}
+
+# Módulos que no deben aparecer al arrancar
+HEAVY_MODULES = ("transformers", "torch", "optimum", "onnxruntime", "sklearn", "numpy")
+
+_TARGETS = {
+    "check": (
+        "import io, django\n"
+        "django.setup()\n"
+        "from django.core.management import call_command\n"
+        "call_command('check', stdout=io.StringIO())\n"
+    ),
+    "wsgi": (
+        "import sentimind.wsgi\n"
+        "from django.urls import get_resolver\n"
+        "get_resolver().url_patterns\n"
+    ),
+}
+
+_PROBE = """
+import json, os, resource, sys, time
+start = time.perf_counter()
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sentimind.settings')
+{code}
+seconds = time.perf_counter() - start
+try:
+    # VmHWM: pico de este exec (ru_maxrss puede heredar el del proceso padre)
+    with open('/proc/self/status') as f:
+        peak_kb = next(int(line.split()[1]) for line in f if line.startswith('VmHWM:'))
+except OSError:
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 if sys.platform == 'darwin' else 1)
+print(json.dumps({{
+    "seconds": seconds,
+    "rss_mb": peak_kb / 1024,
+    "heavy_modules": [name for name in {heavy!r} if name in sys.modules],
+}}))
+"""
+
+
+def measure(target: str) -> dict:
+    """Mide `target` ("check" o "wsgi") en un proceso Python nuevo."""
+    env = {**os.environ, "SENTIMIND_PRELOAD_MODEL": "False"}
+    env.pop("SENTIMIND_WARMUP_AFTER_FORK", None)
+    code = _PROBE.format(code=_TARGETS[target], heavy=HEAVY_MODULES)
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        env["SENTIMIND_DATA_DIR"] = data_dir
+        start = time.perf_counter()
+        completed = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=False
+        )
+        wall = time.perf_counter() - start
+    if completed.returncode != 0:
+        raise RuntimeError(f"{target} falló:\n{completed.stderr[-2000:]}")
+
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    result["wall_seconds"] = wall
+    return result
+
+
+def over_budget(target: str, result: dict) -> list[str]:
+    """Lista de incumplimientos de BUDGETS para un resultado de measure()."""
+    budget = BUDGETS[target]
+    problems = []
+    if result["seconds"] > budget["seconds"]:
+        problems.append(f"{target}: {result['seconds']:.2f}s > {budget['seconds']}s")
+    if result["rss_mb"] > budget["rss_mb"]:
+        problems.append(f"{target}: {result['rss_mb']:.0f}MB > {budget['rss_mb']}MB")
+    if result["heavy_modules"]:
+        problems.append(f"{target}: importó {', '.join(result['heavy_modules'])} al arrancar")
+    return problems
+
+
+class Command(BaseCommand):
+    help = "Mide tiempo de import y memoria de manage.py check y de la app WSGI."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=3, help="Corridas por objetivo (se reporta la mediana)")
+        parser.add_argument('--json', action='store_true', help="Salida en JSON")
+        parser.add_argument('--enforce', action='store_true', help="Fallar si se supera el presupuesto")
+
+    def handle(self, *args, **options):
+        report = {}
+        for target in _TARGETS:
+            runs = [measure(target) for _ in range(max(1, options['repeat']))]
+            report[target] = {
+                "seconds": round(statistics.median(r["seconds"] for r in runs), 3),
+                "wall_seconds": round(statistics.median(r["wall_seconds"] for r in runs), 3),
+                "rss_mb": round(statistics.median(r["rss_mb"] for r in runs), 1),
+                "heavy_modules": sorted({name for r in runs for name in r["heavy_modules"]}),
+                "budget": BUDGETS[target],
+            }
+
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            for target, result in report.items():
+                heavy = ', '.join(result['heavy_modules']) or '-'
+                self.stdout.write(
+                    f"⏱️ {target:<6} {result['seconds']:.2f}s import "
+                    f"({result['wall_seconds']:.2f}s con el intérprete) | "
+                    f"{result['rss_mb']:.0f}MB RSS | ML cargado: {heavy}"
+                )
+
+        problems = [p for target, result in report.items() for p in over_budget(target, result)]
+        if problems and options['enforce']:
+            raise CommandError("Presupuesto de arranque superado:\n" + "\n".join(problems))
+        if not problems:
+            self.stdout.write(self.style.SUCCESS("✅ Dentro del presupuesto de arranque"))
@@ -0,0 +1,51 @@
+"""
+Compara el tokenizer rápido con el de sentencepiece y guarda el veredicto
+que usa SENTIMIND_FAST_TOKENIZER=auto.
+Uso: python manage.py tokenizer_parity [--source posts] [--limit 500] [--dry-run]
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.application import tokenization
+from core.application.ai_service import MiningEngine
+from core.models import Post
+
+
+class Command(BaseCommand):
+    help = "Verifica que el tokenizer rápido produzca los mismos token IDs que sentencepiece."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--source', choices=['posts', 'test-cases', 'samples'], default='posts',
+            help="Textos además de PARITY_SAMPLES: posts guardados o TEST_CASES de test_classification.py"
+        )
+        parser.add_argument('--limit', type=int, default=500, help="Máximo de textos de la fuente")
+        parser.add_argument('--model', default=MiningEngine.MODEL_NAME)
+        parser.add_argument('--dry-run', action='store_true', help="Reportar sin guardar el veredicto")
+
+    def handle(self, *args, **options):
+        texts = tokenization.PARITY_SAMPLES + self._load_texts(options['source'], options['limit'])
+        self.stdout.write(f"🧪 {len(texts)} textos x {len(MiningEngine.TAXONOMY)} hipótesis, modelo {options['model']}")
+
+        start = time.perf_counter()
+        verdict = tokenization.check_parity(options['model'], texts)
+        self.stdout.write(f"⏱️ Verificación en {time.perf_counter() - start:.1f}s")
+
+        for mismatch in verdict['mismatches']:
+            self.stdout.write(f"   ≠ {mismatch[:120]}")
+
+        if not options['dry_run']:
+            tokenization.save_verdict(verdict)
+        if verdict['parity']:
+            self.stdout.write(self.style.SUCCESS("✅ Mismos token IDs: se usará el tokenizer rápido"))
+        else:
+            self.stdout.write(self.style.WARNING("⚠️ Hay diferencias: se mantiene sentencepiece"))
+
+    def _load_texts(self, source, limit):
+        if source == 'samples':
+            return []
+        if source == 'test-cases':
+            from test_classification import TEST_CASES
+            return [text for text, _ in TEST_CASES][:limit]
+        return list(Post.objects.order_by('-created_at').values_list('content', flat=True)[:limit])
@@ -0,0 +1,50 @@
+"""
+Entrena el clasificador destilado (primera etapa del modo "cascade").
+Uso: python manage.py train_distilled [--limit 50000] [--test-size 0.2] [--dry-run]
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from core.application.ai_service import MiningEngine
+from core.application.distilled import DistilledClassifier
+
+
+class Command(BaseCommand):
+    help = "Entrena TF-IDF + modelo lineal multi-label con los PostCategory guardados y lo versiona."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=None, help="Máximo de posts (los más recientes)")
+        parser.add_argument('--test-size', type=float, default=0.2, help="Fracción reservada para evaluar")
+        parser.add_argument('--min-posts', type=int, default=200, help="Mínimo de posts para entrenar")
+        parser.add_argument('--dry-run', action='store_true', help="Entrenar y evaluar sin guardar el artefacto")
+
+    def handle(self, *args, **options):
+        try:
+            import sklearn  # noqa: F401
+        except ImportError:
+            raise CommandError("Se requiere scikit-learn: uv sync --extra cascade")
+
+        texts, targets, primaries = DistilledClassifier.build_dataset(MiningEngine, options['limit'])
+        if len(texts) < options['min_posts']:
+            raise CommandError(f"Solo hay {len(texts)} posts etiquetados (mínimo {options['min_posts']})")
+
+        self.stdout.write(f"🧪 Entrenando con {len(texts)} posts etiquetados por el transformer...")
+        artifact = DistilledClassifier.train(
+            MiningEngine, texts, targets, primaries, test_size=options['test_size']
+        )
+
+        metrics = artifact['metrics']
+        self.stdout.write(f"📊 Held-out: {metrics['test_size']} posts")
+        self.stdout.write(f"   Coincidencia con el transformer (primary_category): {metrics['agreement']:.1%}")
+        self.stdout.write(
+            f"   Tráfico que respondería el destilado: {metrics['coverage']:.1%} "
+            f"(confianza ≥ {metrics['min_confidence']}, margen ≥ {metrics['min_margin']})"
+        )
+        if metrics['confident_agreement'] is not None:
+            self.stdout.write(f"   Coincidencia en ese tráfico: {metrics['confident_agreement']:.1%}")
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING("🔎 Dry run: artefacto no guardado"))
+            return
+
+        path = DistilledClassifier.save(artifact)
+        self.stdout.write(self.style.SUCCESS(f"✅ Versión {artifact['version']} guardada en {path}"))
@@ -0,0 +1,28 @@
+# Generated by Django 6.1.2 on 2026-10-18 10:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_category_rename_category_post_primary_category_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='classification_status',
+            field=models.CharField(choices=[('pending', 'Pendiente'), ('processing', 'Procesando'), ('done', 'Clasificado'), ('failed', 'Error')], db_index=True, default='done', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='primary_category',
+            field=models.CharField(blank=True, db_index=True, default='', max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='post',
+            name='primary_confidence',
+            field=models.FloatField(default=0.0),
+        ),
+    ]
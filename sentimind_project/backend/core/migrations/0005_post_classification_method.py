@@ -0,0 +1,18 @@
+# Generated by Django 6.1.2 on 2026-10-18 10:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_cachedclassification'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='classification_method',
+            field=models.CharField(blank=True, default='', max_length=50),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 6.1.2 on 2026-10-18 10:39
+
+from django.db import migrations, models
+
+
+# TAXONOMY de MiningEngine al crear la migración: el bit de cada categoría es
+# su posición. Copia fija para que la migración no dependa del código actual;
+# si TAXONOMY cambia, `manage.py rebuild_category_masks` recalcula las máscaras.
+TAXONOMY = [
+    "Alegría", "Tristeza", "Enojo", "Miedo", "Sorpresa", "Asco",
+    "Amor", "Odio", "Vergüenza", "Orgullo", "Envidia", "Celos",
+    "Humor", "Inspiración", "Confesión", "Queja", "Consejo",
+    "Pregunta", "Reflexión", "Nostalgia", "Ansiedad", "Frustración",
+    "Sarcasmo", "Polémica", "Terror",
+]
+BITS = {name: 1 << index for index, name in enumerate(TAXONOMY)}
+
+
+def backfill_category_masks(apps, schema_editor):
+    Post = apps.get_model('core', 'Post')
+    PostCategory = apps.get_model('core', 'PostCategory')
+    last_id = 0
+    while True:
+        ids = list(Post.objects.filter(id__gt=last_id).order_by('id').values_list('id', flat=True)[:2000])
+        if not ids:
+            return
+        masks = dict.fromkeys(ids, 0)
+        for post_id, name in PostCategory.objects.filter(post_id__in=ids).values_list('post_id', 'category__name'):
+            masks[post_id] |= BITS.get(name, 0)
+        Post.objects.bulk_update(
+            [Post(id=post_id, category_mask=mask) for post_id, mask in masks.items()], ['category_mask']
+        )
+        last_id = ids[-1]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_post_cursor_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='category_mask',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_category_masks, migrations.RunPython.noop),
+    ]
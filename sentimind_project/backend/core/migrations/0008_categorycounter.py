@@ -0,0 +1,66 @@
+# Generated by Django 6.1.2 on 2026-10-18 10:43
+
+from datetime import timezone as dt_timezone
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncHour
+
+
+def backfill_counters(apps, schema_editor):
+    """Contadores por hora desde los posts existentes (copia fija de stats_service.rebuild)."""
+    CategoryCounter = apps.get_model('core', 'CategoryCounter')
+    Post = apps.get_model('core', 'Post')
+    PostCategory = apps.get_model('core', 'PostCategory')
+
+    by_category = (
+        PostCategory.objects
+        .annotate(bucket=TruncHour('post__created_at', tzinfo=dt_timezone.utc))
+        .values('bucket', 'category__name')
+        .annotate(posts=Count('id'), confidence_sum=Sum('confidence'))
+        .order_by()
+    )
+    by_primary = (
+        Post.objects.exclude(primary_category='')
+        .annotate(bucket=TruncHour('created_at', tzinfo=dt_timezone.utc))
+        .values('bucket', 'primary_category')
+        .annotate(posts=Count('id'), confidence_sum=Sum('primary_confidence'))
+        .order_by()
+    )
+    counters = [
+        CategoryCounter(dimension='category', name=row['category__name'], bucket=row['bucket'],
+                        posts=row['posts'], confidence_sum=row['confidence_sum'])
+        for row in by_category
+    ] + [
+        CategoryCounter(dimension='primary', name=row['primary_category'], bucket=row['bucket'],
+                        posts=row['posts'], confidence_sum=row['confidence_sum'])
+        for row in by_primary
+    ]
+    CategoryCounter.objects.all().delete()
+    CategoryCounter.objects.bulk_create(counters, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_post_category_mask'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(choices=[('category', 'Categoría'), ('primary', 'Categoría principal')], max_length=10)),
+                ('name', models.CharField(max_length=50)),
+                ('bucket', models.DateTimeField()),
+                ('posts', models.IntegerField(default=0)),
+                ('confidence_sum', models.FloatField(default=0.0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['dimension', 'bucket'], name='category_counter_bucket_idx')],
+                'constraints': [models.UniqueConstraint(fields=('dimension', 'name', 'bucket'), name='category_counter_unique')],
+            },
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
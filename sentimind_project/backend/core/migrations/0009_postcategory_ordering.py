@@ -0,0 +1,17 @@
+# Generated by Django 6.1.2 on 2026-10-18 10:45
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_categorycounter'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='postcategory',
+            options={'ordering': ['-confidence', 'id']},
+        ),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 6.1.2 on 2026-10-18 12:05
+
+import core.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Índice FTS5 con contenido externo (core_post) y triggers que lo mantienen
+CREATE_SEARCH_INDEX = [
+    """
+    CREATE VIRTUAL TABLE core_post_fts USING fts5(
+        content,
+        content='core_post',
+        content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER core_post_fts_insert AFTER INSERT ON core_post BEGIN
+        INSERT INTO core_post_fts(rowid, content) VALUES (new.id, new.content);
+    END
+    """,
+    """
+    CREATE TRIGGER core_post_fts_delete AFTER DELETE ON core_post BEGIN
+        INSERT INTO core_post_fts(core_post_fts, rowid, content) VALUES ('delete', old.id, old.content);
+    END
+    """,
+    """
+    CREATE TRIGGER core_post_fts_update AFTER UPDATE OF content ON core_post BEGIN
+        INSERT INTO core_post_fts(core_post_fts, rowid, content) VALUES ('delete', old.id, old.content);
+        INSERT INTO core_post_fts(rowid, content) VALUES (new.id, new.content);
+    END
+    """,
+    # Indexar los posts existentes
+    "INSERT INTO core_post_fts(core_post_fts) VALUES ('rebuild')",
+]
+
+DROP_SEARCH_INDEX = [
+    "DROP TRIGGER IF EXISTS core_post_fts_insert",
+    "DROP TRIGGER IF EXISTS core_post_fts_delete",
+    "DROP TRIGGER IF EXISTS core_post_fts_update",
+    "DROP TABLE IF EXISTS core_post_fts",
+]
+
+
+def create_search_index(apps, schema_editor):
+    # Solo SQLite; en otras bases la búsqueda usa LIKE (ver core/application/search.py)
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+        if not cursor.fetchone()[0]:
+            print("⚠️ SQLite sin FTS5: ?q= buscará con LIKE")
+            return
+    for statement in CREATE_SEARCH_INDEX:
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in DROP_SEARCH_INDEX:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_postcategory_ordering'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostSearchIndex',
+            fields=[
+                ('post', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_entry', serialize=False, to='core.post')),
+                ('content', core.models.SearchField()),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'core_post_fts',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 6.1.2 on 2026-10-18 13:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Eventos que se conservan para reanudar con Last-Event-ID; se podan cada PRUNE_EVERY
+RETENTION = 10000
+PRUNE_EVERY = 500
+
+# Triggers: todo alta de post y todo paso de pending/processing a done/failed
+# deja un evento (también con bulk_create, el worker y SQL directo).
+# Reclasificar (done -> done) no genera eventos.
+CREATE_EVENT_TRIGGERS = [
+    """
+    CREATE TRIGGER core_post_event_created AFTER INSERT ON core_post BEGIN
+        INSERT INTO core_postevent(post_id, kind) VALUES (new.id, 'created');
+    END
+    """,
+    """
+    CREATE TRIGGER core_post_event_classified AFTER UPDATE OF classification_status ON core_post
+    WHEN old.classification_status IN ('pending', 'processing')
+        AND new.classification_status IN ('done', 'failed')
+    BEGIN
+        INSERT INTO core_postevent(post_id, kind) VALUES (new.id, 'classified');
+    END
+    """,
+    f"""
+    CREATE TRIGGER core_postevent_prune AFTER INSERT ON core_postevent
+    WHEN new.id % {PRUNE_EVERY} = 0
+    BEGIN
+        DELETE FROM core_postevent WHERE id <= new.id - {RETENTION};
+    END
+    """,
+]
+
+DROP_EVENT_TRIGGERS = [
+    "DROP TRIGGER IF EXISTS core_post_event_created",
+    "DROP TRIGGER IF EXISTS core_post_event_classified",
+    "DROP TRIGGER IF EXISTS core_postevent_prune",
+]
+
+
+def create_event_triggers(apps, schema_editor):
+    # Solo SQLite; en otras bases el feed responde 503 (ver core/application/feed.py)
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in CREATE_EVENT_TRIGGERS:
+        schema_editor.execute(statement)
+
+
+def drop_event_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in DROP_EVENT_TRIGGERS:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_postsearchindex'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('created', 'Creado'), ('classified', 'Clasificado')], max_length=10)),
+                ('post', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='core.post')),
+            ],
+        ),
+        migrations.RunPython(create_event_triggers, drop_event_triggers),
+    ]
@@ -20,6 +20,18 @@ class Post(models.Model):
     Entidad principal. Representa una publicación en el muro.
     Ahora soporta múltiples emociones/categorías por post.
     """
+    # Estados de la clasificación (modo asíncrono: pending -> processing -> done/failed)
+    STATUS_PENDING = 'pending'
+    STATUS_PROCESSING = 'processing'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pendiente'),
+        (STATUS_PROCESSING, 'Procesando'),
+        (STATUS_DONE, 'Clasificado'),
+        (STATUS_FAILED, 'Error'),
+    ]
+
     content = models.TextField(help_text="El mensaje anónimo")
     
     # Relación muchos-a-muchos con categorías (a través de PostCategory)
@@ -30,16 +42,38 @@ class Post(models.Model):
     )
     
     # Categoría principal (la de mayor confianza) - para filtrado rápido
-    primary_category = models.CharField(max_length=50, db_index=True)
+    # Vacía mientras el post espera clasificación
+    primary_category = models.CharField(max_length=50, db_index=True, blank=True, default='')
     
     # Confianza de la categoría principal
-    primary_confidence = models.FloatField()
+    primary_confidence = models.FloatField(default=0.0)
+    
+    # Estado de la clasificación por la IA
+    classification_status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=STATUS_DONE,
+        db_index=True
+    )
+    
+    # Camino que produjo la clasificación ("method" de MiningEngine.analyze)
+    classification_method = models.CharField(max_length=50, blank=True, default='')
+    
+    # Categorías del post como bits de TAXONOMY (ver core/domain/categories.py)
+    # Denormalizado de PostCategory para filtrar sin JOIN
+    category_mask = models.BigIntegerField(default=0)
     
     # Metadatos
     created_at = models.DateTimeField(auto_now_add=True)
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Paginación por cursor (created_at, id) en orden descendente
+            models.Index(fields=['-created_at', '-id'], name='post_created_id_idx'),
+            # Mismo recorrido filtrando por ?primary_category=
+            models.Index(fields=['primary_category', '-created_at', '-id'], name='post_primary_created_idx'),
+        ]
 
     def __str__(self):
         return f"[{self.primary_category}] {self.content[:30]}..."
@@ -49,6 +83,45 @@ class Post(models.Model):
         return list(self.post_categories.values('category__name', 'confidence'))
 
 
+class SearchField(models.TextField):
+    """Columna de una tabla FTS5: admite el lookup __match."""
+
+
+@SearchField.register_lookup
+class Match(models.Lookup):
+    """columna MATCH 'expresión FTS5' (ver core/application/search.py)."""
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", (*lhs_params, *rhs_params)
+
+
+class PostSearchIndex(models.Model):
+    """
+    Índice de texto completo de Post.content: tabla virtual FTS5 creada y
+    mantenida por triggers en la migración 0010 (Django no la gestiona).
+    Solo se usa para JOIN desde Post (Post.search_entry) y para el ranking.
+    """
+    post = models.OneToOneField(
+        Post,
+        primary_key=True,
+        db_column='rowid',
+        db_constraint=False,
+        on_delete=models.DO_NOTHING,
+        related_name='search_entry'
+    )
+    content = SearchField()
+    
+    # Columna oculta de FTS5: bm25 de la consulta (más negativo = más relevante)
+    rank = models.FloatField()
+    
+    class Meta:
+        managed = False
+        db_table = 'core_post_fts'
+
+
 class PostCategory(models.Model):
     """
     Tabla intermedia para la relación Post-Category.
@@ -60,7 +133,84 @@ class PostCategory(models.Model):
     
     class Meta:
         unique_together = ('post', 'category')
-        ordering = ['-confidence']
+        # id desempata: el orden de las categorías en la respuesta es estable
+        ordering = ['-confidence', 'id']
     
     def __str__(self):
         return f"{self.post.id} - {self.category.name}: {self.confidence:.2%}"
+
+
+class CachedClassification(models.Model):
+    """
+    Resultado de MiningEngine.analyze() guardado por hash de contenido.
+    Nivel persistente de la caché de clasificación (compartido entre workers).
+    """
+    # sha256(fingerprint + texto normalizado)
+    key = models.CharField(max_length=64, unique=True)
+    
+    # Huella de modelo + taxonomía + umbrales con la que se generó el resultado
+    fingerprint = models.CharField(max_length=64, db_index=True)
+    
+    result = models.JSONField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"{self.key[:12]} ({self.result.get('primary_category')})"
+
+
+class CategoryCounter(models.Model):
+    """
+    Contadores por hora para /api/stats/, mantenidos incrementalmente al
+    escribir PostCategory (ver core/application/stats_service.py).
+    dimension="category": cualquier categoría del post; "primary": la principal.
+    """
+    DIMENSION_CATEGORY = 'category'
+    DIMENSION_PRIMARY = 'primary'
+    DIMENSION_CHOICES = [
+        (DIMENSION_CATEGORY, 'Categoría'),
+        (DIMENSION_PRIMARY, 'Categoría principal'),
+    ]
+
+    dimension = models.CharField(max_length=10, choices=DIMENSION_CHOICES)
+    name = models.CharField(max_length=50)
+    
+    # Inicio de la hora (UTC); los días se agregan al consultar
+    bucket = models.DateTimeField()
+    
+    posts = models.IntegerField(default=0)
+    
+    # Suma de confianzas: promedio = confidence_sum / posts
+    confidence_sum = models.FloatField(default=0.0)
+    
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['dimension', 'name', 'bucket'], name='category_counter_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['dimension', 'bucket'], name='category_counter_bucket_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.dimension}:{self.name} @ {self.bucket:%Y-%m-%d %H:00} = {self.posts}"
+
+
+class PostEvent(models.Model):
+    """
+    Registro de posts creados y clasificados para el feed en tiempo real
+    (GET /api/posts/stream/). Lo escriben triggers sobre core_post
+    (migración 0011), así cubre todos los caminos de escritura y procesos.
+    El id (AUTOINCREMENT, nunca se reutiliza) es el id del evento SSE.
+    """
+    KIND_CREATED = 'created'
+    KIND_CLASSIFIED = 'classified'
+    KIND_CHOICES = [
+        (KIND_CREATED, 'Creado'),
+        (KIND_CLASSIFIED, 'Clasificado'),
+    ]
+
+    # Sin FK en la base: los triggers escriben sin validar y un post borrado se saltea
+    post = models.ForeignKey(Post, on_delete=models.DO_NOTHING, db_constraint=False, related_name='+')
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+
+    def __str__(self):
+        return f"#{self.id} {self.kind} post {self.post_id}"
@@ -1,3 +1,1341 @@
-from django.test import TestCase
+import asyncio
+import importlib.util
+from io import StringIO
+import os
+import tempfile
+import threading
+from unittest import mock, skipUnless
+from urllib.parse import parse_qs, urlparse
 
-# Create your tests here.
+import numpy as np
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, connections, transaction
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from core.application.ai_service import MiningEngine
+from core.application.batching import MicroBatcher
+from core.application.category_registry import CategoryRegistry
+from core.application.classification_cache import ClassificationCache
+from core.application.classification_worker import ClassificationWorker, classify_pending
+from core.application.distilled import DistilledClassifier
+from core.application.embeddings import EmbeddingClassifier, EmbeddingEncoder
+from core.application import near_duplicates
+from core.application.near_duplicates import NearDuplicateIndex
+from core.application import feed, search, stats_service, telemetry, tokenization, warmup
+from core.application.post_service import (
+    apply_analysis, bulk_apply_analyses, create_pending_post, create_post, rebuild_category_masks
+)
+from core.application.post_writer import PostWriter
+from core.application.remote_inference import (
+    InferenceClient, InferenceServer, InferenceServerError, InferenceServerLoading
+)
+from core.application.vector_index import VectorIndex, VectorIndexer
+from core.infrastructure.renderers import FastJSONRenderer
+from core.management.commands import benchmark
+from core.management.commands.startup_benchmark import BUDGETS, measure, over_budget
+from core.infrastructure.serializers import PostRowSerializer, PostSerializer
+from core.models import CachedClassification, CategoryCounter, Post, PostEvent
+
+
+def fake_analysis(name="Alegría", confidence=0.9):
+    """Resultado con la misma forma que MiningEngine.analyze()."""
+    return {
+        "categories": [{"name": name, "confidence": confidence}],
+        "primary_category": name,
+        "primary_confidence": confidence,
+        "all_scores": {name: confidence},
+        "method": "xlm-roberta-local"
+    }
+
+
+class MicroBatcherTests(SimpleTestCase):
+    """El batcher agrupa llamadas concurrentes y reparte cada resultado a su llamador."""
+
+    def test_concurrent_submits_share_a_batch(self):
+        batches = []
+
+        def process(items):
+            batches.append(list(items))
+            return [item * 2 for item in items]
+
+        batcher = MicroBatcher(process, window_ms=200, max_batch_size=4)
+        results = {}
+        threads = [
+            threading.Thread(target=lambda i=i: results.__setitem__(i, batcher.submit(i)))
+            for i in range(4)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(results, {0: 0, 1: 2, 2: 4, 3: 6})
+        self.assertLess(len(batches), 4)
+
+    def test_errors_reach_every_caller(self):
+        def process(items):
+            raise RuntimeError("modelo caído")
+
+        batcher = MicroBatcher(process, window_ms=1, max_batch_size=2)
+        with self.assertRaises(RuntimeError):
+            batcher.submit("hola")
+
+    def test_short_reply_fails_instead_of_hanging(self):
+        batcher = MicroBatcher(lambda items: items[:-1], window_ms=1, max_batch_size=2)
+        with self.assertRaisesMessage(RuntimeError, "0 resultados para 1"):
+            batcher.submit("hola", timeout=5)
+
+
+@override_settings(SENTIMIND_ASYNC_CLASSIFICATION=True, SENTIMIND_ASYNC_WORKER_MODE='command')
+class AsyncClassificationTests(TestCase):
+    """El POST responde 202 sin tocar el modelo y el worker completa el post."""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_post_is_pending_until_worker_runs(self):
+        with mock.patch.object(MiningEngine, 'analyze_batch') as analyze_batch:
+            response = self.client.post('/api/posts/', {'content': 'Hoy es un gran día'}, format='json')
+            analyze_batch.assert_not_called()
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data['classification_status'], Post.STATUS_PENDING)
+
+        status_url = f"/api/posts/{response.data['id']}/status/"
+        self.assertEqual(self.client.get(status_url).data['classification_status'], Post.STATUS_PENDING)
+
+        with mock.patch.object(MiningEngine, 'analyze_batch', return_value=[fake_analysis()]):
+            self.assertEqual(classify_pending(), 1)
+
+        data = self.client.get(status_url).data
+        self.assertEqual(data['classification_status'], Post.STATUS_DONE)
+        self.assertEqual(data['primary_category'], "Alegría")
+        self.assertEqual([c['name'] for c in data['categories']], ["Alegría"])
+
+    def test_post_deleted_while_classifying_does_not_block_the_batch(self):
+        deleted = create_pending_post("Lo borran desde el admin")
+        kept = create_pending_post("Este sigue")
+
+        def analyze_batch(texts):
+            Post.objects.filter(id=deleted.id).delete()
+            return [fake_analysis() for _ in texts]
+
+        with mock.patch.object(MiningEngine, 'analyze_batch', side_effect=analyze_batch):
+            classify_pending()
+
+        kept.refresh_from_db()
+        self.assertEqual(kept.classification_status, Post.STATUS_DONE)
+        self.assertEqual(kept.primary_category, "Alegría")
+
+    @override_settings(SENTIMIND_ASYNC_WORKER_MODE='inprocess', SENTIMIND_PRELOAD_MODEL=False)
+    def test_startup_requeues_interrupted_and_starts_worker(self):
+        post = Post.objects.create(content="Quedó a medias", classification_status=Post.STATUS_PROCESSING)
+        with mock.patch.object(ClassificationWorker, 'notify') as notify, \
+                mock.patch('django.db.connections.close_all'):
+            warmup.on_startup()
+
+        post.refresh_from_db()
+        self.assertEqual(post.classification_status, Post.STATUS_PENDING)
+        notify.assert_called_once_with()
+
+
+@override_settings(SENTIMIND_BATCH_WINDOW_MS=0)
+class ClassificationCacheTests(TestCase):
+    """Los reposts no vuelven a pasar por el modelo y la huella invalida la caché."""
+
+    def setUp(self):
+        ClassificationCache.clear()
+
+    def test_repost_hits_cache(self):
+        with mock.patch.object(MiningEngine, '_infer_batch', return_value=[fake_analysis()]) as infer:
+            first = MiningEngine.analyze("Hoy es un gran día")
+            second = MiningEngine.analyze("  hoy es un   GRAN día ")
+
+        self.assertEqual(infer.call_count, 1)
+        self.assertEqual(first, second)
+        self.assertEqual(CachedClassification.objects.count(), 1)
+
+    def test_persistent_tier_survives_memory_reset(self):
+        with mock.patch.object(MiningEngine, '_infer_batch', return_value=[fake_analysis()]):
+            MiningEngine.analyze("Hoy es un gran día")
+
+        ClassificationCache.clear(persistent=False)
+        with mock.patch.object(MiningEngine, '_infer_batch') as infer:
+            MiningEngine.analyze("Hoy es un gran día")
+            infer.assert_not_called()
+
+    def test_taxonomy_change_invalidates(self):
+        with mock.patch.object(MiningEngine, '_infer_batch', return_value=[fake_analysis()]) as infer:
+            MiningEngine.analyze("Hoy es un gran día")
+            with mock.patch.object(MiningEngine, 'TAXONOMY', MiningEngine.TAXONOMY + ["Calma"]):
+                MiningEngine.analyze("Hoy es un gran día")
+
+        self.assertEqual(infer.call_count, 2)
+
+    def test_purge_keeps_fallback_model_entries(self):
+        fingerprints = {
+            "principal": ClassificationCache.fingerprint(MiningEngine, MiningEngine.MODEL_NAME),
+            "fallback": ClassificationCache.fingerprint(MiningEngine, MiningEngine.FALLBACK_MODEL_NAME),
+            "viejo": "0" * 64,
+        }
+        for name, fingerprint in fingerprints.items():
+            CachedClassification.objects.create(key=name, fingerprint=fingerprint, result=fake_analysis())
+
+        self.assertEqual(ClassificationCache.purge_stale(MiningEngine), 1)
+        self.assertCountEqual(CachedClassification.objects.values_list('key', flat=True), ["principal", "fallback"])
+
+    def test_onnx_int8_does_not_share_keys_with_fp32(self):
+        with mock.patch.object(MiningEngine, '_backend_name', None), \
+                self.settings(SENTIMIND_INFERENCE_BACKEND='onnx', SENTIMIND_ONNX_QUANTIZED=False):
+            fp32 = ClassificationCache.fingerprint(MiningEngine)
+            with self.settings(SENTIMIND_ONNX_QUANTIZED=True):
+                self.assertEqual(MiningEngine.active_backend_name(), 'onnx-int8')
+                self.assertNotEqual(ClassificationCache.fingerprint(MiningEngine), fp32)
+
+
+@override_settings(SENTIMIND_BATCH_WINDOW_MS=0, SENTIMIND_NEAR_DUP_ENABLED=True, SENTIMIND_NEAR_DUP_MAX_DISTANCE=6)
+class NearDuplicateTests(TestCase):
+    """Los casi-duplicados reutilizan la clasificación; el índice está acotado."""
+
+    ORIGINAL = "No soporto que el colectivo llegue tarde todos los días"
+
+    def setUp(self):
+        ClassificationCache.clear()
+        NearDuplicateIndex.clear()
+        self.addCleanup(NearDuplicateIndex.clear)
+        self.addCleanup(CategoryRegistry.invalidate)
+        counters = mock.patch.dict(NearDuplicateIndex.stats_counters, {key: 0 for key in NearDuplicateIndex.stats_counters})
+        counters.start()
+        self.addCleanup(counters.stop)
+
+    def test_simhash_distance(self):
+        original = near_duplicates.simhash(self.ORIGINAL)
+        self.assertEqual(near_duplicates.distance(original, near_duplicates.simhash(
+            "no soporto que el colectivo llegue tarde TODOS los días!!! 😡")), 0)
+        self.assertLessEqual(near_duplicates.distance(original, near_duplicates.simhash(
+            "No soporto que el tren llegue tarde todos los días")), 6)
+        self.assertGreater(near_duplicates.distance(original, near_duplicates.simhash(
+            "Extraño mucho a mi abuela, cocinaba las mejores empanadas")), 6)
+        self.assertIsNone(near_duplicates.simhash("qué lindo día"))
+
+    def test_bands_cover_max_distance(self):
+        for max_distance in (0, 3, 6, 63):
+            bands = near_duplicates.band_masks(max_distance)
+            self.assertEqual(len(bands), max_distance + 1)
+            self.assertEqual(sum(mask.bit_length() for _, mask in bands), 64)
+
+    def test_repost_reuses_classification(self):
+        client = APIClient()
+        with mock.patch.object(MiningEngine, '_infer_batch', return_value=[fake_analysis("Queja", 0.8)]) as infer:
+            first = client.post('/api/posts/', {"content": self.ORIGINAL}, format='json')
+            second = client.post('/api/posts/', {"content": "No soporto que el tren llegue tarde todos los días"},
+                                 format='json')
+
+        self.assertEqual(infer.call_count, 1)
+        self.assertEqual(first.data['classification_method'], "xlm-roberta-local")
+        self.assertEqual(second.data['classification_method'], NearDuplicateIndex.METHOD)
+        self.assertEqual(second.data['categories'], first.data['categories'])
+        self.assertEqual(Post.objects.get(id=second.data['id']).classification_status, Post.STATUS_DONE)
+        # El reuso no entra en la caché exacta
+        self.assertEqual(CachedClassification.objects.count(), 1)
+        self.assertEqual(NearDuplicateIndex.stats()['reused'], 1)
+
+    def test_batch_reuses_and_infers_the_rest(self):
+        with mock.patch.object(MiningEngine, '_infer_batch', return_value=[fake_analysis("Queja")]):
+            MiningEngine.analyze(self.ORIGINAL)
+        other = "Extraño mucho a mi abuela, cocinaba las mejores empanadas"
+        with mock.patch.object(MiningEngine, '_infer_batch', return_value=[fake_analysis("Nostalgia")]) as infer:
+            results = MiningEngine.analyze_batch([f"{self.ORIGINAL}...", other])
+
+        infer.assert_called_once_with([other])
+        self.assertEqual(results[0]['method'], NearDuplicateIndex.METHOD)
+        self.assertEqual(results[0]['reuse_distance'], 0)
+        self.assertEqual(results[0]['primary_category'], "Queja")
+        self.assertEqual(results[1]['primary_category'], "Nostalgia")
+
+    def test_eviction_keeps_index_bounded(self):
+        texts = [f"post número {word} sobre un tema completamente distinto {word}"
+                 for word in ("uno", "dos", "tres", "cuatro", "cinco")]
+        with self.settings(SENTIMIND_NEAR_DUP_MAX_ENTRIES=3):
+            NearDuplicateIndex.add_many(MiningEngine, texts, [fake_analysis()] * len(texts))
+            stats = NearDuplicateIndex.stats()
+            self.assertEqual(stats['size'], 3)
+            self.assertEqual(stats['evictions'], 2)
+            self.assertEqual(sum(len(bucket) for band in NearDuplicateIndex._bands for bucket in band.values()),
+                             3 * len(NearDuplicateIndex._bands))
+            with self.settings(SENTIMIND_NEAR_DUP_MAX_DISTANCE=0):
+                self.assertNotIn(0, NearDuplicateIndex.find_many(MiningEngine, texts[:1]))
+                self.assertIn(0, NearDuplicateIndex.find_many(MiningEngine, texts[-1:]))
+
+    def test_fallbacks_are_not_indexed_and_taxonomy_change_clears(self):
+        NearDuplicateIndex.add_many(MiningEngine, [self.ORIGINAL], [{**fake_analysis(), "method": "fallback-error"}])
+        self.assertEqual(NearDuplicateIndex.stats()['size'], 0)
+
+        NearDuplicateIndex.add_many(MiningEngine, [self.ORIGINAL], [fake_analysis()])
+        with mock.patch.object(MiningEngine, 'TAXONOMY', MiningEngine.TAXONOMY + ["Calma"]):
+            self.assertEqual(NearDuplicateIndex.find_many(MiningEngine, [self.ORIGINAL]), {})
+            self.assertEqual(NearDuplicateIndex.stats()['size'], 0)
+
+    def test_audit_reports_reuse_and_false_reuse_rates(self):
+        create_post(self.ORIGINAL, fake_analysis("Queja"))
+        create_post("No soporto que el tren llegue tarde todos los días",
+                    {**fake_analysis("Queja"), "method": NearDuplicateIndex.METHOD})
+        create_post("No soporto que el tren llegue temprano todos los días",
+                    {**fake_analysis("Queja"), "method": NearDuplicateIndex.METHOD})
+
+        out = StringIO()
+        with mock.patch.object(MiningEngine, '_infer_batch',
+                               return_value=[fake_analysis("Alegría"), fake_analysis("Queja")]):
+            call_command('audit_reuse', stdout=out)
+        output = out.getvalue()
+        self.assertIn("2/3 clasificados", output)
+        self.assertIn("Falsos reusos (otra categoría principal): 1/2 (50.0%)", output)
+
+
+@override_settings(SENTIMIND_CLASSIFICATION_MODE='embedding', SENTIMIND_EMBEDDING_MIN_MARGIN=0.1)
+class EmbeddingFastPathTests(SimpleTestCase):
+    """Margen alto: responde el camino rápido. Margen bajo: vuelve a NLI."""
+
+    def setUp(self):
+        self.labels = np.eye(len(MiningEngine.TAXONOMY), dtype=np.float32)
+        patcher = mock.patch.object(EmbeddingClassifier, 'label_matrix', return_value=self.labels)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_clear_margin_uses_fast_path(self):
+        post = self.labels[[0]]
+        with mock.patch.object(EmbeddingEncoder, 'encode', return_value=post), \
+                mock.patch.object(MiningEngine, '_nli_batch') as nli:
+            [result] = MiningEngine._infer_batch(["Qué felicidad"])
+            nli.assert_not_called()
+
+        self.assertEqual(result['method'], EmbeddingClassifier.METHOD)
+        self.assertEqual(result['primary_category'], MiningEngine.TAXONOMY[0])
+
+    def test_low_margin_falls_back_to_nli(self):
+        post = ((self.labels[0] + self.labels[1]) / np.sqrt(2))[None, :]
+        with mock.patch.object(EmbeddingEncoder, 'encode', return_value=post), \
+                mock.patch.object(MiningEngine, '_nli_batch', return_value=[fake_analysis()]) as nli:
+            [result] = MiningEngine._infer_batch(["Ni idea"])
+
+        nli.assert_called_once_with(["Ni idea"])
+        self.assertEqual(result['method'], MiningEngine.NLI_METHOD)
+
+
+@skipUnless(importlib.util.find_spec('sklearn'), "requiere scikit-learn (extra cascade)")
+class DistilledClassifierTests(TestCase):
+    """El destilado aprende de los PostCategory guardados y responde solo si está seguro."""
+
+    def setUp(self):
+        for i in range(40):
+            create_post(f"jajaja qué risa me dio el chiste número {i}", fake_analysis("Humor"))
+            create_post(f"extraño mucho a mi abuela, hoy lloré otra vez {i}", fake_analysis("Tristeza"))
+
+    def test_train_reports_agreement_and_cascade_answers(self):
+        texts, targets, primaries = DistilledClassifier.build_dataset(MiningEngine)
+        self.assertEqual(len(texts), 80)
+
+        artifact = DistilledClassifier.train(MiningEngine, texts, targets, primaries)
+        self.assertGreaterEqual(artifact['metrics']['agreement'], 0.9)
+
+        with mock.patch.object(DistilledClassifier, 'load', return_value=artifact), \
+                override_settings(SENTIMIND_CASCADE_MIN_CONFIDENCE=0.5, SENTIMIND_CASCADE_MIN_MARGIN=0.1):
+            [result] = DistilledClassifier.classify(MiningEngine, ["jajaja qué chiste tan bueno"])
+
+        self.assertEqual(result['method'], DistilledClassifier.METHOD)
+        self.assertEqual(result['primary_category'], "Humor")
+
+    def test_active_version_reads_latest_once(self):
+        with tempfile.TemporaryDirectory() as tmp, override_settings(SENTIMIND_DISTILLED_DIR=tmp):
+            latest = os.path.join(tmp, "LATEST")
+            with open(latest, "w") as f:
+                f.write("v1")
+            self.assertEqual(DistilledClassifier.active_version(), "v1")
+
+            with open(latest, "w") as f:
+                f.write("v2")
+            self.assertEqual(DistilledClassifier.active_version(), "v1")
+
+            DistilledClassifier.save({'version': "v3"})
+            self.assertEqual(DistilledClassifier.active_version(), "v3")
+
+
+@override_settings(SENTIMIND_BULK_MAX_SIZE=3, SENTIMIND_BATCH_MAX_SIZE=2)
+class BulkCreateTests(TestCase):
+    """Ingesta masiva: resultados por ítem, fallos parciales y tamaño máximo."""
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_partial_failure_is_reported_per_item(self):
+        payload = [{'content': 'Hoy es un gran día'}, {'content': 'no'}, {'content': 'Qué risa'}]
+        with mock.patch.object(MiningEngine, 'analyze_batch',
+                               side_effect=lambda texts: [fake_analysis() for _ in texts]) as analyze:
+            response = self.client.post('/api/posts/bulk/', payload, format='json')
+
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual((response.data['created'], response.data['failed']), (2, 1))
+        self.assertEqual([r['status'] for r in response.data['results']], ['created', 'error', 'created'])
+        self.assertIn('content', response.data['results'][1]['errors'])
+        self.assertEqual(analyze.call_count, 1)
+        self.assertEqual(Post.objects.count(), 2)
+        self.assertEqual(response.data['results'][2]['post']['categories'][0]['name'], "Alegría")
+
+    def test_non_string_content_is_coerced(self):
+        payload = [{'content': 12345}, {'content': '   Qué risa   '}]
+        with mock.patch.object(MiningEngine, 'analyze_batch',
+                               side_effect=lambda texts: [fake_analysis() for _ in texts]) as analyze:
+            response = self.client.post('/api/posts/bulk/', payload, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        analyze.assert_called_once_with(['12345', 'Qué risa'])
+        self.assertEqual(sorted(Post.objects.values_list('content', flat=True)), ['12345', 'Qué risa'])
+
+    def test_single_create_validates_like_bulk(self):
+        too_long = 'a' * 1001
+        with mock.patch.object(MiningEngine, 'analyze', return_value=fake_analysis()):
+            single = self.client.post('/api/posts/', {'content': too_long}, format='json')
+            numeric = self.client.post('/api/posts/', {'content': 12345}, format='json')
+        bulk = self.client.post('/api/posts/bulk/', [{'content': too_long}], format='json')
+
+        self.assertEqual((single.status_code, bulk.status_code), (400, 400))
+        self.assertIn('content', single.data['errors'])
+        self.assertEqual(numeric.status_code, 201)
+        self.assertEqual(list(Post.objects.values_list('content', flat=True)), ['12345'])
+
+    def test_rejects_batches_over_max_size(self):
+        payload = {'posts': [{'content': f'post número {i}'} for i in range(4)]}
+        response = self.client.post('/api/posts/bulk/', payload, format='json')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Post.objects.count(), 0)
+
+
+
+class CreatePostQueryCountTests(TestCase):
+    """Crear un post cuesta un número fijo de queries, sin importar cuántas categorías detecte."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.addCleanup(CategoryRegistry.invalidate)
+        with self.captureOnCommitCallbacks(execute=True):
+            CategoryRegistry.warm(MiningEngine.TAXONOMY)
+
+    def _create(self, analysis):
+        with mock.patch.object(MiningEngine, 'analyze', return_value=analysis):
+            return self.client.post('/api/posts/', {'content': 'me reí muchísimo hoy'}, format='json')
+
+    def test_queries_do_not_grow_with_categories(self):
+        many = {
+            **fake_analysis("Humor", 0.9),
+            "categories": [{"name": name, "confidence": c}
+                           for name, c in (("Humor", 0.9), ("Alegría", 0.7), ("Sorpresa", 0.5))],
+        }
+        # SAVEPOINT, INSERT post, INSERT de todas las PostCategory, upsert de contadores, RELEASE
+        for analysis in (fake_analysis("Humor"), many):
+            with self.assertNumQueries(5):
+                response = self._create(analysis)
+            self.assertEqual(response.status_code, 201)
+
+        self.assertEqual([c['name'] for c in response.data['categories']], ["Humor", "Alegría", "Sorpresa"])
+        post = Post.objects.prefetch_related('post_categories__category').get(pk=response.data['id'])
+        self.assertEqual([pc.category.name for pc in post.post_categories.all()], ["Humor", "Alegría", "Sorpresa"])
+
+    def test_unknown_category_is_created_once(self):
+        with self.assertNumQueries(8):  # + SELECT, INSERT y SELECT de la categoría nueva
+            self._create(fake_analysis("Gracioso"))
+        self.assertEqual(Post.objects.filter(categories__name="Gracioso").count(), 1)
+
+class GroupCommitTests(TransactionTestCase):
+    """La IA corre fuera de la transacción y las escrituras concurrentes se agrupan en una sola."""
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(CategoryRegistry.invalidate)
+
+    def test_analyze_runs_outside_the_transaction(self):
+        in_transaction = []
+
+        def analyze(content):
+            in_transaction.append(transaction.get_connection().in_atomic_block)
+            return fake_analysis("Humor")
+
+        with mock.patch.object(MiningEngine, 'analyze', side_effect=analyze):
+            response = APIClient().post('/api/posts/', {'content': 'me reí muchísimo hoy'}, format='json')
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(in_transaction, [False])
+        self.assertEqual(response.data['primary_category'], "Humor")
+
+    @override_settings(SENTIMIND_WRITE_BATCH_WINDOW_MS=200, SENTIMIND_WRITE_BATCH_MAX_SIZE=64)
+    def test_concurrent_writes_share_one_transaction(self):
+        self.addCleanup(setattr, PostWriter, '_batcher', None)
+        results = {}
+
+        def write(i):
+            try:
+                results[i] = PostWriter.create(f"post concurrente {i}", fake_analysis("Amor", 0.8))
+            finally:
+                connections.close_all()
+
+        with mock.patch.object(PostWriter, '_write', wraps=PostWriter._write) as grouped:
+            threads = [threading.Thread(target=write, args=(i,)) for i in range(8)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+
+        self.assertEqual(sum(len(call.args[0]) for call in grouped.call_args_list), 8)
+        self.assertLess(grouped.call_count, 8)
+        self.assertEqual(Post.objects.filter(categories__name="Amor").count(), 8)
+        for i, post in results.items():
+            self.assertEqual(post.content, f"post concurrente {i}")
+            # Las relaciones quedan precargadas para serializar la respuesta
+            self.assertEqual(PostSerializer(post).data['categories'][0]['name'], "Amor")
+
+
+@override_settings(SENTIMIND_PAGE_SIZE=2)
+class PostListPaginationTests(TestCase):
+    """Cursor (created_at, id): recorre todo sin repetir aunque haya empates o posts nuevos."""
+
+    def setUp(self):
+        self.client = APIClient()
+        for i in range(5):
+            create_post(f"post número {i}", fake_analysis())
+        # Empate de created_at: el id desempata
+        first = Post.objects.order_by('id').first()
+        Post.objects.filter(id__lte=first.id + 2).update(created_at=first.created_at)
+
+    def _walk(self, url):
+        seen = []
+        while url:
+            data = self.client.get(url).data
+            seen.extend(post['id'] for post in data['results'])
+            url = data['next']
+            if len(seen) == 2:
+                create_post("post nuevo mientras se pagina", fake_analysis())
+        return seen
+
+    def test_walks_every_post_once_in_order(self):
+        expected = list(Post.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(self._walk('/api/posts/'), expected)
+
+    def test_sparse_fieldset(self):
+        data = self.client.get('/api/posts/?fields=id,primary_category').data
+        self.assertEqual(set(data['results'][0]), {'id', 'primary_category'})
+
+    def test_page_size_is_capped(self):
+        with override_settings(SENTIMIND_MAX_PAGE_SIZE=3):
+            data = self.client.get('/api/posts/?page_size=50').data
+        self.assertEqual(len(data['results']), 3)
+
+
+class CategoryFilterTests(TestCase):
+    """El filtro por máscara de bits devuelve lo mismo que el JOIN + DISTINCT."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.both = create_post("me reí y me enamoré", {
+            **fake_analysis("Humor", 0.9),
+            "categories": [{"name": "Humor", "confidence": 0.9}, {"name": "Amor", "confidence": 0.6}],
+        })
+        self.humor = create_post("qué chiste tan malo", fake_analysis("Humor", 0.5))
+        self.amor = create_post("te extraño", fake_analysis("Amor", 0.8))
+        self.other = create_post("hoy llueve", fake_analysis("Tristeza", 0.7))
+
+        # Post antiguo con una categoría que ya no está en TAXONOMY
+        self.legacy = create_post("post de antes", fake_analysis("Gracioso", 0.9))
+        Post.objects.filter(pk=self.legacy.pk).update(category_mask=0)
+
+    def _ids(self, query):
+        data = self.client.get(f'/api/posts/?page_size=100&{query}').data
+        return {post['id'] for post in data['results']}
+
+    def test_matches_join_distinct(self):
+        for name in ("Humor", "Amor", "Tristeza", "Gracioso", "Nostalgia"):
+            expected = set(Post.objects.filter(categories__name=name).distinct().values_list('id', flat=True))
+            self.assertEqual(self._ids(f'category={name}'), expected, name)
+
+    def test_any_and_all(self):
+        self.assertEqual(self._ids('category=Humor,Amor'), {self.both.id, self.humor.id, self.amor.id})
+        self.assertEqual(self._ids('category=Humor&category=Gracioso'),
+                         {self.both.id, self.humor.id, self.legacy.id})
+        self.assertEqual(self._ids('category=Humor,Amor&category_match=all'), {self.both.id})
+
+    def test_min_confidence(self):
+        self.assertEqual(self._ids('category=Humor&min_confidence=0.7'), {self.both.id})
+        self.assertEqual(self._ids('category=Amor,Gracioso&min_confidence=0.7'), {self.amor.id, self.legacy.id})
+        response = self.client.get('/api/posts/?category=Humor&min_confidence=alta')
+        self.assertEqual(response.status_code, 400)
+
+    def test_rebuild_masks(self):
+        Post.objects.update(category_mask=0)
+        rebuild_category_masks()
+        self.assertEqual(self._ids('category=Amor'), {self.both.id, self.amor.id})
+
+
+class SearchTests(TestCase):
+    """?q= busca con el índice FTS5, ordena por relevancia y se combina con los filtros."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.addCleanup(CategoryRegistry.invalidate)
+        self.coffee = create_post("Café, café y más CAFÉ para empezar el día", fake_analysis("Alegría"))
+        self.grandma = create_post("Hoy tomé un café con mi abuela y me acordé de cuando era chica", {
+            **fake_analysis("Amor", 0.8),
+            "categories": [{"name": "Amor", "confidence": 0.8}, {"name": "Nostalgia", "confidence": 0.6}],
+        })
+        self.dog = create_post("Mi perro persigue su cola hace 20 minutos", fake_analysis("Humor"))
+
+    def _ids(self, query):
+        response = self.client.get('/api/posts/', query)
+        self.assertEqual(response.status_code, 200)
+        return [post['id'] for post in response.data['results']]
+
+    def test_ranks_by_relevance_ignoring_case_and_accents(self):
+        self.assertTrue(search.available())
+        self.assertEqual(self._ids({'q': 'cafe'}), [self.coffee.id, self.grandma.id])
+        self.assertEqual(self._ids({'q': 'ABUELA café'}), [self.grandma.id])
+        self.assertEqual(self._ids({'q': 'gato'}), [])
+
+    def test_combines_with_category_filters(self):
+        self.assertEqual(self._ids({'q': 'café', 'primary_category': 'Amor'}), [self.grandma.id])
+        self.assertEqual(self._ids({'q': 'café', 'category': 'Nostalgia'}), [self.grandma.id])
+        self.assertEqual(self._ids({'q': 'café', 'category': 'Humor'}), [])
+
+    def test_paginates_ranked_results(self):
+        for i in range(3):
+            create_post(f"otro café número {i}", fake_analysis())
+        expected = self._ids({'q': 'café', 'page_size': 50})
+
+        data = self.client.get('/api/posts/', {'q': 'café', 'page_size': 2}).data
+        seen = [post['id'] for post in data['results']]
+        # Un cursor de búsqueda no sirve para el listado por fecha
+        cursor = parse_qs(urlparse(data['next']).query)['cursor'][0]
+        self.assertEqual(self.client.get('/api/posts/', {'cursor': cursor}).status_code, 404)
+
+        url = data['next']
+        while url:
+            data = self.client.get(url).data
+            seen.extend(post['id'] for post in data['results'])
+            url = data['next']
+        self.assertEqual(seen, expected)
+        self.assertEqual(len(seen), 5)
+
+    def test_query_syntax_is_not_interpreted(self):
+        self.assertEqual(self._ids({'q': 'perro "cola'}), [self.dog.id])
+        self.assertEqual(self._ids({'q': 'café* ^(abuela'}), [self.grandma.id])
+        self.assertEqual(self._ids({'q': '"" ***'}), [])
+
+    def test_index_follows_updates_deletes_and_rebuilds(self):
+        Post.objects.filter(pk=self.dog.pk).update(content="Mi gato duerme todo el día")
+        self.assertEqual(self._ids({'q': 'perro'}), [])
+        self.assertEqual(self._ids({'q': 'gato'}), [self.dog.id])
+
+        self.grandma.delete()
+        self.assertEqual(self._ids({'q': 'abuela'}), [])
+
+        with connection.cursor() as cursor:
+            cursor.execute("INSERT INTO core_post_fts(core_post_fts) VALUES ('delete-all')")
+        self.assertEqual(self._ids({'q': 'café'}), [])
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(self._ids({'q': 'café'}), [self.coffee.id])
+
+
+class KeywordEncoder:
+    """Embeddings de prueba: una dimensión por palabra clave, filas de norma 1."""
+
+    WORDS = ("perro", "gato", "café", "lluvia")
+
+    @classmethod
+    def encode(cls, texts):
+        vectors = np.array(
+            [[text.lower().split().count(word) for word in cls.WORDS] for text in texts], dtype=np.float32
+        )
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-9)
+
+
+class VectorIndexTests(TestCase):
+    """El índice memory-mapped devuelve los posts más parecidos y crece al crear posts."""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.addCleanup(CategoryRegistry.invalidate)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        directory = override_settings(SENTIMIND_VECTOR_INDEX_DIR=tmp.name)
+        directory.enable()
+        self.addCleanup(directory.disable)
+        for patcher in (
+            mock.patch.object(EmbeddingEncoder, 'encode', side_effect=KeywordEncoder.encode),
+            # Sin hilo de fondo: el test drena la cola
+            mock.patch.object(VectorIndexer, 'start'),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.addCleanup(setattr, VectorIndex, '_stat', None)
+
+        self.dog = create_post("perro", fake_analysis("Amor"))
+        self.pets = create_post("perro gato", fake_analysis("Humor"))
+        self.cat = create_post("perro gato gato", fake_analysis("Humor"))
+        self.coffee = create_post("café", fake_analysis("Alegría"))
+
+    def _similar(self, post, **params):
+        response = self.client.get(f'/api/posts/{post.id}/similar/', params)
+        self.assertEqual(response.status_code, 200, response.data)
+        return [(item['id'], item['similarity']) for item in response.data['results']]
+
+    def test_ranks_by_cosine_and_filters_by_category(self):
+        self.assertEqual(VectorIndex.rebuild(), 4)
+        records = VectorIndex.records()
+        self.assertEqual(records.dtype['vector'].base, np.float16)
+        self.assertIsInstance(records, np.memmap)
+
+        similar = self._similar(self.dog, k=3)
+        self.assertEqual([post_id for post_id, _ in similar], [self.pets.id, self.cat.id, self.coffee.id])
+        self.assertAlmostEqual(similar[0][1], 1 / np.sqrt(2), places=3)
+        self.assertEqual([post_id for post_id, _ in self._similar(self.dog, k=1)], [self.pets.id])
+        self.assertEqual([post_id for post_id, _ in self._similar(self.dog, primary_category="Alegría")],
+                         [self.coffee.id])
+
+    def test_new_posts_are_appended(self):
+        VectorIndex.rebuild()
+        with override_settings(SENTIMIND_VECTOR_INDEX=True), self.captureOnCommitCallbacks(execute=True):
+            twin = create_post("perro", fake_analysis("Amor"))
+        self.assertEqual(VectorIndexer.drain(), 1)
+
+        self.assertEqual(len(VectorIndex.records()), 5)
+        self.assertEqual(self._similar(self.dog, k=1), [(twin.id, 1.0)])
+
+        # Un post borrado no aparece aunque siga en el índice
+        twin.delete()
+        self.assertEqual([post_id for post_id, _ in self._similar(self.dog, k=1)], [self.pets.id])
+
+    def test_missing_index_is_503(self):
+        response = self.client.get(f'/api/posts/{self.dog.id}/similar/')
+        self.assertEqual(response.status_code, 503)
+        self.assertIn("rebuild_vector_index", response.data['error'])
+
+
+class FeedTests(TestCase):
+    """Eventos por trigger, reparto por categoría, reanudación con Last-Event-ID y stream SSE."""
+
+    def setUp(self):
+        self.addCleanup(CategoryRegistry.invalidate)
+        # Sin hilo del hub: los tests llaman a FeedHub.poll() en su conexión
+        patcher = mock.patch.object(feed.FeedHub, 'start')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        subscriptions = mock.patch.object(feed.FeedHub, '_subscriptions', {})
+        subscriptions.start()
+        self.addCleanup(subscriptions.stop)
+
+    def events(self):
+        return list(PostEvent.objects.order_by('id').values_list('post_id', 'kind'))
+
+    def test_triggers_record_created_and_classified(self):
+        done = create_post("Qué lindo día", fake_analysis())
+        pending = create_pending_post("Esperando a la IA")
+        apply_analysis(pending, fake_analysis("Humor"))
+        # Reclasificar un post ya clasificado no es un evento del feed
+        bulk_apply_analyses([done], [fake_analysis("Queja")])
+
+        self.assertEqual(self.events(), [
+            (done.id, PostEvent.KIND_CREATED),
+            (pending.id, PostEvent.KIND_CREATED),
+            (pending.id, PostEvent.KIND_CLASSIFIED),
+        ])
+
+    def test_hub_fans_out_by_category(self):
+        everything, _ = feed.FeedHub.subscribe()
+        humor, _ = feed.FeedHub.subscribe(["Humor", "Amor"])
+        create_post("Me reí muchísimo", fake_analysis("Humor"))
+        create_post("Otra vez tarde el colectivo", fake_analysis("Queja"))
+
+        self.assertEqual(feed.FeedHub.poll(), 2)
+        self.assertEqual(len(everything.pending), 2)
+        self.assertEqual([event.categories for event in humor.pending], [frozenset({"Humor"})])
+        self.assertTrue(everything.wakeup.is_set())
+        # Los bytes del evento se arman una vez para todos
+        self.assertIs(humor.pending[0], everything.pending[0])
+        payload = humor.pending[0].payload.decode()
+        self.assertTrue(payload.startswith(f"id: {humor.pending[0].id}\nevent: created\ndata: {{"))
+        self.assertIn('"primary_category":"Humor"', payload)
+
+        feed.FeedHub.unsubscribe(everything)
+        feed.FeedHub.unsubscribe(humor)
+        self.assertEqual(feed.FeedHub.subscriber_count(), 0)
+
+    def test_resume_from_last_event_id(self):
+        posts = [create_post(f"Post número {i}", fake_analysis()) for i in range(3)]
+        first = PostEvent.objects.order_by('id').first().id
+
+        subscription, replay = feed.FeedHub.subscribe(last_event_id=first)
+        self.assertEqual([event.id for event in replay], [first + 1, first + 2])
+        self.assertEqual(subscription.start_id, first + 2)
+        self.assertIn(f'"id":{posts[2].id}', replay[-1].payload.decode())
+
+        with self.settings(SENTIMIND_FEED_REPLAY_MAX=1):
+            _, replay = feed.FeedHub.subscribe(last_event_id=first)
+        self.assertEqual([event.kind for event in replay], ['reset'])
+
+    def test_slow_client_is_cut(self):
+        subscription, _ = feed.FeedHub.subscribe()
+        create_post("Uno", fake_analysis())
+        create_post("Dos", fake_analysis())
+        with self.settings(SENTIMIND_FEED_CLIENT_BUFFER=1):
+            feed.FeedHub.poll()
+        self.assertTrue(subscription.overflowed)
+        self.assertEqual(len(subscription.pending), 0)
+
+    def test_wsgi_refused_unless_enabled(self):
+        response = self.client.get('/api/posts/stream/')
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(feed.FeedHub.subscriber_count(), 0)
+
+    @override_settings(SENTIMIND_FEED_WSGI=True)
+    def test_stream_over_wsgi(self):
+        create_post("Antes de conectar", fake_analysis())
+        last = PostEvent.objects.order_by('id').last().id
+        create_post("Mientras estaba desconectado", fake_analysis("Humor"))
+
+        response = self.client.get('/api/posts/stream/?category=Humor', HTTP_LAST_EVENT_ID=str(last))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        chunks = iter(response.streaming_content)
+        self.assertEqual(next(chunks), b"retry: 3000\n\n")
+        self.assertIn(b'"content":"Mientras estaba desconectado"', next(chunks))
+        self.assertEqual(feed.FeedHub.subscriber_count(), 1)
+        response.close()
+        self.assertEqual(feed.FeedHub.subscriber_count(), 0)
+
+        self.assertEqual(self.client.get('/api/posts/stream/', HTTP_LAST_EVENT_ID='x').status_code, 400)
+
+    async def test_stream_over_asgi(self):
+        response = await self.async_client.get('/api/posts/stream/')
+        chunks = aiter(response.streaming_content)
+        self.assertEqual(await anext(chunks), b"retry: 3000\n\n")
+        self.assertEqual(await sync_to_async(feed.FeedHub.subscriber_count)(), 1)
+
+        await sync_to_async(create_post)("Recién creado", fake_analysis("Humor"))
+        await sync_to_async(feed.FeedHub.poll)()
+        event = await asyncio.wait_for(anext(chunks), 5)
+        self.assertIn(b"event: created", event)
+        self.assertIn(b'"content":"Reci\xc3\xa9n creado"', event)
+
+        # Lo que hace el handler ASGI al terminar o al desconectarse el cliente
+        await chunks.aclose()
+        await sync_to_async(response.close)()
+        self.assertEqual(await sync_to_async(feed.FeedHub.subscriber_count)(), 0)
+
+
+class StatsTests(TestCase):
+    """Los contadores incrementales coinciden con recalcularlos desde cero."""
+
+    def setUp(self):
+        self.client = APIClient()
+        create_post("me reí y me enamoré", {
+            **fake_analysis("Humor", 0.9),
+            "categories": [{"name": "Humor", "confidence": 0.9}, {"name": "Amor", "confidence": 0.5}],
+        })
+        create_post("qué chiste", fake_analysis("Humor", 0.7))
+        self.reclassified = create_post("te extraño", fake_analysis("Amor", 0.8))
+
+    def _snapshot(self):
+        return sorted(
+            CategoryCounter.objects.filter(posts__gt=0)
+            .values_list('dimension', 'name', 'bucket', 'posts')
+        )
+
+    def test_endpoint_totals(self):
+        data = self.client.get('/api/stats/?granularity=hour').data
+        self.assertEqual(data['categories'], [
+            {"name": "Amor", "posts": 2, "avg_confidence": 0.65},
+            {"name": "Humor", "posts": 2, "avg_confidence": 0.8},
+        ])
+        self.assertEqual([(e['name'], e['posts']) for e in data['primary_categories']], [("Humor", 2), ("Amor", 1)])
+        self.assertGreaterEqual(sum(len(b['primary_categories']) for b in data['series']), 2)
+        self.assertEqual(self.client.get('/api/stats/?granularity=week').status_code, 400)
+
+    def test_reclassification_keeps_counters_in_sync(self):
+        with transaction.atomic():
+            bulk_apply_analyses([Post(id=self.reclassified.id)], [fake_analysis("Nostalgia", 0.6)])
+        incremental = self._snapshot()
+        stats_service.rebuild()
+        self.assertEqual(incremental, self._snapshot())
+        day = self.client.get('/api/stats/').data
+        self.assertNotIn("Amor", [e['name'] for e in day['primary_categories']])
+
+
+class ReclassifyCommandTests(TestCase):
+    """La reclasificación masiva guarda checkpoint por página y se reanuda desde ahí."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.checkpoint = os.path.join(tmp.name, "reclassify.checkpoint.json")
+        self.posts = [create_post(f"post número {i}", fake_analysis("Humor")) for i in range(5)]
+
+    def _reclassify(self, infer, **options):
+        with mock.patch.object(MiningEngine, '_infer_batch', side_effect=infer):
+            call_command('reclassify', checkpoint=self.checkpoint, chunk_size=2, batch_size=2,
+                         stdout=StringIO(), **options)
+
+    def _primaries(self):
+        return list(Post.objects.order_by('pk').values_list('primary_category', flat=True))
+
+    def _interrupted_run(self):
+        calls = []
+
+        def infer(texts):
+            calls.append(texts)
+            if len(calls) == 2:
+                raise RuntimeError("corte a mitad")
+            return [fake_analysis("Amor") for _ in texts]
+
+        with self.assertRaises(RuntimeError):
+            self._reclassify(infer)
+
+    def test_interrupted_run_resumes_from_checkpoint(self):
+        self._interrupted_run()
+        self.assertEqual(self._primaries(), ["Amor"] * 2 + ["Humor"] * 3)
+        self.assertTrue(os.path.exists(self.checkpoint))
+
+        seen = []
+        self._reclassify(lambda texts: seen.extend(texts) or [fake_analysis("Amor") for _ in texts])
+
+        self.assertEqual(seen, [post.content for post in self.posts[2:]])
+        self.assertEqual(self._primaries(), ["Amor"] * 5)
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+    def test_checkpoint_from_other_filters_is_rejected(self):
+        self._interrupted_run()
+        with self.assertRaisesMessage(CommandError, "--restart"):
+            self._reclassify(lambda texts: [fake_analysis("Amor") for _ in texts], category="Humor")
+
+    def test_dry_run_writes_nothing(self):
+        self._reclassify(lambda texts: [fake_analysis("Amor") for _ in texts], dry_run=True)
+
+        self.assertEqual(self._primaries(), ["Humor"] * 5)
+        self.assertFalse(os.path.exists(self.checkpoint))
+
+
+class PostRowSerializerContractTests(TestCase):
+    """El camino rápido del listado produce exactamente los mismos bytes que PostSerializer + JSONRenderer."""
+
+    def setUp(self):
+        create_post("ñandú 🐦 con \u2028 separador", {
+            **fake_analysis("Humor", 0.8),
+            # Empate de confianza: el orden lo decide el id de PostCategory
+            "categories": [{"name": "Humor", "confidence": 0.8}, {"name": "Alegría", "confidence": 0.8},
+                           {"name": "Sorpresa", "confidence": 0.123456789},
+                           # json.dumps escribe 3e-05 y orjson 3e-5: se redondea antes
+                           {"name": "Miedo", "confidence": 0.00003}],
+        })
+        create_post("post con \"comillas\" y \\ barra", fake_analysis("Queja", 1.0))
+        create_pending_post("todavía sin clasificar")
+
+    def _assert_same_bytes(self, fields=None):
+        queryset = Post.objects.order_by('-created_at', '-id')
+        expected = JSONRenderer().render(
+            PostSerializer(queryset.prefetch_related('post_categories__category'), many=True, fields=fields).data
+        )
+        rows = list(PostRowSerializer.values(queryset, fields))
+        actual = FastJSONRenderer().render(PostRowSerializer.serialize(rows, fields))
+        self.assertEqual(actual, expected)
+
+    def test_full_representation(self):
+        self._assert_same_bytes()
+
+    def test_sparse_fields(self):
+        self._assert_same_bytes(['created_at', 'categories', 'id', 'nope'])
+        self._assert_same_bytes(['confidence'])
+
+    def test_endpoint_uses_fast_path(self):
+        with self.assertNumQueries(2):  # posts + categorías agrupadas
+            response = self.client.get('/api/posts/', HTTP_ACCEPT='application/json')
+        expected = PostSerializer(Post.objects.order_by('-created_at', '-id'), many=True).data
+        self.assertEqual(response.content, JSONRenderer().render({"next": None, "results": expected}))
+
+
+class ConditionalListTests(TestCase):
+    """ETag/Last-Modified en el listado y categorías; la primera página cacheada se invalida al escribir."""
+
+    def setUp(self):
+        self.client = APIClient()
+        cache.clear()
+        self.addCleanup(CategoryRegistry.invalidate)
+        create_post("primer post", fake_analysis("Humor"))
+
+    def _create(self, content):
+        with self.captureOnCommitCallbacks(execute=True):
+            create_post(content, fake_analysis("Humor"))
+
+    def test_not_modified_until_a_post_is_created(self):
+        first = self.client.get('/api/posts/?category=Humor')
+        etag = first['ETag']
+        self.assertIn('no-cache', first['Cache-Control'])
+
+        with self.assertNumQueries(0):
+            again = self.client.get('/api/posts/?category=Humor', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(again.status_code, 304)
+        # Otro filtro, otro ETag
+        self.assertNotEqual(self.client.get('/api/posts/?category=Amor')['ETag'], etag)
+
+        self._create("segundo post")
+        fresh = self.client.get('/api/posts/?category=Humor', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(fresh.status_code, 200)
+        self.assertEqual(len(fresh.data['results']), 2)
+
+    @override_settings(SENTIMIND_LIST_CACHE=True)
+    def test_first_page_cache_is_invalidated_on_create(self):
+        self.client.get('/api/posts/')
+        with self.assertNumQueries(0):
+            cached = self.client.get('/api/posts/')
+        self.assertEqual(len(cached.data['results']), 1)
+
+        self._create("segundo post")
+        self.assertEqual(len(self.client.get('/api/posts/').data['results']), 2)
+
+    def test_categories_etag(self):
+        response = self.client.get('/api/categories/')
+        self.assertIn('max-age', response['Cache-Control'])
+        again = self.client.get('/api/categories/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(again.status_code, 304)
+
+
+class WarmUpTests(SimpleTestCase):
+    """Precarga + warm-up y el endpoint /ready."""
+
+    def setUp(self):
+        state = {name: getattr(MiningEngine, name) for name in
+                 ('_classifier', '_model_name', '_backend_name', '_load_seconds', '_warmup_seconds', '_warm')}
+        self.addCleanup(lambda: [setattr(MiningEngine, name, value) for name, value in state.items()])
+        MiningEngine._classifier = None
+        MiningEngine._warm = False
+
+    def test_ready_only_after_warm_up(self):
+        self.assertEqual(self.client.get('/ready/').status_code, 503)
+
+        backend = mock.Mock(load=mock.Mock(return_value=object()))
+        backend.name = 'torch'
+        with mock.patch('core.application.ai_service.get_backend', return_value=backend), \
+                mock.patch.object(MiningEngine, '_infer_batch') as infer:
+            thread = warmup.start_warm_up()
+            thread.join(timeout=5)
+
+        infer.assert_called_once_with([MiningEngine.WARMUP_TEXT])
+        response = self.client.get('/ready/')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertTrue(data['loaded'] and data['warm'])
+        self.assertIsNotNone(data['load_seconds'])
+        self.assertGreater(data['rss_mb'], 0)
+
+    def test_concurrent_callers_load_the_model_once(self):
+        def slow_load(name):
+            threading.Event().wait(0.05)
+            return object()
+
+        backend = mock.Mock(load=mock.Mock(side_effect=slow_load))
+        backend.name = 'torch'
+        with mock.patch('core.application.ai_service.get_backend', return_value=backend):
+            threads = [threading.Thread(target=MiningEngine.get_classifier) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(backend.load.call_count, 1)
+
+
+class StartupBudgetTests(SimpleTestCase):
+    """Arrancar Django (check y app WSGI) no importa transformers/torch y cabe en el presupuesto."""
+
+    def test_startup_skips_ml_stack(self):
+        for target in BUDGETS:
+            with self.subTest(target=target):
+                self.assertEqual(measure(target)["heavy_modules"], [])
+
+    @skipUnless(os.environ.get('SENTIMIND_STARTUP_BUDGET_TESTS'), "tiempos de arranque: SENTIMIND_STARTUP_BUDGET_TESTS=1")
+    def test_startup_within_budget(self):
+        for target in BUDGETS:
+            with self.subTest(target=target):
+                result = measure(target)
+                self.assertEqual(over_budget(target, result), [], result)
+
+
+@override_settings(SENTIMIND_CACHE_ENABLED=False, SENTIMIND_BATCH_WINDOW_MS=0)
+class InferenceServerTests(SimpleTestCase):
+    """Los workers delegan en el servidor de inferencia, que agrupa pedidos de todos y tiene fallback."""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.address = f"unix:{tmp.name}/inference.sock"
+
+        self.server = InferenceServer(self.address, window_ms=200, max_batch_size=8)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.shutdown)
+
+        patcher = mock.patch.object(
+            MiningEngine, '_infer_local', side_effect=lambda texts: [fake_analysis(t) for t in texts]
+        )
+        self.infer_local = patcher.start()
+        self.addCleanup(patcher.stop)
+
+        state = (MiningEngine._model_name, MiningEngine._backend_name)
+        self.addCleanup(lambda: (setattr(MiningEngine, '_model_name', state[0]),
+                                 setattr(MiningEngine, '_backend_name', state[1])))
+        self.addCleanup(InferenceClient.close)
+        self.addCleanup(setattr, InferenceClient, '_down_until', 0.0)
+
+    def test_worker_delegates_over_a_reused_connection(self):
+        with self.settings(SENTIMIND_INFERENCE_SERVER=self.address):
+            first = MiningEngine.analyze_batch(["Alegría", "Miedo"])
+            sock = InferenceClient._local.sock
+            second = MiningEngine.analyze("Humor")
+
+        self.assertEqual([r['primary_category'] for r in first], ["Alegría", "Miedo"])
+        self.assertEqual(second['primary_category'], "Humor")
+        self.assertIs(InferenceClient._local.sock, sock)
+        self.assertEqual(self.server.requests, 2)
+
+    def test_requests_from_different_workers_share_a_pass(self):
+        results = {}
+
+        def worker(name):
+            results[name] = MiningEngine._infer_batch([name])[0]['primary_category']
+            InferenceClient.close()
+
+        names = ["Alegría", "Tristeza", "Enojo", "Miedo"]
+        with self.settings(SENTIMIND_INFERENCE_SERVER=self.address):
+            threads = [threading.Thread(target=worker, args=(name,)) for name in names]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(results, {name: name for name in names})
+        self.infer_local.assert_called_once()
+        self.assertCountEqual(self.infer_local.call_args.args[0], names)
+
+    def test_bulk_requests_are_batched_by_text(self):
+        texts = [f"Texto {i}" for i in range(20)]
+        with self.settings(SENTIMIND_INFERENCE_SERVER=self.address):
+            results = MiningEngine._infer_batch(texts)
+
+        self.assertEqual([r['primary_category'] for r in results], texts)
+        sizes = [len(call.args[0]) for call in self.infer_local.call_args_list]
+        self.assertEqual(sum(sizes), 20)
+        self.assertLessEqual(max(sizes), 8)
+
+    def test_loading_server_never_triggers_local_fallback(self):
+        self.server.loading = True
+        with self.settings(SENTIMIND_INFERENCE_SERVER=self.address):
+            with self.assertRaises(InferenceServerLoading):
+                MiningEngine._infer_batch(["Nostalgia"])
+            self.assertTrue(InferenceClient.available())
+            self.assertTrue(InferenceClient.ping()['loading'])
+
+        self.infer_local.assert_not_called()
+
+    def test_falls_back_to_local_inference_when_server_is_down(self):
+        self.server.shutdown()
+        with self.settings(SENTIMIND_INFERENCE_SERVER=self.address):
+            [result] = MiningEngine._infer_batch(["Nostalgia"])
+            self.assertFalse(InferenceClient.available())
+            # Durante la pausa no se intenta conectar de nuevo
+            with mock.patch.object(InferenceClient, '_connection') as connect:
+                MiningEngine._infer_batch(["Nostalgia"])
+            connect.assert_not_called()
+
+            with self.settings(SENTIMIND_INFERENCE_FALLBACK=False):
+                with self.assertRaises(InferenceServerError):
+                    MiningEngine._infer_batch(["Nostalgia"])
+
+            ready = self.client.get('/ready/')
+
+        self.assertEqual(result['primary_category'], "Nostalgia")
+        self.assertEqual(ready.status_code, 503)
+        self.assertEqual(ready.json()['server'], self.address)
+
+
+class WordTokenizer:
+    """Tokenizer de prueba: un token por palabra."""
+
+    def __call__(self, texts, add_special_tokens=True):
+        return {"input_ids": [[0] * len(text.split()) for text in texts]}
+
+
+class KeywordClassifier:
+    """Pipeline zero-shot de prueba: Alegría si el segmento dice "feliz", Tristeza si dice "triste"."""
+
+    tokenizer = WordTokenizer()
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, segments, labels, hypothesis_template, multi_label, batch_size):
+        self.calls.append(list(segments))
+        outputs = []
+        for segment in segments:
+            scores = {label: 0.1 for label in labels}
+            if "feliz" in segment:
+                scores["Alegría"] = 0.9
+            if "triste" in segment:
+                scores["Tristeza"] = 0.85
+            ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+            outputs.append({"labels": [l for l, _ in ranked], "scores": [s for _, s in ranked]})
+        return outputs
+
+
+class TokenizationTests(SimpleTestCase):
+    """Fragmentos de posts largos, buckets por largo y tokenizer rápido solo con paridad."""
+
+    @override_settings(SENTIMIND_MAX_CHUNK_TOKENS=8)
+    def test_long_post_is_chunked_and_keeps_best_score_per_label(self):
+        text = ("Hoy estoy muy feliz con mi nuevo trabajo. "
+                "Pero al volver a casa encontré a mi perro triste y enfermo.")
+        classifier = KeywordClassifier()
+        [result] = MiningEngine._nli_batch([text], classifier=classifier)
+
+        segments = [segment for call in classifier.calls for segment in call]
+        self.assertGreater(len(segments), 1)
+        self.assertTrue(all(len(segment.split()) <= 8 for segment in segments))
+        self.assertCountEqual(" ".join(segments).split(), text.split())
+        self.assertEqual(result['primary_category'], "Alegría")
+        self.assertEqual([c['name'] for c in result['categories']], ["Alegría", "Tristeza"])
+
+    @override_settings(SENTIMIND_MAX_CHUNK_TOKENS=0)
+    def test_batch_is_grouped_by_length_and_keeps_order(self):
+        short_happy, short_sad = "feliz", "muy triste"
+        long_text = "un texto bastante más largo que los otros dos y sin emociones fuertes"
+        classifier = KeywordClassifier()
+        results = MiningEngine._nli_batch([short_happy, long_text, short_sad], classifier=classifier)
+
+        self.assertEqual(classifier.calls, [[short_happy, short_sad], [long_text]])
+        self.assertEqual([r['primary_category'] for r in results][::2], ["Alegría", "Tristeza"])
+
+    def test_auto_mode_trusts_only_a_passed_parity_check(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        model = MiningEngine.MODEL_NAME
+        failed = {"key": tokenization._verdict_key(model), "parity": False}
+
+        with self.settings(SENTIMIND_TOKENIZER_PARITY_FILE=f"{tmp.name}/parity.json",
+                           SENTIMIND_FAST_TOKENIZER='auto'):
+            with mock.patch.object(tokenization, 'check_parity', return_value=failed) as check:
+                self.assertFalse(tokenization.use_fast_tokenizer(model))
+                self.assertFalse(tokenization.use_fast_tokenizer(model))
+            # Se verifica una vez y el veredicto queda guardado
+            check.assert_called_once_with(model)
+
+            tokenization.save_verdict({**failed, "parity": True})
+            self.assertTrue(tokenization.use_fast_tokenizer(model))
+
+    def test_fast_tokenizer_matches_sentencepiece(self):
+        try:
+            from transformers import AutoTokenizer
+            slow = AutoTokenizer.from_pretrained(MiningEngine.MODEL_NAME, use_fast=False, local_files_only=True)
+            fast = AutoTokenizer.from_pretrained(MiningEngine.MODEL_NAME, use_fast=True, local_files_only=True)
+        except Exception as e:
+            self.skipTest(f"tokenizer de {MiningEngine.MODEL_NAME} no disponible localmente: {e}")
+
+        self.assertEqual(tokenization.token_mismatches(fast, slow, tokenization.PARITY_SAMPLES), [])
+
+
+class BenchmarkTests(SimpleTestCase):
+    """La suite de benchmarks corre con el backend stub (sin red) y detecta regresiones."""
+
+    def test_stub_backend_measures_latency_and_throughput(self):
+        texts = benchmark.corpus(6)
+        with benchmark.inference_backend('stub'):
+            metrics = benchmark.bench_latency(texts)
+            metrics.update(benchmark.bench_throughput(texts, batch_sizes=[2], concurrency=[3]))
+            self.assertEqual(MiningEngine.active_backend_name(), 'stub')
+
+        self.assertLessEqual(metrics['analyze.latency_ms.p50'], metrics['analyze.latency_ms.p99'])
+        self.assertGreater(metrics['analyze.batch_2.texts_per_s'], 0)
+        self.assertIn('analyze.concurrency_3.latency_ms.p95', metrics)
+        self.assertNotEqual(MiningEngine._backend_name, 'stub')
+
+    def test_backend_parity_skips_stub_by_default(self):
+        from core.management.commands.backend_parity import DEFAULT_BACKENDS
+        self.assertNotIn('stub', DEFAULT_BACKENDS)
+        self.assertNotIn('torch', DEFAULT_BACKENDS)
+
+    def test_compare_flags_regressions_in_the_right_direction(self):
+        baseline = {"metrics": {"analyze.latency_ms.p95": 10.0, "analyze.batch_8.texts_per_s": 100.0,
+                                "cold_start.warmup_seconds": 0.001}}
+        current = {"metrics": {"analyze.latency_ms.p95": 9.0, "analyze.batch_8.texts_per_s": 60.0,
+                               "cold_start.warmup_seconds": 0.004}}
+        rows = {row['metric']: row for row in benchmark.compare(baseline, current, tolerance=0.25)}
+
+        self.assertFalse(rows['analyze.latency_ms.p95']['regression'])
+        self.assertTrue(rows['analyze.batch_8.texts_per_s']['regression'])
+        self.assertFalse(rows['cold_start.warmup_seconds']['regression'])
+
+
+@override_settings(SENTIMIND_BATCH_WINDOW_MS=0, SENTIMIND_CACHE_ENABLED=False)
+class TelemetryTests(TestCase):
+    """Server-Timing por etapa en crear/listar y métricas Prometheus en /metrics."""
+
+    def setUp(self):
+        self.client = APIClient()
+        telemetry.Metrics.reset()
+        self.addCleanup(telemetry.Metrics.reset)
+        self.addCleanup(CategoryRegistry.invalidate)
+
+    @staticmethod
+    def stages(response) -> set:
+        return {part.split(';')[0].strip() for part in response['Server-Timing'].split(',')}
+
+    def test_create_and_list_report_stage_timings(self):
+        with mock.patch.object(MiningEngine, '_infer_batch', return_value=[fake_analysis()]):
+            created = self.client.post('/api/posts/', {"content": "Qué lindo día"}, format='json')
+        self.assertEqual(created.status_code, 201)
+        self.assertLessEqual({'inference', 'db', 'serialize', 'render', 'total'}, self.stages(created))
+
+        listed = self.client.get('/api/posts/')
+        self.assertLessEqual({'db', 'serialize', 'render', 'total'}, self.stages(listed))
+
+        with self.settings(SENTIMIND_SERVER_TIMING=False):
+            self.assertNotIn('Server-Timing', self.client.get('/api/posts/'))
+
+    def test_micro_batched_inference_reports_model_stages(self):
+        def infer(texts):
+            with telemetry.stage('tokenize'):
+                pass
+            with telemetry.stage('forward'):
+                pass
+            return [fake_analysis() for _ in texts]
+
+        # Batcher nuevo: el hilo despachador corre `infer` y devuelve sus etapas al request
+        with self.settings(SENTIMIND_BATCH_WINDOW_MS=1), mock.patch.object(MiningEngine, '_batcher', None), \
+                mock.patch.object(MiningEngine, '_infer_batch', side_effect=infer):
+            created = self.client.post('/api/posts/', {"content": "Qué lindo día"}, format='json')
+
+        self.assertEqual(created.status_code, 201)
+        self.assertLessEqual({'inference', 'tokenize', 'forward'}, self.stages(created))
+        # Ya observadas en el hilo del batcher: el histograma no las cuenta dos veces
+        self.assertIn('sentimind_stage_seconds_count{stage="forward"} 1', telemetry.Metrics.render())
+
+    def test_metrics_endpoint_exposes_histograms_fallbacks_and_process_state(self):
+        with mock.patch.object(MiningEngine, '_infer_batch', side_effect=RuntimeError("sin modelo")):
+            self.client.post('/api/posts/', {"content": "Qué lindo día"}, format='json')
+
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        body = response.content.decode()
+        self.assertIn('sentimind_classification_fallbacks_total{source="create"} 1', body)
+        self.assertIn('sentimind_request_seconds_count{method="POST",route="api/posts/"} 1', body)
+        self.assertIn('sentimind_stage_seconds_bucket{stage="db",le="+Inf"}', body)
+        self.assertIn('sentimind_classification_cache_hit_ratio', body)
+        self.assertIn('sentimind_model_loaded', body)
+        self.assertIn('process_resident_memory_bytes', body)
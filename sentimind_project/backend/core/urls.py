@@ -1,7 +1,15 @@
 from django.urls import path
-from core.infrastructure.views import PostListCreateView, CategoryListView
+from core.infrastructure.views import (
+    PostListCreateView, PostBulkCreateView, PostStatusView, PostSimilarView, CategoryListView, StatsView,
+    post_stream
+)
 
 urlpatterns = [
     path('posts/', PostListCreateView.as_view(), name='post-list-create'),
+    path('posts/bulk/', PostBulkCreateView.as_view(), name='post-bulk-create'),
+    path('posts/stream/', post_stream, name='post-stream'),
+    path('posts/<int:pk>/status/', PostStatusView.as_view(), name='post-status'),
+    path('posts/<int:pk>/similar/', PostSimilarView.as_view(), name='post-similar'),
     path('categories/', CategoryListView.as_view(), name='category-list'),
+    path('stats/', StatsView.as_view(), name='stats'),
 ]
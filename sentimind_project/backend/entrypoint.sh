@@ -11,12 +11,6 @@ python manage.py migrate --noinput
 echo "📁 Collecting static files..."
 python manage.py collectstatic --noinput
 
-# Iniciar gunicorn
+# Iniciar gunicorn (workers, --preload y warm-up en gunicorn.conf.py)
 echo "🌐 Starting Gunicorn on port ${PORT:-8000}..."
-exec gunicorn sentimind.wsgi:application \
-    --bind 0.0.0.0:${PORT:-8000} \
-    --workers 2 \
-    --threads 2 \
-    --timeout 120 \
-    --access-logfile - \
-    --error-logfile -
+exec gunicorn sentimind.wsgi:application --config gunicorn.conf.py
@@ -0,0 +1,34 @@
+"""
+Configuración de gunicorn (entrypoint.sh / render.yaml).
+
+preload_app: la app (y el modelo, ver core/application/warmup.py) se carga
+una vez en el maestro y los workers la heredan por fork, compartiendo los
+pesos por copy-on-write en lugar de tener una copia cada uno.
+"""
+import gc
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', '2'))
+threads = 2
+timeout = 120
+accesslog = '-'
+errorlog = '-'
+
+preload_app = True
+
+# En el maestro solo se cargan los pesos; la inferencia de warm-up va en cada worker
+os.environ['SENTIMIND_WARMUP_AFTER_FORK'] = '1'
+
+
+def pre_fork(server, worker):
+    # Saca los objetos ya cargados del GC: sus contadores de recolección no se
+    # tocan en los workers y las páginas siguen compartidas
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    from core.application import warmup
+    warmup.start_warm_up()
+    # Los hilos no sobreviven al fork: el pool de clasificación asíncrona va en cada worker
+    warmup.start_classification_worker()
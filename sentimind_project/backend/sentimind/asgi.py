@@ -3,6 +3,14 @@ ASGI config for sentimind project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Sentimind la usa para el feed en tiempo real (GET /api/posts/stream/): con
+un servidor ASGI cada cliente SSE es una corrutina en espera, no un hilo.
+Se corre como proceso aparte del de gunicorn (`uv sync --extra asgi`):
+
+    uvicorn sentimind.asgi:application --port 8001
+
+Este proceso no precarga el modelo; los POST siguen yendo a gunicorn.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
 """
@@ -56,6 +56,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',  # CORS debe ir primero
+    'core.infrastructure.middleware.ServerTimingMiddleware',  # Server-Timing y métricas de /metrics
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -95,9 +96,23 @@ CORS_ALLOW_METHODS = [
 
 # Django REST Framework Configuration
 REST_FRAMEWORK = {
-    'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend']
+    'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
+    # orjson si está instalado (extra `fast-json`); mismo JSON que JSONRenderer
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.infrastructure.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
 
+# Primera página de GET /api/posts/ cacheada en el servidor (opt-in), se
+# invalida al crear o reclasificar posts
+SENTIMIND_LIST_CACHE = os.environ.get('SENTIMIND_LIST_CACHE', 'False').lower() in ('true', '1', 'yes')
+SENTIMIND_LIST_CACHE_TTL = int(os.environ.get('SENTIMIND_LIST_CACHE_TTL', '60'))
+
+# Paginación por cursor del listado de posts (core/infrastructure/pagination.py)
+SENTIMIND_PAGE_SIZE = int(os.environ.get('SENTIMIND_PAGE_SIZE', '20'))
+SENTIMIND_MAX_PAGE_SIZE = int(os.environ.get('SENTIMIND_MAX_PAGE_SIZE', '100'))
+
 ROOT_URLCONF = 'sentimind.urls'
 
 TEMPLATES = [
@@ -122,16 +137,47 @@ WSGI_APPLICATION = 'sentimind.wsgi.application'
 # https://docs.djangoproject.com/en/6.0/ref/settings/#databases
 
 # Directorio de datos (con permisos de escritura en Docker)
-DATA_DIR = BASE_DIR / 'data'
+DATA_DIR = Path(os.environ.get('SENTIMIND_DATA_DIR', BASE_DIR / 'data'))
 DATA_DIR.mkdir(exist_ok=True)
 
+# SQLite para escrituras concurrentes:
+# - WAL: las lecturas no esperan a la escritura en curso (y synchronous=NORMAL,
+#   seguro con WAL, ahorra un fsync por commit)
+# - BEGIN IMMEDIATE: la transacción toma el lock de escritura al empezar y
+#   espera hasta `timeout` segundos en vez de fallar con "database is locked"
+#   al querer pasar de lectura a escritura
+# - Conexiones persistentes (CONN_MAX_AGE) con chequeo antes de reusarlas
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': DATA_DIR / 'db.sqlite3',
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', '600')),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'timeout': float(os.environ.get('DB_BUSY_TIMEOUT', '20')),
+            'transaction_mode': 'IMMEDIATE',
+            'init_command': 'PRAGMA journal_mode=WAL;PRAGMA synchronous=NORMAL',
+        },
     }
 }
 
+# Caché de Django: versión del listado de posts (ETag) y primera página cacheada.
+# "file" es compartido entre los workers de gunicorn; "locmem" solo sirve con un proceso.
+if os.environ.get('CACHE_BACKEND', 'file') == 'locmem':
+    CACHES = {
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': DATA_DIR / 'cache',
+        }
+    }
+
+# Los tests usan LocMemCache (ver sentimind/test_runner.py)
+TEST_RUNNER = 'sentimind.test_runner.SentimindTestRunner'
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -169,3 +215,108 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+
+# Motor de IA (MiningEngine)
+# Ver core/application/ai_service.py
+
+# Micro-batching: ventana (ms) para juntar requests concurrentes en una
+# sola pasada del modelo. 0 desactiva el batching.
+SENTIMIND_BATCH_WINDOW_MS = float(os.environ.get('SENTIMIND_BATCH_WINDOW_MS', '10'))
+# Máximo de textos por pasada (cada texto son len(TAXONOMY) pares NLI)
+SENTIMIND_BATCH_MAX_SIZE = int(os.environ.get('SENTIMIND_BATCH_MAX_SIZE', '8'))
+
+# Clasificación asíncrona: el POST responde 202 con el post en "pending"
+# y la IA corre en segundo plano (GET /api/posts/<id>/status/ para el estado).
+SENTIMIND_ASYNC_CLASSIFICATION = os.environ.get('SENTIMIND_ASYNC_CLASSIFICATION', 'False').lower() in ('true', '1', 'yes')
+# "inprocess": pool de hilos dentro de gunicorn
+# "command": proceso aparte con `python manage.py classify_pending`
+SENTIMIND_ASYNC_WORKER_MODE = os.environ.get('SENTIMIND_ASYNC_WORKER_MODE', 'inprocess')
+SENTIMIND_ASYNC_WORKERS = int(os.environ.get('SENTIMIND_ASYNC_WORKERS', '1'))
+SENTIMIND_ASYNC_BATCH_SIZE = int(os.environ.get('SENTIMIND_ASYNC_BATCH_SIZE', '16'))
+SENTIMIND_ASYNC_POLL_SECONDS = float(os.environ.get('SENTIMIND_ASYNC_POLL_SECONDS', '5'))
+
+# Caché de clasificación por hash de contenido (LRU en memoria + tabla en DB).
+# Se invalida sola al cambiar modelo, TAXONOMY, HYPOTHESIS_TEMPLATE o umbrales.
+SENTIMIND_CACHE_ENABLED = os.environ.get('SENTIMIND_CACHE_ENABLED', 'True').lower() in ('true', '1', 'yes')
+SENTIMIND_CACHE_MEMORY_SIZE = int(os.environ.get('SENTIMIND_CACHE_MEMORY_SIZE', '1024'))
+
+# Reuso de clasificaciones de casi-duplicados: SimHash de 64 bits de los posts
+# recientes (LRU por worker). Un post a <= MAX_DISTANCE bits de uno ya
+# clasificado recibe su resultado con method="reused" (ver `manage.py audit_reuse`).
+SENTIMIND_NEAR_DUP_ENABLED = os.environ.get('SENTIMIND_NEAR_DUP_ENABLED', 'False').lower() in ('true', '1', 'yes')
+SENTIMIND_NEAR_DUP_MAX_DISTANCE = int(os.environ.get('SENTIMIND_NEAR_DUP_MAX_DISTANCE', '6'))
+SENTIMIND_NEAR_DUP_MAX_ENTRIES = int(os.environ.get('SENTIMIND_NEAR_DUP_MAX_ENTRIES', '4096'))
+
+# Feed en tiempo real (GET /api/posts/stream/, Server-Sent Events). Un hilo por
+# proceso lee los eventos nuevos cada POLL_SECONDS y los reparte; los clientes
+# desconectados reanudan con Last-Event-ID hasta REPLAY_MAX eventos atrás.
+SENTIMIND_FEED_POLL_SECONDS = float(os.environ.get('SENTIMIND_FEED_POLL_SECONDS', '0.25'))
+SENTIMIND_FEED_HEARTBEAT_SECONDS = float(os.environ.get('SENTIMIND_FEED_HEARTBEAT_SECONDS', '15'))
+SENTIMIND_FEED_REPLAY_MAX = int(os.environ.get('SENTIMIND_FEED_REPLAY_MAX', '1000'))
+SENTIMIND_FEED_CLIENT_BUFFER = int(os.environ.get('SENTIMIND_FEED_CLIENT_BUFFER', '256'))
+# Con WSGI (gunicorn/runserver) cada cliente del feed ocupa un hilo: responde 204 salvo que se habilite
+SENTIMIND_FEED_WSGI = os.environ.get('SENTIMIND_FEED_WSGI', 'False').lower() in ('true', '1', 'yes')
+
+# Backend de inferencia: "torch" (fp32), "torch-int8" (cuantización dinámica),
+# "onnx" (ONNX Runtime; exportar antes con `python manage.py export_model`)
+# o "stub" (clasificador determinista sin pesos, para benchmarks y desarrollo)
+SENTIMIND_INFERENCE_BACKEND = os.environ.get('SENTIMIND_INFERENCE_BACKEND', 'torch')
+SENTIMIND_ONNX_DIR = Path(os.environ.get('SENTIMIND_ONNX_DIR', DATA_DIR / 'onnx'))
+SENTIMIND_ONNX_QUANTIZED = os.environ.get('SENTIMIND_ONNX_QUANTIZED', 'False').lower() in ('true', '1', 'yes')
+
+# Tokenizer: "auto" usa el rápido si da los mismos token IDs que sentencepiece
+# (verificado una vez y guardado; `python manage.py tokenizer_parity`), "fast" o "slow"
+SENTIMIND_FAST_TOKENIZER = os.environ.get('SENTIMIND_FAST_TOKENIZER', 'auto')
+SENTIMIND_TOKENIZER_PARITY_FILE = DATA_DIR / 'tokenizer_parity.json'
+# Posts de más tokens se parten en fragmentos de oraciones (0 = no partir)
+SENTIMIND_MAX_CHUNK_TOKENS = int(os.environ.get('SENTIMIND_MAX_CHUNK_TOKENS', '128'))
+
+# Modo de clasificación: "nli" (zero-shot completo) o "embedding"
+# (similitud post-vs-hipótesis; vuelve a NLI si el margen top1-top2 es bajo)
+SENTIMIND_CLASSIFICATION_MODE = os.environ.get('SENTIMIND_CLASSIFICATION_MODE', 'nli')
+SENTIMIND_EMBEDDING_MODEL = os.environ.get(
+    'SENTIMIND_EMBEDDING_MODEL', 'sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2'
+)
+SENTIMIND_EMBEDDING_MIN_MARGIN = float(os.environ.get('SENTIMIND_EMBEDDING_MIN_MARGIN', '0.05'))
+SENTIMIND_EMBEDDING_CACHE_DIR = DATA_DIR / 'embeddings'
+
+# Modo "cascade": clasificador destilado (TF-IDF + lineal) primero y
+# transformer solo si no está seguro. Entrenar con `python manage.py train_distilled`.
+SENTIMIND_DISTILLED_DIR = DATA_DIR / 'distilled'
+# Versión del artefacto a usar (vacío = la última entrenada)
+SENTIMIND_DISTILLED_VERSION = os.environ.get('SENTIMIND_DISTILLED_VERSION', '')
+SENTIMIND_CASCADE_MIN_CONFIDENCE = float(os.environ.get('SENTIMIND_CASCADE_MIN_CONFIDENCE', '0.8'))
+SENTIMIND_CASCADE_MIN_MARGIN = float(os.environ.get('SENTIMIND_CASCADE_MIN_MARGIN', '0.2'))
+
+# Cargar el modelo al iniciar (y warm-up) en vez de en el primer analyze().
+# Con gunicorn.conf.py (preload_app) los workers comparten los pesos.
+SENTIMIND_PRELOAD_MODEL = os.environ.get('SENTIMIND_PRELOAD_MODEL', 'True').lower() in ('true', '1', 'yes')
+
+# Servidor de inferencia compartido (`python manage.py inference_server`):
+# "unix:/ruta/al.sock" o "host:puerto". Vacío = cada worker tiene su modelo.
+SENTIMIND_INFERENCE_SERVER = os.environ.get('SENTIMIND_INFERENCE_SERVER', '')
+# Segundos máximos por pedido y pausa antes de reintentar tras un fallo
+SENTIMIND_INFERENCE_TIMEOUT = float(os.environ.get('SENTIMIND_INFERENCE_TIMEOUT', '30'))
+SENTIMIND_INFERENCE_RETRY_SECONDS = float(os.environ.get('SENTIMIND_INFERENCE_RETRY_SECONDS', '5'))
+# Si el servidor no responde, inferir en el worker (carga el modelo ahí) en vez de fallar
+SENTIMIND_INFERENCE_FALLBACK = os.environ.get('SENTIMIND_INFERENCE_FALLBACK', 'True').lower() in ('true', '1', 'yes')
+
+# Header Server-Timing con las etapas de cada request (tokenize, forward,
+# inference, db, serialize, render...). Las métricas de /metrics se juntan igual.
+SENTIMIND_SERVER_TIMING = os.environ.get('SENTIMIND_SERVER_TIMING', 'True').lower() in ('true', '1', 'yes')
+
+# "Posts parecidos" (GET /api/posts/<id>/similar/): embeddings float16 en un
+# archivo memory-mapped. True = indexar cada post nuevo en segundo plano
+# (carga el modelo de embeddings en el worker); el índice inicial se arma con
+# `python manage.py rebuild_vector_index`.
+SENTIMIND_VECTOR_INDEX = os.environ.get('SENTIMIND_VECTOR_INDEX', 'False').lower() in ('true', '1', 'yes')
+SENTIMIND_VECTOR_INDEX_DIR = Path(os.environ.get('SENTIMIND_VECTOR_INDEX_DIR', DATA_DIR / 'vectors'))
+
+# Group commit: ventana (ms) para juntar los posts de requests concurrentes
+# en una sola transacción de escritura. 0 = una transacción por post.
+SENTIMIND_WRITE_BATCH_WINDOW_MS = float(os.environ.get('SENTIMIND_WRITE_BATCH_WINDOW_MS', '0'))
+SENTIMIND_WRITE_BATCH_MAX_SIZE = int(os.environ.get('SENTIMIND_WRITE_BATCH_MAX_SIZE', '64'))
+
+# Máximo de posts por request en POST /api/posts/bulk/
+SENTIMIND_BULK_MAX_SIZE = int(os.environ.get('SENTIMIND_BULK_MAX_SIZE', '100'))
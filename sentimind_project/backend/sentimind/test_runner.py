@@ -0,0 +1,23 @@
+"""
+Runner de `manage.py test`.
+
+La caché por defecto es de archivos en DATA_DIR/cache (compartida entre
+workers): los tests usan LocMemCache para no leer ni borrar la caché real
+del entorno donde corren.
+"""
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class SentimindTestRunner(DiscoverRunner):
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._caches = override_settings(CACHES={
+            'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}
+        })
+        self._caches.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._caches.disable()
+        super().teardown_test_environment(**kwargs)
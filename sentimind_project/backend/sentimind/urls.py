@@ -14,9 +14,14 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+import os
+
 from django.contrib import admin
 from django.urls import path, include
-from django.http import JsonResponse
+from django.http import HttpResponse, JsonResponse
+
+from core.application import telemetry, warmup
+from core.application.ai_service import MiningEngine
 
 
 def health_check(request):
@@ -24,8 +29,27 @@ def health_check(request):
     return JsonResponse({"status": "ok", "message": "SentiMind API is running"})
 
 
+def readiness_check(request):
+    """
+    Readiness: 200 cuando el modelo de este worker está cargado y con warm-up,
+    503 mientras tanto. Con SENTIMIND_PRELOAD_MODEL=False (carga perezosa) siempre 200.
+    Con servidor de inferencia refleja el estado del modelo en ese servidor.
+    """
+    state = MiningEngine.readiness()
+    state["ready"] = state["warm"] or not (warmup.enabled() or "server" in state)
+    state.update(warmup.resident_memory(), pid=os.getpid())
+    return JsonResponse(state, status=200 if state["ready"] else 503)
+
+
+def metrics(request):
+    """Métricas de este worker en formato de texto de Prometheus."""
+    return HttpResponse(telemetry.render_prometheus(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
 urlpatterns = [
     path('', health_check, name='health-check'),
+    path('ready/', readiness_check, name='readiness-check'),
+    path('metrics', metrics, name='metrics'),
     path('admin/', admin.site.urls),
     path('api/', include('core.urls')),
 ]
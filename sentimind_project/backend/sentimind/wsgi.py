@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'sentimind.settings')
 
 application = get_wsgi_application()
+
+# Carga el modelo al iniciar en vez de en el primer request (ver core/application/warmup.py)
+from core.application import warmup  # noqa: E402
+
+warmup.on_startup()
@@ -2,6 +2,8 @@ import axios from "axios";
 
 // Usar variable de entorno de Vite, con fallback para desarrollo
 const API_URL = import.meta.env.VITE_API_URL || "http://127.0.0.1:8000/api";
+// Feed SSE (proceso ASGI aparte). Sin definir no se abre: en gunicorn ocuparía un hilo por pestaña
+const STREAM_URL: string | undefined = import.meta.env.VITE_STREAM_URL;
 
 // Categoría detectada con su confianza
 export interface DetectedCategory {
@@ -17,16 +19,30 @@ export interface Post {
   primary_category: string;
   primary_confidence: number;
   categories: DetectedCategory[]; // Múltiples categorías detectadas
+  classification_status?: "pending" | "processing" | "done" | "failed";
+  classification_method?: string; // "reused" = clasificación de un casi-duplicado
   created_at: string;
 }
 
+// Respuesta paginada por cursor de GET /posts/
+export interface PostPage {
+  next: string | null; // URL de la página siguiente (null si no hay más)
+  results: Post[];
+}
+
 export const postService = {
-  // Obtener posts (opcionalmente filtrados por categoría)
-  async getAll(category: string | null = null): Promise<Post[]> {
+  // Obtener la primera página de posts (opcionalmente filtrados por categoría)
+  async getAll(category: string | null = null): Promise<PostPage> {
     const url = category
       ? `${API_URL}/posts/?category=${category}`
       : `${API_URL}/posts/`;
-    const response = await axios.get<Post[]>(url);
+    const response = await axios.get<PostPage>(url);
+    return response.data;
+  },
+
+  // Obtener la página siguiente (URL `next` de la página anterior)
+  async getPage(url: string): Promise<PostPage> {
+    const response = await axios.get<PostPage>(url);
     return response.data;
   },
 
@@ -36,6 +52,27 @@ export const postService = {
     return response.data;
   },
 
+  // Suscribirse a posts nuevos y recién clasificados (Server-Sent Events).
+  // EventSource reconecta solo y reenvía Last-Event-ID; "reset" indica que se
+  // perdieron eventos y hay que recargar el listado. Retorna la función para cerrar.
+  // Sin VITE_STREAM_URL no hace nada (el listado se actualiza al publicar).
+  subscribe(
+    category: string | null,
+    onPost: (post: Post) => void,
+    onReset: () => void
+  ): () => void {
+    if (!STREAM_URL) return () => {};
+    const url = category
+      ? `${STREAM_URL}/posts/stream/?category=${encodeURIComponent(category)}`
+      : `${STREAM_URL}/posts/stream/`;
+    const source = new EventSource(url);
+    const handlePost = (event: MessageEvent) => onPost(JSON.parse(event.data));
+    source.addEventListener("created", handlePost);
+    source.addEventListener("classified", handlePost);
+    source.addEventListener("reset", onReset);
+    return () => source.close();
+  },
+
   // Obtener categorías disponibles
   async getCategories(): Promise<string[]> {
     const response = await axios.get<{ categories: string[] }>(
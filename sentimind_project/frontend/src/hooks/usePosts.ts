@@ -6,13 +6,16 @@ export const usePosts = () => {
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
   const [filter, setFilter] = useState<string | null>(null);
+  const [next, setNext] = useState<string | null>(null); // Página siguiente (cursor)
+  const [loadingMore, setLoadingMore] = useState(false);
 
   const fetchPosts = useCallback(async () => {
     setLoading(true);
     setError(null);
     try {
-      const data = await postService.getAll(filter);
-      setPosts(data);
+      const page = await postService.getAll(filter);
+      setPosts(page.results);
+      setNext(page.next);
     } catch (err) {
       console.error("Error fetching posts", err);
       setError("Error al cargar los posts");
@@ -21,11 +24,47 @@ export const usePosts = () => {
     }
   }, [filter]);
 
+  // Agregar la página siguiente al final (sin repetir posts ya listados)
+  const loadMore = useCallback(async () => {
+    if (!next || loadingMore) return;
+    setLoadingMore(true);
+    setError(null);
+    try {
+      const page = await postService.getPage(next);
+      setPosts((current) => {
+        const ids = new Set(current.map((p) => p.id));
+        return [...current, ...page.results.filter((p) => !ids.has(p.id))];
+      });
+      setNext(page.next);
+    } catch (err) {
+      console.error("Error fetching more posts", err);
+      setError("Error al cargar más posts");
+    } finally {
+      setLoadingMore(false);
+    }
+  }, [next, loadingMore]);
+
   // Recargar cuando cambia el filtro
   useEffect(() => {
     fetchPosts();
   }, [fetchPosts]);
 
+  // Feed en tiempo real: inserta los posts nuevos y actualiza los ya listados
+  useEffect(() => {
+    return postService.subscribe(
+      filter,
+      (post) =>
+        setPosts((current) =>
+          current.some((p) => p.id === post.id)
+            ? current.map((p) => (p.id === post.id ? post : p))
+            : [post, ...current]
+        ),
+      () => {
+        fetchPosts();
+      }
+    );
+  }, [filter, fetchPosts]);
+
   const addPost = async (content: string) => {
     setLoading(true);
     setError(null);
@@ -48,6 +87,9 @@ export const usePosts = () => {
     filter,
     setFilter,
     addPost,
+    hasMore: next !== null,
+    loadingMore,
+    loadMore,
     refetch: fetchPosts,
   };
 };
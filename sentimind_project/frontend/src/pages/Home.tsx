@@ -4,7 +4,8 @@ import PostInput from "../components/PostInput";
 import FilterBar from "../components/FilterBar";
 
 export default function Home() {
-  const { posts, loading, error, filter, setFilter, addPost } = usePosts();
+  const { posts, loading, error, filter, setFilter, addPost, hasMore, loadingMore, loadMore } =
+    usePosts();
 
   return (
     <div
@@ -160,7 +161,8 @@ export default function Home() {
               </>
             ) : (
               <>
-                📊 Mostrando <strong>{posts.length}</strong> posts totales
+                📊 Mostrando <strong>{posts.length}</strong>{" "}
+                {hasMore ? "posts más recientes" : "posts totales"}
               </>
             )}
           </div>
@@ -245,6 +247,30 @@ export default function Home() {
           </div>
         )}
 
+        {/* ========== PAGINACIÓN ========== */}
+        {hasMore && posts.length > 0 && (
+          <div style={{ textAlign: "center", marginTop: "32px" }}>
+            <button
+              onClick={loadMore}
+              disabled={loadingMore}
+              style={{
+                background: "white",
+                color: "#667eea",
+                border: "none",
+                padding: "14px 32px",
+                borderRadius: "30px",
+                fontSize: "1rem",
+                fontWeight: 600,
+                cursor: loadingMore ? "wait" : "pointer",
+                opacity: loadingMore ? 0.7 : 1,
+                boxShadow: "0 10px 30px rgba(0, 0, 0, 0.2)",
+              }}
+            >
+              {loadingMore ? "Cargando..." : "Cargar más posts"}
+            </button>
+          </div>
+        )}
+
         {/* ========== FOOTER ========== */}
         <footer
           style={{